@@ -0,0 +1,141 @@
+"""
+AsyncPostData module.
+
+This module provides the following classes:
+
+- AsyncPostData
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from logging import getLogger
+from typing import Any, Coroutine
+
+from barda.outbox import ConversionKey
+from barda.post_data import PostData
+
+LOGGER = getLogger(__name__)
+
+
+class AsyncPostData:
+    """
+    Asyncio counterpart to PostData.
+
+    Each write runs on a worker thread against the wrapped PostData, so it shares the pooled
+    session and rate limits with any synchronous writes. Coroutines are executed on an event loop
+    owned by a background thread, which lets the importers submit a write and carry on with
+    Comic Vine / GCD lookups while it is in flight.
+
+    Args:
+        barda (PostData): The PostData object used to send the requests.
+        max_in_flight (int): Maximum number of writes in flight at once.
+    """
+
+    def __init__(self, barda: PostData, max_in_flight: int = 4) -> None:
+        self.barda = barda
+        self.max_in_flight = max_in_flight
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self) -> None:
+        """Start the event loop thread if it isn't already running."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="barda-writes", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """
+        Schedule a coroutine on the write loop.
+
+        Args:
+            coro: The coroutine to run, normally one of the ``post_*``/``patch_*`` methods.
+
+        Returns:
+            A Future holding the coroutine's result.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)  # type: ignore
+
+    def close(self) -> None:
+        """Wait for any writes still in flight and stop the event loop."""
+        if self._loop is None:
+            return
+        pending = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        pending.result()
+        # Join the worker threads of asyncio.to_thread, so none outlive the session.
+        asyncio.run_coroutine_threadsafe(
+            self._loop.shutdown_default_executor(), self._loop
+        ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()  # type: ignore
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+
+    async def _drain(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        if tasks:
+            LOGGER.debug(f"Waiting on {len(tasks)} writes to finish.")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, func, *args) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    async def patch_arc(self, id_: int, data):
+        return await self._run(self.barda.patch_arc, id_, data)
+
+    async def post_arc(self, data, keys: list[ConversionKey] | None = None):
+        return await self._run(self.barda.post_arc, data, keys)
+
+    async def patch_character(self, id_: int, data):
+        return await self._run(self.barda.patch_character, id_, data)
+
+    async def post_character(self, data, keys: list[ConversionKey] | None = None):
+        return await self._run(self.barda.post_character, data, keys)
+
+    async def patch_creator(self, id_: int, data):
+        return await self._run(self.barda.patch_creator, id_, data)
+
+    async def post_creator(self, data, keys: list[ConversionKey] | None = None):
+        return await self._run(self.barda.post_creator, data, keys)
+
+    async def patch_issue(self, id_: int, data):
+        return await self._run(self.barda.patch_issue, id_, data)
+
+    async def post_issue(self, data, keys: list[ConversionKey] | None = None):
+        return await self._run(self.barda.post_issue, data, keys)
+
+    async def patch_series(self, id_: int, data):
+        return await self._run(self.barda.patch_series, id_, data)
+
+    async def post_series(self, data, keys: list[ConversionKey] | None = None):
+        return await self._run(self.barda.post_series, data, keys)
+
+    async def patch_team(self, id_: int, data):
+        return await self._run(self.barda.patch_team, id_, data)
+
+    async def post_team(self, data, keys: list[ConversionKey] | None = None):
+        return await self._run(self.barda.post_team, data, keys)
+
+    async def post_credit(self, data):
+        return await self._run(self.barda.post_credit, data)
+
+    async def post_variant(self, data):
+        return await self._run(self.barda.post_variant, data)
@@ -1,10 +1,25 @@
 """Cli for Barda."""
 
 from argparse import Namespace
+from pathlib import Path
 
+import questionary
+
+from barda import __version__
+from barda.comicvine_session import ComicvineSession
+from barda.cv_cache import ComicvineCache
+from barda.cv_warmer import VolumeWarmer
+from barda.dry_run import replay_journal
+from barda.image_cache import ImageCache
+from barda.logging import init_logging
+from barda.metron_session import MetronSession
+from barda.mirror import MetronMirror
+from barda.name_index import NameIndex
 from barda.options import make_parser
+from barda.retry import RetryPolicy
 from barda.run import Runner
 from barda.settings import BardaSettings
+from barda.styles import Styles
 
 
 def get_args() -> Namespace:
@@ -13,13 +28,77 @@ def get_args() -> Namespace:
 
 
 def get_configs(opts: Namespace) -> BardaSettings:
-    return BardaSettings()
+    config = BardaSettings()
+    config.dry_run = opts.dry_run
+    config.offline = opts.offline
+    # Writes can't be sent offline, so they are journaled.
+    if config.offline and config.dry_run is None:
+        config.dry_run = Path("barda-journal.jsonl")
+    return config
+
+
+def warm_volumes(config: BardaSettings, volumes: list[int]) -> None:
+    if config.offline:
+        questionary.print("Can't warm the caches while offline.", style=Styles.ERROR)
+        return
+    if not config.cv_api_key:
+        questionary.print("No Comic Vine API key is set.", style=Styles.ERROR)
+        return
+    init_logging()
+    cv = ComicvineSession(
+        api_key=config.cv_api_key,
+        cache=ComicvineCache(config.cv_cache, max_bytes=config.cv_cache_size_mb * 1024 * 1024),
+        retry=RetryPolicy(attempts=config.retry_attempts, deadline=config.retry_deadline),
+    )
+    warmer = VolumeWarmer(cv, ImageCache(config.image_cache))
+    for volume in volumes:
+        counts = warmer.warm(volume)
+        questionary.print(
+            f"Volume {volume}: {counts['issue']} issues, {counts['cover']} covers, "
+            f"{counts['creator']} creators, {counts['character']} characters, "
+            f"{counts['team']} teams and {counts['arc']} story arcs ({counts['errors']} errors).",
+            style=Styles.SUCCESS if not counts["errors"] else Styles.WARNING,
+        )
 
 
 def main():
     args = get_args()
     config = get_configs(args)
 
+    if args.replay:
+        result = replay_journal(
+            args.replay, args.stub_url, (config.metron_user, config.metron_password)
+        )
+        questionary.print(
+            f"Sent {result['requests']} requests ({result['errors']} errors) in "
+            f"{result['seconds']:.1f}s: {result['per_second']:.1f} requests/s",
+            style=Styles.SUCCESS,
+        )
+        return
+
+    if args.sync_names or args.sync_mirror:
+        if config.offline:
+            questionary.print("Can't sync while offline.", style=Styles.ERROR)
+            return
+        metron = MetronSession(
+            config.metron_user, config.metron_password, user_agent=f"Barda/{__version__}"
+        )
+        if args.sync_names:
+            counts = NameIndex(config.name_index).sync(metron, full=True)
+            for resource, count in counts.items():
+                questionary.print(f"Synced {count} {resource} names.", style=Styles.SUCCESS)
+        if args.sync_mirror:
+            counts = MetronMirror(config.mirror).sync(metron)
+            for resource, count in counts.items():
+                questionary.print(
+                    f"Fetched {count} changed {resource} summaries.", style=Styles.SUCCESS
+                )
+        return
+
+    if args.warm_volumes:
+        warm_volumes(config, args.warm_volumes)
+        return
+
     runner = Runner(config)
     runner.run()
 
@@ -0,0 +1,138 @@
+"""
+ComicvineSession module.
+
+This module provides the following classes:
+
+- ComicvineSession
+"""
+
+from json import JSONDecodeError
+from logging import getLogger
+from typing import Any
+
+import requests
+from pydantic import TypeAdapter, ValidationError
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
+from simyan.comicvine import Comicvine, ComicvineResource
+from simyan.exceptions import AuthenticationError, ServiceError
+from simyan.schemas.issue import Issue
+from simyan.sqlite_cache import SQLiteCache
+
+from barda.cv_cache import ComicvineCache
+from barda.projections import (
+    CV_ISSUE_FIELDS,
+    CV_ISSUE_LIST_FIELDS,
+    CV_VOLUME_FIELDS,
+    CVIssueSummary,
+    CVVolumeSummary,
+)
+from barda.rate_limit import COMIC_VINE, LIMITER, endpoint_from_url
+from barda.retry import RetryPolicy
+
+LOGGER = getLogger(__name__)
+
+
+class ComicvineSession(Comicvine):
+    """
+    Simyan Comicvine client that sends its requests through barda's shared rate limiter.
+
+    Issues and the issue and volume lists are requested with a ``field_list`` of only the fields
+    barda reads, which keeps the responses and their cache rows small.
+
+    An offline session never sends a request: anything not in the cache raises a ServiceError.
+
+    Args:
+        api_key (str): User's API key to access the Comicvine API.
+        timeout (int): Set how long requests will wait for a response (in seconds).
+        cache (SQLiteCache | ComicvineCache, optional): Cache to use if set.
+        retry (RetryPolicy, optional): How failed requests are retried.
+        offline (bool): Serve requests only from the cache.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 30,
+        cache: SQLiteCache | ComicvineCache | None = None,
+        retry: RetryPolicy | None = None,
+        offline: bool = False,
+    ) -> None:
+        super(ComicvineSession, self).__init__(api_key=api_key, timeout=timeout, cache=cache)
+        self.session = requests.Session()
+        self.retry = retry or RetryPolicy()
+        self.offline = offline
+
+    def _perform_get_request(
+        self, url: str, params: dict[str, str] | None = None
+    ) -> dict[str, Any]:
+        if params is None:
+            params = {}
+
+        endpoint = endpoint_from_url(url, "/api/")
+        if self.offline:
+            raise ServiceError(f"Offline: GET {endpoint} {params} isn't in the Comic Vine cache")
+
+        def attempt(timeout: float) -> requests.Response:
+            response = self.session.get(url, params=params, headers=self.headers, timeout=timeout)
+            LIMITER.update(COMIC_VINE, endpoint, response.status_code, response.headers)
+            return response
+
+        try:
+            response = self.retry.call(
+                "GET",
+                attempt,
+                timeout=self.timeout,
+                describe=f"GET {endpoint}",
+                acquire=lambda: LIMITER.acquire(COMIC_VINE, endpoint),
+            )
+            response.raise_for_status()
+            return response.json()
+        except ConnectionError as err:
+            raise ServiceError(f"Unable to connect to `{url}`") from err
+        except HTTPError as err:
+            if err.response.status_code == 401:
+                raise AuthenticationError("Invalid API Key") from err
+            if err.response.status_code == 404:
+                raise ServiceError("Unknown endpoint") from err
+            if err.response.status_code >= 500:
+                raise ServiceError(
+                    f"Service error {err.response.status_code}, retry again in 30s"
+                ) from err
+            raise ServiceError(err.response.json()["error"]) from err
+        except JSONDecodeError as err:
+            raise ServiceError(f"Unable to parse response from `{url}` as Json") from err
+        except ReadTimeout as err:
+            raise ServiceError("Service took too long to respond") from err
+
+    def get_issue(self, issue_id: int) -> Issue:
+        """Request an issue with only the fields the importer reads. Other fields are empty."""
+        try:
+            result = self._get_request(
+                endpoint=f"/issue/{ComicvineResource.ISSUE.resource_id}-{issue_id}",
+                params={"field_list": CV_ISSUE_FIELDS},
+            )["results"]
+            return TypeAdapter(Issue).validate_python(result)
+        except ValidationError as err:
+            raise ServiceError(err) from err
+
+    def list_issue_summaries(
+        self, params: dict[str, Any] | None = None, max_results: int = 500
+    ) -> list[CVIssueSummary]:
+        """Request a list of issues with only their ID, number and volume name."""
+        results = self._retrieve_offset_results(
+            endpoint="/issues/",
+            params={**(params or {}), "field_list": CV_ISSUE_LIST_FIELDS},
+            max_results=max_results,
+        )
+        return [CVIssueSummary.from_json(result) for result in results]
+
+    def list_volume_summaries(
+        self, params: dict[str, Any] | None = None, max_results: int = 500
+    ) -> list[CVVolumeSummary]:
+        """Request a list of volumes with only the fields shown when picking one."""
+        results = self._retrieve_offset_results(
+            endpoint="/volumes/",
+            params={**(params or {}), "field_list": CV_VOLUME_FIELDS},
+            max_results=max_results,
+        )
+        return [CVVolumeSummary.from_json(result) for result in results]
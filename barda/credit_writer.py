@@ -0,0 +1,126 @@
+"""
+CreditWriter module.
+
+This module provides the following classes:
+
+- CreditResult
+- CreditWriter
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Callable
+
+from barda.exceptions import ApiError
+
+LOGGER = getLogger(__name__)
+
+
+@dataclass
+class CreditResult:
+    """Outcome of a single buffered credit row. ``ok`` is None until the row has been sent."""
+
+    row: dict[str, Any]
+    ok: bool | None = None
+    error: str | None = None
+
+
+class CreditWriter:
+    """
+    Buffer credit rows and send them to Metron as bulk posts.
+
+    Rows can come from several issues. The buffer is flushed once it holds ``max_rows`` rows or
+    its oldest row has waited ``max_wait`` seconds. If a bulk post is rejected the batch is split
+    in half and resent, so a bad row only fails itself.
+
+    Args:
+        send (Callable): Function that posts a list of credit rows to Metron.
+        max_rows (int): Maximum number of rows in one post.
+        max_wait (float): Maximum number of seconds a row waits in the buffer.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[dict[str, Any]]], Any],
+        max_rows: int = 50,
+        max_wait: float = 30.0,
+    ) -> None:
+        self.send = send
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.buffer: list[CreditResult] = []
+        self.callbacks: list[tuple[list[CreditResult], Callable[[list[CreditResult]], None]]] = []
+        self.oldest: float | None = None
+        self.lock = threading.Lock()
+
+    def add(
+        self,
+        rows: list[dict[str, Any]],
+        on_done: Callable[[list[CreditResult]], None] | None = None,
+    ) -> list[CreditResult]:
+        """
+        Add credit rows to the buffer.
+
+        Args:
+            rows (list): Credit rows, as accepted by the credit endpoint.
+            on_done (Callable, optional): Called with this call's results once they have been sent.
+
+        Returns:
+            A CreditResult for each row, filled in when the row is sent.
+        """
+        results = [CreditResult(row) for row in rows]
+        if not results:
+            return results
+
+        with self.lock:
+            self.buffer.extend(results)
+            if on_done is not None:
+                self.callbacks.append((results, on_done))
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            full = len(self.buffer) >= self.max_rows
+
+        if full:
+            self.flush()
+        else:
+            self.flush_due()
+        return results
+
+    def flush_due(self) -> None:
+        """Flush the buffer if its oldest row has waited longer than ``max_wait``."""
+        if self.oldest is not None and time.monotonic() - self.oldest >= self.max_wait:
+            self.flush()
+
+    def flush(self) -> list[CreditResult]:
+        """Send every buffered row and return their results."""
+        with self.lock:
+            pending, self.buffer = self.buffer, []
+            callbacks, self.callbacks = self.callbacks, []
+            self.oldest = None
+
+        for start in range(0, len(pending), self.max_rows):
+            end = start + self.max_rows
+            self._send(pending[start:end])
+
+        for results, on_done in callbacks:
+            on_done(results)
+        return pending
+
+    def _send(self, batch: list[CreditResult]) -> None:
+        try:
+            self.send([result.row for result in batch])
+        except ApiError as err:
+            if len(batch) > 1:
+                LOGGER.debug(f"Credit batch of {len(batch)} failed. Splitting it.")
+                middle = len(batch) // 2
+                self._send(batch[:middle])
+                self._send(batch[middle:])
+                return
+            batch[0].ok = False
+            batch[0].error = str(err)
+            return
+
+        for result in batch:
+            result.ok = True
@@ -0,0 +1,251 @@
+"""
+ComicvineCache module.
+
+This module provides the following classes:
+
+- ComicvineCache
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from barda.rate_limit import endpoint_from_url
+
+LOGGER = getLogger(__name__)
+
+ONE_HOUR = 60 * 60
+ONE_DAY = 24 * ONE_HOUR
+ONE_WEEK = 7 * ONE_DAY
+
+# Seconds a response is kept, by Comic Vine endpoint. People, characters and teams almost never
+# change, while issue lists grow as issues are added.
+DEFAULT_TTLS: dict[str, int] = {
+    "character": 4 * ONE_WEEK,
+    "characters": ONE_WEEK,
+    "issue": 3 * ONE_DAY,
+    "issues": 6 * ONE_HOUR,
+    "people": ONE_WEEK,
+    "person": 8 * ONE_WEEK,
+    "publisher": 8 * ONE_WEEK,
+    "publishers": ONE_WEEK,
+    "story_arc": 4 * ONE_WEEK,
+    "story_arcs": ONE_WEEK,
+    "team": 4 * ONE_WEEK,
+    "teams": ONE_WEEK,
+    "volume": ONE_WEEK,
+    "volumes": ONE_DAY,
+}
+DEFAULT_TTL = ONE_DAY
+
+# Default maximum size of the stored responses.
+MAX_BYTES = 512 * 1024 * 1024
+
+# The database is vacuumed when at least this share of it is free pages.
+COMPACT_RATIO = 0.25
+
+
+class ComicvineCache:
+    """
+    Persistent cache of Comic Vine responses, for use as a simyan Comicvine cache.
+
+    Responses expire after a per-endpoint TTL. When the stored responses grow past ``max_bytes``
+    the least recently used ones are evicted, and the database is vacuumed once enough of it is
+    free space. Access is serialized, so one cache can be shared by the prefetch threads.
+
+    A read-only cache, used by --offline, serves responses whatever their age and is never
+    changed. Responses in the table of the simyan SQLiteCache this replaces are moved over the
+    first time the database is opened for writing.
+
+    Args:
+        db_name (str): Path and database name to use.
+        ttls (dict, optional): Seconds a response is kept, by endpoint.
+        max_bytes (int): Maximum size of the stored responses.
+        read_only (bool): Serve stored responses regardless of age and don't change the cache.
+    """
+
+    def __init__(
+        self,
+        db_name: str | Path = "cv.db",
+        ttls: dict[str, int] | None = None,
+        max_bytes: int = MAX_BYTES,
+        read_only: bool = False,
+    ) -> None:
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if read_only:
+            self.con = self._connect_read_only(Path(db_name))
+        else:
+            self.con = sqlite3.connect(db_name, check_same_thread=False)
+            self._create_tables()
+            self._migrate()
+            self.delete()
+            self.compact()
+        # Size of the stored responses, kept up to date so inserts don't have to sum it.
+        with self.lock:
+            self.total = self.con.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def _create_tables(self) -> None:
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(query PRIMARY KEY, endpoint, json, size, stored, accessed)"
+            )
+            self.con.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def _connect_read_only(self, db_name: Path) -> sqlite3.Connection:
+        """Open the database read-only, or an empty in-memory cache if it has no responses."""
+        if db_name.exists():
+            con = sqlite3.connect(
+                f"{db_name.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+            )
+            if con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'responses'"
+            ).fetchone():
+                return con
+            con.close()
+        LOGGER.warning(f"There are no cached Comic Vine responses in '{db_name}'.")
+        self.con = sqlite3.connect(":memory:", check_same_thread=False)
+        self._create_tables()
+        return self.con
+
+    def _migrate(self) -> None:
+        """Move the responses of simyan's SQLiteCache ``queries`` table into ``responses``."""
+        with self.lock, self.con:
+            if not self.con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'queries'"
+            ).fetchone():
+                return
+            rows = self.con.execute("SELECT query, response, query_date FROM queries").fetchall()
+            migrated = []
+            for query, response, query_date in rows:
+                try:
+                    stored = datetime.fromisoformat(query_date).timestamp()
+                except (TypeError, ValueError):
+                    continue
+                migrated.append(
+                    (
+                        query,
+                        endpoint_from_url(query, "/api/"),
+                        response,
+                        len(response),
+                        stored,
+                        stored,
+                    )
+                )
+            self.con.executemany(
+                "INSERT OR IGNORE INTO responses (query, endpoint, json, size, stored, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                migrated,
+            )
+            self.con.execute("DROP TABLE queries")
+        LOGGER.info(f"Moved {len(migrated)} of {len(rows)} responses from the simyan cache.")
+
+    def _ttl(self, endpoint: str) -> float:
+        if self.read_only:
+            return float("inf")
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def select(self, query: str) -> dict[str, Any]:
+        """Return a fresh response, or an empty dict if there isn't one."""
+        endpoint = endpoint_from_url(query, "/api/")
+        now = time.time()
+        with self.lock, self.con:
+            row = self.con.execute(
+                "SELECT json FROM responses WHERE query = ? AND stored >= ?",
+                (query, now - self._ttl(endpoint)),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return {}
+            self.hits += 1
+            if not self.read_only:
+                self.con.execute("UPDATE responses SET accessed = ? WHERE query = ?", (now, query))
+        return json.loads(row[0])
+
+    def insert(self, query: str, response: dict[str, Any]) -> None:
+        """Save a response, evicting the least recently used ones if the cache is full."""
+        if self.read_only:
+            return
+        data = json.dumps(response)
+        now = time.time()
+        with self.lock, self.con:
+            old = self.con.execute(
+                "SELECT size FROM responses WHERE query = ?", (query,)
+            ).fetchone()
+            self.con.execute(
+                "INSERT OR REPLACE INTO responses (query, endpoint, json, size, stored, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (query, endpoint_from_url(query, "/api/"), data, len(data), now, now),
+            )
+            self.total += len(data) - (old[0] if old else 0)
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop the least recently used responses until the cache is under 90% of ``max_bytes``.
+
+        Returns:
+            The number of responses dropped.
+        """
+        if self.total <= self.max_bytes:
+            return 0
+        target = self.total - int(self.max_bytes * 0.9)
+        dropped = []
+        with self.lock, self.con:
+            for query, size in self.con.execute(
+                "SELECT query, size FROM responses ORDER BY accessed"
+            ).fetchall():
+                if target <= 0:
+                    break
+                dropped.append((query,))
+                target -= size
+                self.total -= size
+            self.con.executemany("DELETE FROM responses WHERE query = ?", dropped)
+            self.evictions += len(dropped)
+        LOGGER.info(f"Evicted {len(dropped)} Comic Vine responses to stay under the size cap.")
+        self.compact()
+        return len(dropped)
+
+    def delete(self) -> None:
+        """Remove all expired responses."""
+        now = time.time()
+        with self.lock, self.con:
+            endpoints = [
+                row[0] for row in self.con.execute("SELECT DISTINCT endpoint FROM responses")
+            ]
+            for endpoint in endpoints:
+                self.con.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND stored < ?",
+                    (endpoint, now - self._ttl(endpoint)),
+                )
+
+    def compact(self) -> bool:
+        """Vacuum the database if enough of it is free pages. Returns True if it was."""
+        with self.lock:
+            pages = self.con.execute("PRAGMA page_count").fetchone()[0]
+            free = self.con.execute("PRAGMA freelist_count").fetchone()[0]
+            if not pages or free / pages < COMPACT_RATIO:
+                return False
+            self.con.execute("VACUUM")
+        LOGGER.debug(f"Compacted the Comic Vine cache: {free} of {pages} pages were free.")
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit, miss and eviction counters."""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,92 @@
+"""
+VolumeWarmer module.
+
+This module provides the following classes:
+
+- VolumeWarmer
+"""
+
+from logging import getLogger
+from typing import Any, Callable
+
+from requests.exceptions import JSONDecodeError
+from simyan.exceptions import ServiceError
+
+from barda.comicvine_session import ComicvineSession
+from barda.image_cache import ImageCache
+
+LOGGER = getLogger(__name__)
+
+# Issue attribute and session method of each kind of resource an issue references.
+REFERENCED: dict[str, tuple[str, str]] = {
+    "creator": ("creators", "get_creator"),
+    "character": ("characters", "get_character"),
+    "team": ("teams", "get_team"),
+    "arc": ("story_arcs", "get_story_arc"),
+}
+
+
+class VolumeWarmer:
+    """
+    Fill the Comic Vine caches with everything importing a volume reads.
+
+    A volume's issue list, every issue, every creator, character, team and story arc they
+    reference, and the original covers are fetched with the same requests ComicVineImporter
+    makes, so an import of the volume afterwards is served from cv.db and the image cache. The
+    requests go through the shared rate limiter, so a large batch waits for Comic Vine's hourly
+    budget instead of being throttled. Meant to be run ahead of an import with --warm-volumes.
+
+    Args:
+        cv (ComicvineSession): Session to fetch with. It should use the importer's cache.
+        images (ImageCache): Where the covers are saved.
+    """
+
+    def __init__(self, cv: ComicvineSession, images: ImageCache) -> None:
+        self.cv = cv
+        self.images = images
+        # Resources already fetched in this batch, by kind.
+        self.seen: dict[str, set[int]] = {kind: set() for kind in REFERENCED}
+
+    def _get(self, fetch: Callable[[int], Any], cv_id: int, counts: dict[str, int]) -> Any:
+        try:
+            return fetch(cv_id)
+        except (ServiceError, JSONDecodeError) as err:
+            LOGGER.warning(f"Unable to warm {fetch.__name__}({cv_id}): {err}")
+            counts["errors"] += 1
+            return None
+
+    def warm(self, volume_id: int) -> dict[str, int]:
+        """
+        Fetch everything importing a volume needs.
+
+        Args:
+            volume_id (int): The Comic Vine volume ID.
+
+        Returns:
+            The number of issues, covers and referenced resources fetched, and of errors.
+        """
+        counts = {"issue": 0, "cover": 0, **{kind: 0 for kind in REFERENCED}, "errors": 0}
+        try:
+            issues = self.cv.list_issue_summaries(
+                params={"filter": f"volume:{volume_id}", "sort": "cover_date:asc"},
+                max_results=1500,
+            )
+        except (ServiceError, JSONDecodeError) as err:
+            LOGGER.warning(f"Unable to warm the issue list of volume {volume_id}: {err}")
+            counts["errors"] += 1
+            return counts
+
+        for summary in issues:
+            if (issue := self._get(self.cv.get_issue, summary.id, counts)) is None:
+                continue
+            counts["issue"] += 1
+            if issue.image.original_url and self.images.fetch(issue.image.original_url):
+                counts["cover"] += 1
+            for kind, (attribute, method) in REFERENCED.items():
+                for entry in getattr(issue, attribute):
+                    if entry.id in self.seen[kind]:
+                        continue
+                    self.seen[kind].add(entry.id)
+                    if self._get(getattr(self.cv, method), entry.id, counts) is not None:
+                        counts[kind] += 1
+        return counts
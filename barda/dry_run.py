@@ -0,0 +1,168 @@
+"""
+Dry run module.
+
+This module provides the following classes:
+
+- PayloadRecorder
+
+and ``replay_journal()`` to resend a recorded journal to a stub server.
+"""
+
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from barda.multipart import MultipartStream
+
+LOGGER = getLogger(__name__)
+
+
+def _form_dict(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+    """Collect form fields, turning repeated fields into lists."""
+    result: dict[str, Any] = {}
+    for key, value in pairs:
+        if key in result:
+            if not isinstance(result[key], list):
+                result[key] = [result[key]]
+            result[key].append(value)
+        else:
+            result[key] = value
+    return result
+
+
+class PayloadRecorder(BaseAdapter):
+    """
+    Transport adapter that records requests to a JSONL journal instead of sending them.
+
+    Mounted on the PostData session, every write is captured with the payload Metron would have
+    received and answered with a synthetic response. Created resources are given negative IDs, so
+    they can't be mistaken for real Metron IDs.
+
+    Args:
+        journal (Path): The JSONL file to append the requests to.
+    """
+
+    def __init__(self, journal: Path) -> None:
+        super(PayloadRecorder, self).__init__()
+        self.journal = journal
+        self.ids = itertools.count(-1, -1)
+        self.lock = threading.Lock()
+        self.journal.parent.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _payload(request: requests.PreparedRequest) -> tuple[Any, str | None, int]:
+        body = request.body
+        if isinstance(body, MultipartStream):
+            return _form_dict(body.fields), body.image_name, body.file_size
+        if body is None:
+            return {}, None, 0
+        if isinstance(body, bytes):
+            body = body.decode()
+        if request.headers.get("Content-Type") == "application/json":
+            return json.loads(body), None, 0
+        return _form_dict(parse_qsl(body, keep_blank_values=True)), None, 0
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        response = requests.Response()
+        response.request = request
+        response.url = request.url or ""
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        if request.method not in ("POST", "PATCH"):
+            response.status_code = 200
+            response._content = b"{}"
+            return response
+
+        data, image, image_size = self._payload(request)
+        path = [p for p in urlparse(request.url).path.split("/") if p]
+        endpoint = path[1:]  # Drop the "api" prefix.
+        with self.lock:
+            if isinstance(data, list):
+                result: Any = [{"id": next(self.ids), **row} for row in data]
+                metron_id = None
+            else:
+                metron_id = int(endpoint[1]) if len(endpoint) > 1 else next(self.ids)
+                result = {**data, "id": metron_id}
+            record = {
+                "time": datetime.now(tz=timezone.utc).isoformat(),
+                "method": request.method,
+                "endpoint": endpoint,
+                "id": metron_id,
+                "data": data,
+                "image": image,
+                "image_size": image_size,
+            }
+            with self.journal.open("a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        LOGGER.debug(f"Recorded {request.method} {'/'.join(endpoint)}")
+
+        response.status_code = 201 if request.method == "POST" else 200
+        response._content = json.dumps(result, default=str).encode()
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def _replay_record(
+    session: requests.Session, base_url: str, auth: tuple[str, str], record: dict[str, Any]
+) -> int:
+    url = f"{base_url.rstrip('/')}/api/{'/'.join(str(e) for e in record['endpoint'])}/"
+    if isinstance(record["data"], list):
+        response = session.request(record["method"], url, json=record["data"], auth=auth)
+    else:
+        data = record["data"]
+        if record["image"]:
+            # Only the image size is recorded, so send a placeholder of the same size.
+            image = (record["image"], b"\0" * record["image_size"])
+            data = MultipartStream(data, image)
+            headers = {"Content-Type": data.content_type}
+        else:
+            headers = {}
+        response = session.request(record["method"], url, data=data, headers=headers, auth=auth)
+    return response.status_code
+
+
+def replay_journal(
+    journal: Path, base_url: str, auth: tuple[str, str] = ("", ""), workers: int = 4
+) -> dict[str, Any]:
+    """
+    Resend a recorded journal to a stub server and measure the write throughput.
+
+    Args:
+        journal (Path): A journal written by PayloadRecorder.
+        base_url (str): The stub server, e.g. "http://localhost:8000".
+        auth (tuple): The user and password to send.
+        workers (int): Number of concurrent connections.
+
+    Returns:
+        A dict with the number of requests, errors, elapsed seconds and requests per second.
+    """
+    with journal.open() as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    session = requests.Session()
+    session.mount("http", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(
+            pool.map(lambda record: _replay_record(session, base_url, auth, record), records)
+        )
+    elapsed = time.perf_counter() - start
+    session.close()
+    return {
+        "requests": len(statuses),
+        "errors": sum(status >= 400 for status in statuses),
+        "seconds": elapsed,
+        "per_second": len(statuses) / elapsed if elapsed else 0.0,
+    }
@@ -4,3 +4,7 @@ class ApiError(Exception):
     def __init__(self, *args, **kwargs):
         """Initialize an ApiError."""
         Exception.__init__(self, *args, **kwargs)
+
+
+class ApiConnectionError(ApiError):
+    """Class for connection errors, where it's unknown whether Metron received the request."""
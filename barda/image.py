@@ -1,6 +1,7 @@
 from enum import Enum, auto, unique
 from logging import getLogger
 from pathlib import Path
+from typing import BinaryIO
 
 from PIL import Image, UnidentifiedImageError
 
@@ -19,12 +20,38 @@ class ImageShape(Enum):
 
 
 class CVImage:
-    def __init__(self, img: Path) -> None:
+    """
+    Resize an image for Metron.
+
+    Args:
+        img (Path | BinaryIO): The image file, or a binary buffer with a ``name`` attribute. A
+            buffer is resized in place, so it can be uploaded without being written to disk.
+    """
+
+    def __init__(self, img: Path | BinaryIO) -> None:
         self.image = img
+        self.format = Image.registered_extensions().get(Path(img.name).suffix.lower())
+
+    def _open(self) -> Image.Image:
+        if not isinstance(self.image, Path):
+            self.image.seek(0)
+        return Image.open(self.image)
+
+    def _save(self, img: Image.Image) -> None:
+        if isinstance(self.image, Path):
+            img.save(self.image)
+            return
+        img.load()
+        self.image.seek(0)
+        self.image.truncate()
+        try:
+            img.save(self.image, format=self.format)
+        finally:
+            self.image.seek(0)
 
     def _determine_shape(self) -> ImageShape | None:
         try:
-            i = Image.open(self.image)
+            i = self._open()
         except UnidentifiedImageError:
             LOGGER.error("Cannot identify image: '%s'", self.image.name)
             return None
@@ -41,13 +68,13 @@ class CVImage:
 
     def _convert_to_rgb(self) -> None:
         LOGGER.debug("Entering covert_to_rgb()...")
-        with Image.open(self.image) as img:
+        with self._open() as img:
             mode = img.mode
             LOGGER.debug(f"Image '{self.image.name}' mode is '{mode}'.")
             if mode in ("RGBA", "P"):
                 img = img.convert("RGB")
                 try:
-                    img.save(self.image)
+                    self._save(img)
                 except ValueError as e:
                     LOGGER.error(f"Failed to covert image to rgb: {e}")
         LOGGER.debug("Exiting convert_to_rbg()...")
@@ -58,7 +85,7 @@ class CVImage:
             # Cover needs to be cropped
             return
         self._convert_to_rgb()
-        with Image.open(self.image) as i:
+        with self._open() as i:
             w, h = i.size
             if w == COVER_WIDTH:
                 # No need to resize
@@ -66,7 +93,7 @@ class CVImage:
             wpercent = COVER_WIDTH / float(w)
             hsize = int(float(h) * float(wpercent))
             i = i.resize((COVER_WIDTH, hsize), Image.Resampling.LANCZOS)
-            i.save(self.image)
+            self._save(i)
 
     def resize_creator(self) -> None:  # sourcery skip: extract-duplicate-method
         LOGGER.debug("Entering resize_creator()...")
@@ -77,23 +104,23 @@ class CVImage:
         if shape is None:
             return
 
-        with Image.open(self.image) as i:
+        with self._open() as i:
             w, h = i.size
             LOGGER.debug(f"'{self.image.name}' - shape: {shape}, width: {w}, height: {h}.")
             match shape:
                 case ImageShape.Square:
                     if w != CREATOR_WIDTH:
                         i = i.resize((CREATOR_WIDTH, CREATOR_WIDTH), Image.Resampling.LANCZOS)
-                        i.save(self.image)
+                        self._save(i)
                 case ImageShape.Tall:
                     img = i.crop((left, top, w, w))
                     img = img.resize((CREATOR_WIDTH, CREATOR_WIDTH), Image.Resampling.LANCZOS)
-                    img.save(self.image)
+                    self._save(img)
                 case ImageShape.Wide:
                     # TODO: Need to center crop this
                     img = i.crop((top, left, h, h))
                     img = img.resize((CREATOR_WIDTH, CREATOR_WIDTH), Image.Resampling.LANCZOS)
-                    img.save(self.image)
+                    self._save(img)
                 case _:
                     return
 
@@ -105,7 +132,7 @@ class CVImage:
             return
 
         self._convert_to_rgb()
-        with Image.open(self.image) as i:
+        with self._open() as i:
             w, h = i.size
             top = 0
             match shape:
@@ -114,7 +141,7 @@ class CVImage:
                     hsize = int(float(h) * float(wpercent))
                     i = i.resize((RESOURCE_WIDTH, hsize), Image.Resampling.LANCZOS)
                     try:
-                        i.save(self.image)
+                        self._save(i)
                     except ValueError:
                         return
                 case ImageShape.Wide | ImageShape.Square:
@@ -128,7 +155,7 @@ class CVImage:
                     hsize = int(float(h) * float(wpercent))
                     i = i.resize((RESOURCE_WIDTH, hsize), Image.Resampling.LANCZOS)
                     try:
-                        i.save(self.image)
+                        self._save(i)
                     except ValueError:
                         return
                 case _:
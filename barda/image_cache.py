@@ -0,0 +1,112 @@
+"""
+ImageCache module.
+
+This module provides the following classes:
+
+- ImageCache
+"""
+
+import hashlib
+from logging import getLogger
+from pathlib import Path
+
+import requests
+
+LOGGER = getLogger(__name__)
+
+# Default maximum size of the stored images.
+MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class ImageCache:
+    """
+    Folder of Comic Vine images downloaded ahead of an import, e.g. by --warm-volumes.
+
+    Images are stored as downloaded, before they are resized, under a hash of their URL. Imports
+    read them with ``get()`` and keep images they download themselves in memory. When the folder
+    grows past ``max_bytes`` the least recently stored images are removed.
+
+    Args:
+        folder (Path): Folder to keep the images in. It's created when the first image is saved.
+        max_bytes (int): Maximum size of the stored images.
+    """
+
+    def __init__(self, folder: str | Path = "images", max_bytes: int = MAX_BYTES) -> None:
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+        # Size of the stored images, summed when the first image is saved.
+        self.total: int | None = None
+
+    def _path(self, url: str) -> Path:
+        return self.folder / f"{hashlib.sha1(url.encode()).hexdigest()}{Path(url).suffix}"
+
+    def get(self, url: str) -> bytes | None:
+        """Return a stored image, or None if it hasn't been downloaded."""
+        try:
+            return self._path(url).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url: str, content: bytes) -> None:
+        """Save an image, removing the oldest ones if the folder is over ``max_bytes``."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        if self.total is None:
+            self.total = sum(path.stat().st_size for path in self.folder.iterdir())
+        path = self._path(url)
+        if path.exists():
+            self.total -= path.stat().st_size
+        path.write_bytes(content)
+        self.total += len(content)
+        if self.total > self.max_bytes:
+            self.prune()
+
+    @staticmethod
+    def download(url: str) -> bytes | None:
+        """Download an image without saving it. Returns None if it couldn't be downloaded."""
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            LOGGER.warning(f"Unable to download {url}: {repr(e)}")
+            return None
+        return response.content
+
+    def fetch(self, url: str) -> bytes | None:
+        """
+        Return an image, downloading and saving it if it isn't stored yet.
+
+        Returns:
+            The image, or None if it couldn't be downloaded.
+        """
+        if (content := self.get(url)) is not None:
+            return content
+        if (content := self.download(url)) is not None:
+            self.put(url, content)
+        return content
+
+    def prune(self) -> int:
+        """
+        Remove the oldest images until the folder is under ``max_bytes``.
+
+        Returns:
+            The number of images removed.
+        """
+        if not self.folder.exists():
+            return 0
+        files = sorted(
+            (path.stat().st_mtime, path.stat().st_size, path)
+            for path in self.folder.iterdir()
+            if path.is_file()
+        )
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self.total = total
+        if removed:
+            LOGGER.info(f"Removed {removed} images to stay under the image cache's size cap.")
+        return removed
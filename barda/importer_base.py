@@ -1,26 +1,37 @@
+from concurrent.futures import Future
 from enum import Enum, unique
 from logging import getLogger
-from tempfile import TemporaryDirectory
-from typing import List
+from typing import Any, Callable, Coroutine, List
 
 import questionary
-from mokkari import api
+from mokkari import exceptions
 from mokkari.schemas.base import BaseResource
 from mokkari.schemas.generic import GenericItem
 from mokkari.schemas.issue import BaseIssue, Issue
 from mokkari.schemas.reprint import Reprint
-from mokkari.session import Session
 
 from barda import __version__
+from barda.async_post_data import AsyncPostData
+from barda.exceptions import ApiError
 from barda.gcd.db import DB, GcdReprintIssue
+from barda.issue_index import normalize_number
+from barda.metron_cache import MetronCache
+from barda.metron_session import MetronSession
+from barda.outbox import Outbox, OutboxEntry
 from barda.post_data import PostData
+from barda.prefetch import prefetch
+from barda.reference_data import ReferenceData
 from barda.resource_keys import ResourceKeys, Resources
+from barda.retry import RetryPolicy
 from barda.settings import BardaSettings
 from barda.styles import Styles
 from barda.validators import YearValidator
 
 LOGGER = getLogger(__name__)
 
+# Resources whose patches are checked against Metron before they are resent.
+PATCHED_RESOURCES = frozenset({"arc", "character", "creator", "issue", "series", "team"})
+
 
 @unique
 class MetronGenres(Enum):
@@ -42,24 +53,54 @@ class MetronGenres(Enum):
 
 
 class BaseImporter:
-    def __init__(self, config: BardaSettings) -> None:
-        self.image_dir = TemporaryDirectory()
-        self.barda = PostData(config.metron_user, config.metron_password)
-        self.metron: Session = api(
-            config.metron_user, config.metron_password, user_agent=f"Barda/{__version__}"
+    def __init__(self, config: BardaSettings, reference: ReferenceData | None = None) -> None:
+        self.outbox = Outbox(config.conversions)
+        self.retry = RetryPolicy(attempts=config.retry_attempts, deadline=config.retry_deadline)
+        self.offline = config.offline
+        self.dry_run = config.dry_run is not None
+        self.metron_cache = MetronCache(config.metron_cache, read_only=self.offline)
+        self.barda = PostData(
+            config.metron_user,
+            config.metron_password,
+            pool_size=config.pool_size,
+            warm_up=config.warm_up and not self.offline,
+            outbox=self.outbox,
+            journal=config.dry_run,
+            retry=self.retry,
+            read_cache=self.metron_cache,
+        )
+        self.async_barda = AsyncPostData(self.barda, max_in_flight=config.pool_size)
+        # Writes submitted to async_barda that haven't been reported yet.
+        self.pending_writes: list[tuple[Future, Callable[[Future], None]]] = []
+        self.metron = MetronSession(
+            config.metron_user,
+            config.metron_password,
+            cache=self.metron_cache,
+            user_agent=f"Barda/{__version__}",
+            retry=self.retry,
+            offline=self.offline,
         )
-        self.series_type: GenericItem | None = None
+        # Series types, universes, publishers and roles. Normally shared by the Runner.
+        self.reference = reference or ReferenceData(config.reference_data)
+        self.series_type: list[GenericItem] | None = None
         self.publishers: list[BaseResource] = []
         self.universes: list[BaseResource] = []
         self.conversions = ResourceKeys(str(config.conversions))
-        # List of GCD issues not on Metron.
-        self.missing_issue: set[int] = set()
+        # Seconds a GCD issue that wasn't found on Metron is skipped. See _is_missing().
+        self.missing_ttl = config.gcd_missing_ttl
+        # Issues of the series reprints point to, by series name and year and then issue number.
+        # None if the name didn't resolve to a single Metron series.
+        self.reprint_series: dict[tuple[str, int | None], dict[str, list[BaseIssue]] | None] = {}
+        self.prefetch_workers = config.pool_size
 
     def __enter__(self):
+        self._resume_outbox()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.image_dir.cleanup()
+        self._finish_writes(wait=True)
+        self.async_barda.close()
+        self.barda.close()
 
     ########
     # Misc #
@@ -75,12 +116,125 @@ class BaseImporter:
         choices.append(questionary.Choice(title="None", value=""))
         return choices
 
+    ##################
+    # Pending Writes #
+    ##################
+    def _submit_write(
+        self, coro: Coroutine[Any, Any, Any], on_done: Callable[[Future], None]
+    ) -> None:
+        """Send a write in the background. `on_done` is called from `_finish_writes()`."""
+        self.pending_writes.append((self.async_barda.submit(coro), on_done))
+
+    def _finish_writes(self, wait: bool = False) -> None:
+        """
+        Report on background writes.
+
+        Callbacks are run on the calling thread, so they can safely print and update the
+        conversions database. A callback that fails is logged, and the other writes are still
+        reported.
+
+        Args:
+            wait (bool): Block until every pending write has finished.
+        """
+        still_pending = []
+        for future, on_done in self.pending_writes:
+            if wait or future.done():
+                future.exception()  # Blocks until the write has finished.
+                try:
+                    on_done(future)
+                except Exception:  # noqa: B902
+                    LOGGER.exception("Unable to report a background write.")
+            else:
+                still_pending.append((future, on_done))
+        self.pending_writes = still_pending
+
+    ##########
+    # Outbox #
+    ##########
+    def _resume_outbox(self) -> None:
+        """Offer to finish the writes an interrupted run left in the outbox."""
+        if not (entries := self.outbox.pending()):
+            return
+        questionary.print(
+            f"Found {len(entries)} unconfirmed writes from a previous run.", style=Styles.WARNING
+        )
+        if self.offline or self.dry_run:
+            # They can't be checked against Metron or sent, so the next normal run offers them.
+            questionary.print("They'll be resumed by a run that writes to Metron.")
+            return
+        if not questionary.confirm("Do you want to resume them?").ask():
+            self.outbox.discard()
+            return
+
+        for entry in entries:
+            try:
+                # A write that reached Metron before the run stopped didn't invalidate the cached
+                # responses it changed, so the check reads from Metron.
+                with self.metron.revalidate():
+                    metron_id = self._find_existing(entry)
+                if metron_id is not None:
+                    LOGGER.debug(f"Outbox entry {entry.id} was already written: {metron_id}")
+                    self.outbox.finish(entry.id, metron_id)
+                    continue
+                self.barda.replay(entry)
+            except (ApiError, exceptions.ApiError) as err:
+                # A failed check leaves the entry pending for the next run.
+                questionary.print(f"Failed to resume {entry.ref or entry.endpoint}: {err}")
+                continue
+            questionary.print(f"Resumed {entry.ref or entry.endpoint}.", style=Styles.SUCCESS)
+
+    def _find_existing(self, entry: OutboxEntry) -> int | None:
+        """
+        Return the Metron ID if an unconfirmed create or patch already reached Metron.
+
+        Duplicate credits and variants are rejected by Metron, so those are always resent.
+        """
+        if not isinstance(entry.data, dict):
+            return None
+        if entry.action == "Patch":
+            return self._patch_applied(entry)
+        if entry.action != "Post":
+            return None
+        resource = entry.endpoint[0]
+        data = entry.data
+        if resource == "issue":
+            issues = self.metron.issues_list(
+                params={"series_id": data["series"], "number": data["number"]}
+            )
+            return issues[0].id if issues else None
+        if resource in ["arc", "character", "creator", "team"] and data.get("cv_id"):
+            key = getattr(Resources, resource.capitalize()).value
+            if (metron_id := self.conversions.get_cv(key, data["cv_id"])) is not None:
+                return metron_id
+            results = getattr(self.metron, f"{resource}s_list")(params={"name": data["name"]})
+            matches = [r for r in results if r.name == data["name"]]
+            return matches[0].id if len(matches) == 1 else None
+        return None
+
+    def _patch_applied(self, entry: OutboxEntry) -> int | None:
+        """Return the Metron ID if every field of an unconfirmed patch already has its value."""
+        resource, metron_id = entry.endpoint[0], entry.endpoint[-1]
+        if resource not in PATCHED_RESOURCES or not isinstance(metron_id, int):
+            return None
+        current = getattr(self.metron, resource)(metron_id)
+        for field, value in entry.data.items():
+            if field == "image":
+                continue
+            existing = getattr(current, field, None)
+            if isinstance(value, list) and isinstance(existing, list):
+                existing = [getattr(item, "id", item) for item in existing]
+                if sorted(existing) != sorted(value):
+                    return None
+            elif getattr(existing, "id", existing) != value:
+                return None
+        return metron_id
+
     ###############
     # Series Type #
     ###############
     def _choose_series_type(self) -> int:
         if self.series_type is None:
-            self.series_type = self.metron.series_type_list()
+            self.series_type = self.reference.get("series_type", self.metron)
         choices = []
         for s in self.series_type:
             choice = questionary.Choice(title=s.name, value=s.id)
@@ -92,7 +246,7 @@ class BaseImporter:
     #############
     def _choose_universes(self) -> list[int]:
         if not self.universes:
-            self.universes = self.metron.universes_list()
+            self.universes = self.reference.get("universe", self.metron)
         choices = []
         for u in self.universes:
             choice = questionary.Choice(title=u.name, value=u.id)
@@ -115,7 +269,7 @@ class BaseImporter:
     #############
     def _choose_publisher(self) -> int:
         if not self.publishers:
-            self.publishers = self.metron.publishers_list()
+            self.publishers = self.reference.get("publisher", self.metron)
         choices = []
         for p in self.publishers:
             choice = questionary.Choice(title=p.name, value=p.id)
@@ -174,6 +328,72 @@ class BaseImporter:
             questionary.print(f"Found match for '{item}'", style=Styles.SUCCESS)
         return metron_reprints_lst
 
+    def _is_missing(self, gcd_id: int) -> bool:
+        """Return whether a GCD reprint wasn't found on Metron, in this run or a recent one."""
+        return self.conversions.is_missing_gcd(gcd_id, self.missing_ttl)
+
+    def _mark_missing(self, gcd_id: int) -> None:
+        """Remember a GCD reprint that isn't on Metron, for this run and the following ones."""
+        self.conversions.store_missing_gcd(gcd_id)
+
+    def _resolve_series(self, series_name: str, year_began: int | None) -> int | None:
+        """Return the ID of the one Metron series with this name and start year, if there is one."""
+        params: dict[str, str | int] = {"name": series_name}
+        if year_began:
+            params["year_began"] = year_began
+        # Metron's name filter is a contains match, so keep only the series with this exact name.
+        matches = [
+            series.id
+            for series in self.metron.series_list(params)
+            if series.display_name.rsplit(" (", 1)[0].casefold() == series_name.casefold()
+            and (not year_began or series.year_began == year_began)
+        ]
+        return matches[0] if len(matches) == 1 else None
+
+    def _series_issues(self, series: tuple[str, int | None]) -> dict[str, list[BaseIssue]] | None:
+        """
+        Return the issues of a series, by number, fetching them once per run.
+
+        Args:
+            series (tuple): The series name and start year.
+
+        Returns:
+            The issues, or None if the name doesn't resolve to a single Metron series.
+        """
+        key = (series[0].casefold(), series[1])
+        if key not in self.reprint_series:
+            issues: dict[str, list[BaseIssue]] | None = None
+            if (series_id := self._resolve_series(*series)) is not None:
+                issues = {}
+                for issue in self.metron.issues_list({"series_id": series_id}):
+                    issues.setdefault(normalize_number(issue.number), []).append(issue)
+            self.reprint_series[key] = issues
+        return self.reprint_series[key]
+
+    def _load_reprint_series(self, gcd_reprints_lst: list[GcdReprintIssue]) -> None:
+        """Fetch the issue lists of the series the reprints point to that aren't loaded yet."""
+        series = {
+            (item.series, item.year_began)
+            for item in gcd_reprints_lst
+            if item.series
+            and (item.series.casefold(), item.year_began) not in self.reprint_series
+            and not self._is_missing(item.id_)
+            and self.conversions.get_gcd(Resources.Issue.value, item.id_) is None
+        }
+        for _ in prefetch(
+            sorted(series, key=str), self._series_issues, workers=self.prefetch_workers
+        ):
+            pass
+
+    def _reprint_candidates(self, item: GcdReprintIssue) -> list[BaseIssue]:
+        """Return the Metron issues with the series name and number of a GCD reprint."""
+        if not item.series:
+            return self.metron.issues_list({"number": item.number})
+        issues = self._series_issues((item.series, item.year_began))
+        if issues is None:
+            return self.metron.issues_list({"series_name": item.series, "number": item.number})
+        return issues.get(normalize_number(item.number), [])
+
     def get_metron_reprint(
         self, gcd_reprints_lst: list[GcdReprintIssue], issue: Issue | None = None
     ) -> list[int]:
@@ -183,12 +403,13 @@ class BaseImporter:
                 self._create_metron_reprint_lst(issue.reprints) if issue.reprints else []
             )
 
+        self._load_reprint_series(gcd_reprints_lst)
         for item in gcd_reprints_lst:
             questionary.print(
                 f"Searching for reprint issue: '{item}'{' (Collection)' if item.collection else ''}",
             )
             # Let's check to see if we've already searched for it.
-            if self.missing_issue and item.id_ in self.missing_issue:
+            if self._is_missing(item.id_):
                 questionary.print(
                     f"Already searched for '{item}'. Skipping...", style=Styles.WARNING
                 )
@@ -202,9 +423,7 @@ class BaseImporter:
                 )
                 continue
 
-            if issues_lst := self.metron.issues_list(
-                {"series_name": item.series, "number": item.number}
-            ):
+            if issues_lst := self._reprint_candidates(item):
                 # If only one result, let's check if it's match.
                 single_issue = issues_lst[0]
                 if len(issues_lst) == 1 and str(item).lower() == single_issue.issue_name.lower():
@@ -250,7 +469,7 @@ class BaseImporter:
                 # Ok, no exact match, let's ask the user.
                 choices = self._create_issue_choices(issues_lst)
                 if choices is None:
-                    self.missing_issue.add(item.id_)
+                    self._mark_missing(item.id_)
                     questionary.print(f"No issues found for '{item}'", style=Styles.WARNING)
                     continue
 
@@ -272,11 +491,11 @@ class BaseImporter:
                     metron_reprints_lst.append(result)
                 else:
                     # If user selected None, let's not search for it again.
-                    self.missing_issue.add(item.id_)
+                    self._mark_missing(item.id_)
                     continue
             else:
                 # Nothing found let's not search for the item again.
-                self.missing_issue.add(item.id_)
+                self._mark_missing(item.id_)
 
         return metron_reprints_lst
 
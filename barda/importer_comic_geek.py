@@ -1,6 +1,7 @@
 import uuid
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
+from io import BytesIO
 from pathlib import Path
 from typing import Any, List
 
@@ -15,6 +16,7 @@ from barda.exceptions import ApiError
 from barda.gcd.gcd_issue import Rating
 from barda.image import CVImage
 from barda.importer_base import BaseImporter
+from barda.reference_data import ReferenceData
 from barda.settings import BardaSettings
 from barda.styles import Styles
 from barda.utils import clean_search_series_title
@@ -22,23 +24,22 @@ from barda.validators import NumberValidator
 
 
 class GeeksImporter(BaseImporter):
-    def __init__(self, config: BardaSettings) -> None:
-        super(GeeksImporter, self).__init__(config)
+    def __init__(self, config: BardaSettings, reference: ReferenceData | None = None) -> None:
+        super(GeeksImporter, self).__init__(config, reference)
         self.locg: Comic_Geeks | None = None
 
-    def _get_cover(self, url: str, variant: bool = False) -> str:
+    def _get_cover(self, url: str, variant: bool = False) -> BytesIO:
         receive = requests.get(url)
         img = Path(url)
         ext = img.suffix.split("?")
-        new_fn = f"{uuid.uuid4().hex}{ext[0]}"
-        img_file = Path(self.image_dir.name) / new_fn
-        img_file.write_bytes(receive.content)
+        img_file = BytesIO(receive.content)
+        img_file.name = f"{uuid.uuid4().hex}{ext[0]}"
         cover = CVImage(img_file)
         if not variant:
             cover.resize_cover()
         else:
             cover.resize_resource()
-        return str(img_file)
+        return img_file
 
     def _setup_client(self) -> None:
         self.locg = Comic_Geeks()
@@ -78,18 +79,22 @@ class GeeksImporter(BaseImporter):
                     "sku": "",
                     "upc": "",
                 }
-                try:
-                    resp = self.barda.post_variant(data)
-                except ApiError:
-                    questionary.print(
-                        f"Failed to upload variant cover. Data: {data}", style=Styles.ERROR
-                    )
-                    continue
-
-                if resp is not None:
-                    questionary.print(
-                        f"Added variant cover: {issue.cover['name']}", style=Styles.SUCCESS
-                    )
+                self._submit_write(
+                    self.async_barda.post_variant(data),
+                    lambda future, data=data: self._finish_variant(future, issue, data),
+                )
+        self._finish_writes(wait=True)
+
+    @staticmethod
+    def _finish_variant(future, issue: Issue, data: dict[str, Any]) -> None:
+        try:
+            resp = future.result()
+        except ApiError:
+            questionary.print(f"Failed to upload variant cover. Data: {data}", style=Styles.ERROR)
+            return
+
+        if resp is not None:
+            questionary.print(f"Added variant cover: {issue.cover['name']}", style=Styles.SUCCESS)
 
     ##############
     # Characters #
@@ -1,7 +1,9 @@
 import datetime
 import operator
+import threading
 import uuid
 from enum import Enum, auto, unique
+from io import BytesIO
 from logging import getLogger
 from pathlib import Path
 from typing import Any, List
@@ -11,20 +13,30 @@ import requests
 from mokkari.schemas.generic import GenericItem
 from mokkari.schemas.issue import Issue as MetronIssue
 from mokkari.schemas.series import BaseSeries
-from simyan.comicvine import Comicvine as CV
 from simyan.exceptions import ServiceError
 from simyan.schemas.generic_entries import CreatorEntry, GenericEntry
 from simyan.schemas.issue import Issue as CV_Issue
-from simyan.schemas.volume import VolumeEntry
-from simyan.sqlite_cache import SQLiteCache
 
+from barda.comicvine_session import ComicvineSession
+from barda.credit_writer import CreditResult
+from barda.cv_cache import ComicvineCache
 from barda.exceptions import ApiError
 from barda.gcd.db import DB
 from barda.gcd.gcd_issue import GCD_Issue, Rating
 from barda.ignore_resources import Ignore_Characters, Ignore_Creators, Ignore_Teams
 from barda.image import CVImage
+from barda.image_cache import ImageCache
 from barda.importer_base import BaseImporter
+from barda.issue_diff import diff_issue
+from barda.issue_index import IssueIndex
+from barda.mirror import MetronMirror
+from barda.name_index import RESOURCES, NameIndex
+from barda.outbox import ConversionKey
+from barda.prefetch import prefetch
+from barda.projections import CVVolumeSummary
+from barda.reference_data import ReferenceData
 from barda.resource_keys import Resources
+from barda.role_resolver import RoleResolver
 from barda.settings import BardaSettings
 from barda.styles import Styles
 from barda.utils import (
@@ -38,6 +50,10 @@ from barda.validators import DateValidator, NumberValidator
 
 LOGGER = getLogger(__name__)
 
+# Comic Vine issues fetched ahead of the one being imported, and the threads fetching them.
+PREFETCH_ISSUES = 3
+PREFETCH_WORKERS = 2
+
 
 @unique
 class ImageType(Enum):
@@ -99,18 +115,59 @@ BAD_PUBLISHERS = frozenset(
 
 
 class ComicVineImporter(BaseImporter):
-    def __init__(self, config: BardaSettings) -> None:
-        super(ComicVineImporter, self).__init__(config)
-        cv_cache = SQLiteCache(config.cv_cache, 1) if config.cv_cache else None
-        self.cv = CV(api_key=config.cv_api_key, cache=cv_cache)  # type: ignore
+    def __init__(
+        self,
+        config: BardaSettings,
+        reference: ReferenceData | None = None,
+        names: NameIndex | None = None,
+    ) -> None:
+        super(ComicVineImporter, self).__init__(config, reference)
+        self.cv_api_key = config.cv_api_key
+        self.cv_cache = (
+            ComicvineCache(
+                config.cv_cache,
+                max_bytes=config.cv_cache_size_mb * 1024 * 1024,
+                read_only=self.offline,
+            )
+            if config.cv_cache
+            else None
+        )
+        self.cv = self._new_cv_session()
+        # Downloaded covers and resource images, e.g. from --warm-volumes.
+        self.images = ImageCache(config.image_cache)
+        # Comic Vine sessions of the prefetch threads. They share the cache.
+        self.thread_cv = threading.local()
         self.add_characters = False
         self.add_universes = False
+        # Issues of the Metron series being imported, by number.
+        self.issue_index: IssueIndex | None = None
         self.series_universes: list[int] = []
-        self.role_list: list[GenericItem] | None = None
+        self.conversions_db = config.conversions
+        # Names of Metron characters, teams, arcs and creators. Normally shared by the Runner.
+        self.names = names or NameIndex(config.name_index, persist=not config.dry_run)
+        # Series and issue lists of the publisher-wide jobs.
+        self.mirror = MetronMirror(config.mirror)
+        # Journaled writes don't change Metron, so they leave the mirror alone.
+        self.update_mirror = config.dry_run is None
+        # Built from Metron's role list when the first credit is resolved.
+        self.role_resolver: RoleResolver | None = None
         self.ignore_characters: set[int] = set()
         self.ignore_teams: set[int] = set()
         self.ignore_creators: set[int] = set()
 
+    def __exit__(self, exc_type, exc_value, traceback):
+        super(ComicVineImporter, self).__exit__(exc_type, exc_value, traceback)
+        if self.cv_cache is not None:
+            LOGGER.info(f"Comic Vine cache: {self.cv_cache.stats()}")
+
+    def _new_cv_session(self) -> ComicvineSession:
+        return ComicvineSession(
+            api_key=self.cv_api_key,
+            cache=self.cv_cache,  # type: ignore
+            retry=self.retry,
+            offline=self.offline,
+        )
+
     @staticmethod
     def fix_cover_date(orig_date: datetime.date) -> datetime.date:
         if orig_date.day != 1:
@@ -121,13 +178,8 @@ class ComicVineImporter(BaseImporter):
     def _ignore_resource(resource, cv_id: int) -> bool:
         return any(cv_id == i.value for i in resource)
 
-    def _get_image(self, url: str, img_type: ImageType) -> str:
+    def _get_image(self, url: str, img_type: ImageType) -> BytesIO | str:
         LOGGER.debug("Entering get_image()...")
-        try:
-            receive = requests.get(url)
-        except requests.exceptions.ConnectionError:
-            LOGGER.warning(f"ConnectionError: {url}")
-            return ""
         cv = Path(url)
         LOGGER.debug(f"Comic Vine image: {cv.name}")
         if not cv.suffix:
@@ -135,9 +187,17 @@ class ComicVineImporter(BaseImporter):
             return ""
         if cv.name in {"6373148-blank.png", "img_broken.png"}:
             return ""
-        new_fn = f"{uuid.uuid4().hex}{cv.suffix}"
-        img_file = Path(self.image_dir.name) / new_fn
-        img_file.write_bytes(receive.content)
+        # Use a cover saved by --warm-volumes. Anything else stays in memory.
+        content = self.images.get(url)
+        if content is None and not self.offline:
+            content = self.images.download(url)
+        if content is None:
+            if self.offline:
+                LOGGER.info(f"Offline, image isn't in the cache: {url}")
+            return ""
+        # Keep the image in memory, so it can be handed straight to the uploader.
+        img_file = BytesIO(content)
+        img_file.name = f"{uuid.uuid4().hex}{cv.suffix}"
         LOGGER.debug(f"Image saved as '{img_file.name}'.")
         cv_img = CVImage(img_file)
         match img_type:
@@ -151,7 +211,7 @@ class ComicVineImporter(BaseImporter):
                 return ""
 
         LOGGER.debug("Exiting get_image()...")
-        return str(img_file)
+        return img_file
 
     @staticmethod
     def _fix_title_data(title: str | None) -> List[str]:
@@ -176,6 +236,21 @@ class ComicVineImporter(BaseImporter):
         LOGGER.debug("Exiting fix_title_data()...")
         return result
 
+    def _find_names(self, resource: Resources, name: str) -> list[Any]:
+        """
+        Look a name up in the local name index, and search Metron if it may be missing there.
+
+        Close matches are only trusted once the resource has been synced. Before that the index
+        only has the names earlier lookups found, so the real match may not be in it yet.
+        """
+        kind = resource.name.lower()
+        found = self.names.search(kind, name)
+        if found and (self.names.synced(kind) is not None or self.names.has(kind, name)):
+            return found
+        results = getattr(self.metron, RESOURCES[kind])(params={"name": name})
+        self.names.add_many(kind, ((item.id, item.name) for item in results))
+        return results
+
     def _confirm_resource_choice(
         self, resource: Resources, cv_entry: GenericEntry, choices: List[questionary.Choice]
     ) -> int | None:
@@ -184,6 +259,9 @@ class ComicVineImporter(BaseImporter):
             choices=choices,
         ).ask():
             self.conversions.store_cv(resource.value, cv_entry.id, metron_id)
+            # So the Comic Vine name is found locally even if Metron spells it differently.
+            if cv_entry.name:
+                self.names.add(resource.name.lower(), metron_id, cv_entry.name, alias=True)
             questionary.print(
                 f"Added '{cv_entry.name}' to {resource.name} conversions. "
                 f"CV: {cv_entry.id}, Metron: {metron_id}",
@@ -192,7 +270,7 @@ class ComicVineImporter(BaseImporter):
         return metron_id
 
     @staticmethod
-    def _select_metron_series(series_lst: list[BaseSeries], series: VolumeEntry):
+    def _select_metron_series(series_lst: list[BaseSeries], series: CVVolumeSummary):
         choices: List[questionary.Choice] = []
         for i in series_lst:
             choice = questionary.Choice(
@@ -205,7 +283,7 @@ class ComicVineImporter(BaseImporter):
             choices=choices,
         ).ask()
 
-    def _check_metron_for_series(self, series: VolumeEntry) -> str | None:
+    def _check_metron_for_series(self, series: CVVolumeSummary) -> str | None:
         if series_lst := self.metron.series_list(
             {"name": series.name.lower().replace("&", "").lstrip("the ")}
         ):
@@ -341,18 +419,11 @@ class ComicVineImporter(BaseImporter):
 
     @staticmethod
     def _fix_role_list(roles: List[str]) -> List[str]:
-        role_list = []
-
         # Handle assistant editors
         if "editor" in roles and "assistant" in roles:
-            role_list.append("assistant editor")
-            return role_list
+            return ["assistant editor"]
 
-        for role in roles:
-            if role.lower() == "penciler":
-                role = "penciller"
-            role_list.append(role)
-        return role_list
+        return roles
 
     @staticmethod
     def _ask_for_role(creator: CreatorEntry, metron_roles: list[GenericItem]) -> list[int]:
@@ -370,19 +441,20 @@ class ComicVineImporter(BaseImporter):
             role_lst = creator.roles.split(", ")
             role_lst = self._fix_role_list(role_lst)
 
-        if self.role_list is None:
-            self.role_list = self.metron.role_list()
-        roles = []
-        for i in role_lst:
-            roles.extend(m_role.id for m_role in self.role_list if i.lower() == m_role.name.lower())
+        if self.role_resolver is None:
+            self.role_resolver = RoleResolver(
+                self.reference.get("role", self.metron), self.conversions_db
+            )
+        roles = self.role_resolver.resolve(role_lst)
 
         if not roles:
-            roles = self._ask_for_role(creator, self.role_list)
+            roles = self._ask_for_role(creator, self.role_resolver.roles)
+            self.role_resolver.learn(role_lst, roles)
 
         return roles
 
     def _create_credits_list(
-        self, issue_id: int, cover_date: datetime.date, credits_: List[CreatorEntry]
+        self, issue_id: int | None, cover_date: datetime.date, credits_: List[CreatorEntry]
     ) -> List:
         LOGGER.debug("Entering create_credits_list()...")
         credits_lst = []
@@ -440,7 +512,9 @@ class ComicVineImporter(BaseImporter):
         }
 
         try:
-            resp = self.barda.post_creator(data)
+            resp = self.barda.post_creator(
+                data, keys=[ConversionKey("cv", Resources.Creator.value, creator.id)]
+            )
         except ApiError:
             questionary.print(f"Failed to create creator: '{name}'.", style=Styles.ERROR)
             return None
@@ -448,7 +522,6 @@ class ComicVineImporter(BaseImporter):
         if resp is None:
             return None
 
-        self.conversions.store_cv(Resources.Creator.value, creator.id, resp["id"])
         questionary.print(
             f"Added '{name}' to {Resources.Creator.name} conversions. CV: "
             f"{creator.id}, Metron: {resp['id']}",
@@ -464,7 +537,7 @@ class ComicVineImporter(BaseImporter):
         questionary.print(
             f"Let's do a creator search on Metron for '{creator.name}'", style=Styles.TITLE
         )
-        c_list = self.metron.creators_list(params={"name": creator.name})
+        c_list = self._find_names(Resources.Creator, creator.name)
         choices = self._create_choices(c_list)
         if choices is None:
             questionary.print(f"Nothing found for '{creator.name}'", style=Styles.WARNING)
@@ -475,7 +548,7 @@ class ComicVineImporter(BaseImporter):
             f"Do want to use another name to search for '{creator.name}'?"
         ).ask():
             txt = questionary.text(f"What name do you want to search for '{creator.name}'?").ask()
-            lst = self.metron.creators_list(params={"name": txt})
+            lst = self._find_names(Resources.Creator, txt)
             new_choices = self._create_choices(lst)
             if new_choices is None:
                 questionary.print(f"Nothing found for '{creator.name}'", style=Styles.WARNING)
@@ -537,7 +610,9 @@ class ComicVineImporter(BaseImporter):
         data = {"name": name, "desc": desc, "image": img, "cv_id": story.id}
 
         try:
-            resp = self.barda.post_arc(data)
+            resp = self.barda.post_arc(
+                data, keys=[ConversionKey("cv", Resources.Arc.value, story.id)]
+            )
         except ApiError:
             questionary.print(f"Fail to create story arc for '{name}'.", style=Styles.ERROR)
             return None
@@ -545,7 +620,6 @@ class ComicVineImporter(BaseImporter):
         if resp is None:
             return None
 
-        self.conversions.store_cv(Resources.Arc.value, story.id, resp["id"])
         questionary.print(f"Add '{name}' to {Resources.Arc.name} conversions", style=Styles.SUCCESS)
         return resp["id"]
 
@@ -556,7 +630,7 @@ class ComicVineImporter(BaseImporter):
         questionary.print(
             f"Let's do a story arc search on Metron for '{arc.name}'", style=Styles.TITLE
         )
-        arc_lst = self.metron.arcs_list(params={"name": arc.name})
+        arc_lst = self._find_names(Resources.Arc, arc.name)
         choices = self._create_choices(arc_lst)
         if choices is None:
             questionary.print(f"Nothing found for '{arc.name}'", style=Styles.WARNING)
@@ -565,7 +639,7 @@ class ComicVineImporter(BaseImporter):
 
         if questionary.confirm(f"Do want to use another name to search for '{arc.name}'?").ask():
             txt = questionary.text(f"What name do you want to search for '{arc.name}'?").ask()
-            lst = self.metron.arcs_list(params={"name": txt})
+            lst = self._find_names(Resources.Arc, txt)
             new_choices = self._create_choices(lst)
             if new_choices is None:
                 questionary.print(f"Nothing found for '{txt}'", style=Styles.WARNING)
@@ -626,7 +700,9 @@ class ComicVineImporter(BaseImporter):
         }
 
         try:
-            resp = self.barda.post_team(data)
+            resp = self.barda.post_team(
+                data, keys=[ConversionKey("cv", Resources.Team.value, team.id)]
+            )
         except ApiError:
             questionary.print(f"Failed to create team for '{name}'.", style=Styles.ERROR)
             return None
@@ -634,7 +710,6 @@ class ComicVineImporter(BaseImporter):
         if resp is None:
             return None
 
-        self.conversions.store_cv(Resources.Team.value, team.id, resp["id"])
         questionary.print(
             f"Added '{name}' to {Resources.Team.name}  conversions", style=Styles.SUCCESS
         )
@@ -645,7 +720,7 @@ class ComicVineImporter(BaseImporter):
             return None
 
         questionary.print(f"Let's do a team search on Metron for '{team.name}'", style=Styles.TITLE)
-        team_lst = self.metron.teams_list(params={"name": team.name})
+        team_lst = self._find_names(Resources.Team, team.name)
         choices = self._create_choices(team_lst)
         if choices is None:
             questionary.print(f"Nothing found for '{team.name}'", style=Styles.WARNING)
@@ -654,7 +729,7 @@ class ComicVineImporter(BaseImporter):
 
         if questionary.confirm(f"Do want to use another name to search for '{team.name}'?").ask():
             txt = questionary.text(f"What name do you want to search for '{team.name}'?").ask()
-            lst = self.metron.teams_list(params={"name": txt})
+            lst = self._find_names(Resources.Team, txt)
             new_choices = self._create_choices(lst)
             if new_choices is None:
                 questionary.print(f"Nothing found for '{txt}'", style=Styles.WARNING)
@@ -730,7 +805,9 @@ class ComicVineImporter(BaseImporter):
         }
 
         try:
-            resp = self.barda.post_character(data)
+            resp = self.barda.post_character(
+                data, keys=[ConversionKey("cv", Resources.Character.value, character.id)]
+            )
         except ApiError:
             questionary.print(f"Failed to create character for '{name}'.", style=Styles.ERROR)
             return None
@@ -738,7 +815,6 @@ class ComicVineImporter(BaseImporter):
         if resp is None:
             return None
 
-        self.conversions.store_cv(Resources.Character.value, character.id, resp["id"])
         questionary.print(
             f"Added '{name}' to {Resources.Character.name} conversions.", style=Styles.SUCCESS
         )
@@ -752,7 +828,7 @@ class ComicVineImporter(BaseImporter):
             f"Let's do a character search on Metron for '{character.name}'",
             style=Styles.TITLE,
         )
-        c_list = self.metron.characters_list(params={"name": character.name})
+        c_list = self._find_names(Resources.Character, character.name)
         choices = self._create_choices(c_list)
         if choices is None:
             questionary.print(f"Nothing found for '{character.name}'", style=Styles.WARNING)
@@ -763,7 +839,7 @@ class ComicVineImporter(BaseImporter):
             f"Do want to use another name to search for '{character.name}'?"
         ).ask():
             txt = questionary.text(f"What name do you want to search for '{character.name}'?").ask()
-            lst = self.metron.characters_list(params={"name": txt})
+            lst = self._find_names(Resources.Character, txt)
             new_choices = self._create_choices(lst)
             if new_choices is None:
                 questionary.print(f"Nothing found for '{txt}'", style=Styles.WARNING)
@@ -812,7 +888,7 @@ class ComicVineImporter(BaseImporter):
         choices = []
         for s in results:
             # Skip bad CV publishers
-            pub = s.publisher.name if s.publisher is not None else ""
+            pub = s.publisher_name
             if pub in BAD_PUBLISHERS:
                 continue
             choice = questionary.Choice(
@@ -827,10 +903,10 @@ class ComicVineImporter(BaseImporter):
         )
         return choices
 
-    def _what_series(self) -> VolumeEntry | None:
+    def _what_series(self) -> CVVolumeSummary | None:
         series = questionary.text("What series do you want to import?").ask()
         try:
-            results = self.cv.list_volumes(
+            results = self.cv.list_volume_summaries(
                 params={
                     "filter": f"name:{series}",
                 },
@@ -852,7 +928,7 @@ class ComicVineImporter(BaseImporter):
 
         return questionary.select("Which series to import", choices=choices).ask()
 
-    def _ask_for_series_info(self, cv_series: VolumeEntry) -> dict[str, Any]:
+    def _ask_for_series_info(self, cv_series: CVVolumeSummary) -> dict[str, Any]:
         display_name = f"{cv_series.name} ({cv_series.start_year})"
         questionary.print(
             f"Series '{display_name}' needs to be created on Metron",
@@ -889,7 +965,7 @@ class ComicVineImporter(BaseImporter):
             "cv_id": cv_series.id,
         }
 
-    def _create_series(self, cv_series: VolumeEntry) -> int | None:
+    def _create_series(self, cv_series: CVVolumeSummary) -> int | None:
         data = self._ask_for_series_info(cv_series)
 
         try:
@@ -905,7 +981,13 @@ class ComicVineImporter(BaseImporter):
     #########
     # Issue #
     #########
-    def _create_issue(self, series_id: int, cv_issue: CV_Issue, gcd_series_id):
+    def _create_issue(
+        self,
+        series_id: int,
+        cv_issue: CV_Issue,
+        gcd_series_id,
+        cover: BytesIO | str | None = None,
+    ) -> None:
         def get_cover_date(issue: CV_Issue) -> str:
             """
             Prompts the user to add a cover date if it is missing for the given Comic Vine issue.
@@ -929,6 +1011,14 @@ class ComicVineImporter(BaseImporter):
             LOGGER.error(f"No Cover date: {issue}")
             exit(0)
 
+        # An earlier copy of a repeated number may still be being sent.
+        if self.issue_index is not None and not self.issue_index.reserve(cv_issue.number):
+            questionary.print(
+                f"Issue #{cv_issue.number} is already being added. Skipping...",
+                style=Styles.WARNING,
+            )
+            return
+
         gcd = None
         gcd_stories = None
         if cv_issue.number:
@@ -950,7 +1040,11 @@ class ComicVineImporter(BaseImporter):
         team_lst = self._create_team_list(cv_issue.teams) if self.add_characters else []
         arc_lst = self._create_arc_list(cv_issue.story_arcs)
         universe_lst = self.series_universes
-        img = self._get_image(cv_issue.image.original_url, ImageType.Cover)
+        img = (
+            cover
+            if cover is not None
+            else self._get_image(cv_issue.image.original_url, ImageType.Cover)
+        )
         upc = gcd.barcode if gcd is not None else None
         price = gcd.price if gcd is not None else None
         pages = gcd.pages if gcd is not None else None
@@ -982,36 +1076,69 @@ class ComicVineImporter(BaseImporter):
             "reprints": reprints_lst,
             "cv_id": cv_issue.id,
         }
+
+        # The issue id isn't known until Metron responds, so it's filled in by _post_issue().
+        credits_lst = (
+            self._create_credits_list(None, cover_date, cv_issue.creators)
+            if cv_issue.creators
+            else []
+        )
+
+        # The gcd conversion is saved by the outbox along with the issue.
+        keys = [ConversionKey("gcd", Resources.Issue.value, gcd.id)] if gcd else None
+        self._submit_write(
+            self._post_issue(data, credits_lst, keys),
+            lambda future: self._finish_create_issue(future, cv_issue, gcd),
+        )
+
+    async def _post_issue(
+        self,
+        data: dict[str, Any],
+        credits_lst: List[dict[str, Any]],
+        keys: list[ConversionKey] | None = None,
+    ) -> tuple[dict[str, Any] | None, bool | None]:
+        resp = await self.async_barda.post_issue(data, keys)
+        if resp is None or not credits_lst:
+            return resp, None
+
+        for item in credits_lst:
+            item["issue"] = resp["id"]
+        try:
+            await self.async_barda.post_credit(credits_lst)
+        except ApiError:
+            return resp, False
+        return resp, True
+
+    def _finish_create_issue(self, future, cv_issue: CV_Issue, gcd: GCD_Issue | None) -> None:
         try:
-            resp = self.barda.post_issue(data)
+            resp, credits_added = future.result()
         except ApiError as err:
             questionary.print(f"Creation error: {err}")
-            return None
+            resp = None
 
         if resp is None:
-            return None
+            if self.issue_index is not None:
+                self.issue_index.release(cv_issue.number)
+            questionary.print(f"Failed to create issue #{cv_issue.number}", style=Styles.ERROR)
+            return
 
-        if cv_issue.creators:
-            credits_lst = self._create_credits_list(resp["id"], cover_date, cv_issue.creators)
-            try:
-                self.barda.post_credit(credits_lst)
-                questionary.print(f"Added credits for #{resp['number']}.", style=Styles.SUCCESS)
-            except ApiError:
-                questionary.print(
-                    f"Failed to add credits for #{resp['number']}", style=Styles.ERROR
-                )
+        questionary.print(f"Added issue #{resp['number']}", Styles.SUCCESS)
+        if self.issue_index is not None:
+            self.issue_index.add(resp["number"], resp["id"])
+            self.issue_index.release(cv_issue.number)
+
+        if credits_added is True:
+            questionary.print(f"Added credits for #{resp['number']}.", style=Styles.SUCCESS)
+        elif credits_added is False:
+            questionary.print(f"Failed to add credits for #{resp['number']}", style=Styles.ERROR)
 
-        # If we have gcd information let's save it to the cache file.
         if gcd:
-            self.conversions.store_gcd(Resources.Issue.value, gcd.id, resp["id"])
             questionary.print(
                 f"Added #{resp['number']} to {Resources.Issue.name} to cache. "
                 f"GCD: {gcd.id} | Metron: {resp['id']}",
                 style=Styles.SUCCESS,
             )
 
-        return resp
-
     def _get_series_id(self, series) -> int | None:
         mseries_id = self._check_metron_for_series(series)
         return (
@@ -1027,28 +1154,37 @@ class ComicVineImporter(BaseImporter):
             questionary.print(f"Unable to find series '{gcd_query}' on GCD.")
             return None
 
+    @staticmethod
+    def _report_credits(results: List[CreditResult], met: MetronIssue) -> None:
+        for result in results:
+            if result.ok:
+                questionary.print(
+                    f"Added credits for Creator #{result.row['creator']} in '{met.series.name} #{met.number}'.",  # type: ignore # noqa: E501
+                    style=Styles.SUCCESS,
+                )
+            else:
+                questionary.print(
+                    f"Failed to add credits for '{met.series.name} #{met.number}'",  # type: ignore
+                    style=Styles.ERROR,
+                )
+
     def _update_metron_issue(self, cv: CV_Issue, met: MetronIssue) -> bool:  # NOQA: C901
-        data: dict[str, Any] = {}
+        characters_lst = teams_lst = None
         if self.add_characters:
             if cv.characters:
                 characters_lst = self._create_character_list(cv.characters)
-                metron_set = {item.id for item in met.characters} if met.characters else set()
-                metron_set.update(characters_lst)
-                if metron_set:
-                    data["characters"] = list(metron_set)
             if cv.teams:
                 teams_lst = self._create_team_list(cv.teams)
-                metron_lst = [item.id for item in met.teams] if met.teams else []
-                metron_lst_set = set(metron_lst)
-                metron_lst.extend(team for team in teams_lst if team not in metron_lst_set)
-                if metron_lst:
-                    data["teams"] = teams_lst
-        if cv.story_arcs:
-            arcs_lst = self._create_arc_list(cv.story_arcs)
-            metron_set = {item.id for item in met.arcs} if met.arcs else set()
-            metron_set.update(arcs_lst)
-            if metron_set:
-                data["arcs"] = list(metron_set)
+        arcs_lst = self._create_arc_list(cv.story_arcs) if cv.story_arcs else None
+
+        data = diff_issue(
+            met,
+            characters=characters_lst,
+            teams=teams_lst,
+            arcs=arcs_lst,
+            universes=self.series_universes or None,
+            cv_id=cv.id,
+        )
 
         if cv.description and not met.desc:  # type: ignore
             desc = remove_overview_text(cleanup_html(cv.description, True))
@@ -1056,30 +1192,17 @@ class ComicVineImporter(BaseImporter):
 
         if cv.creators and questionary.confirm("Do you want to add any missing credits?").ask():
             credits_lst = self._create_credits_list(met.id, met.cover_date, cv.creators)  # type: ignore
-            for item in credits_lst:
-                try:
-                    self.barda.post_credit([item])
-                    questionary.print(
-                        f"Added credits for Creator #{item['creator']} in '{met.series.name} #{met.number}'.",
-                        # type: ignore
-                        style=Styles.SUCCESS,
-                    )
-                except ApiError:
-                    questionary.print(
-                        f"Failed to add credits for '{met.series.name} #{met.number}'",  # type: ignore
-                        style=Styles.ERROR,
-                    )
-
-        if not met.cv_id:
-            data["cv_id"] = cv.id
+            # Credits are sent in bulk with those of the following issues.
+            self.barda.post_credit(
+                credits_lst,
+                defer=True,
+                on_done=lambda results: self._report_credits(results, met),
+            )
 
         if cv.image.original_url and met.image is None:
             img = self._get_image(cv.image.original_url, ImageType.Cover)
             data["image"] = img
 
-        if self.series_universes:
-            data["universes"] = self.series_universes
-
         if not data:
             return False
 
@@ -1093,6 +1216,21 @@ class ComicVineImporter(BaseImporter):
             return False
         return True
 
+    def _prefetch_issue(self, cv_issue: Any) -> tuple[CV_Issue | None, BytesIO | str | None]:
+        """
+        Fetch an issue's details, and its cover if it's going to be created. Runs in a prefetch
+        thread, with that thread's own Comic Vine session. The response goes to the shared cache.
+        """
+        if not hasattr(self.thread_cv, "session"):
+            self.thread_cv.session = self._new_cv_session()
+        try:
+            issue = self.thread_cv.session.get_issue(cv_issue.id)
+        except (ServiceError, requests.JSONDecodeError):
+            return None, None
+        if issue.number is None or (self.issue_index and issue.number in self.issue_index):
+            return issue, None
+        return issue, self._get_image(issue.image.original_url, ImageType.Cover)
+
     def run(self) -> None:  # sourcery skip: low-code-quality # noqa: C901
         series = self._what_series()
         if series is None:
@@ -1100,7 +1238,7 @@ class ComicVineImporter(BaseImporter):
             return
 
         try:
-            i_list = self.cv.list_issues(
+            i_list = self.cv.list_issue_summaries(
                 params={"filter": f"volume:{series.id}", "sort": "cover_date:asc"}, max_results=1500
             )
         except (ServiceError, requests.exceptions.JSONDecodeError) as err:
@@ -1137,35 +1275,44 @@ class ComicVineImporter(BaseImporter):
         else:
             start_number = 0
 
+        # One issue list request instead of a search for each issue.
+        self.issue_index = IssueIndex.load(self.metron, series_id)
+
         questionary.print(f"Going to add {len(i_list)} issues to Metron.", style=Styles.TITLE)
+        todo = []
         for i in i_list:
             if update_issue and int(i.number) < start_number:
                 questionary.print(f"Skipping '{series.name} #{i.number}'")
                 continue
             # See if the issue is already on Metron.
-            if not update_issue and self.metron.issues_list(
-                params={"series_id": series_id, "number": i.number}
-            ):
+            if not update_issue and i.number in self.issue_index:
                 questionary.print(
                     f"{series.name} #{i.number} already exists. Skipping...",
                     style=Styles.WARNING,
                 )
                 continue
-            try:
-                cv_issue = self.cv.get_issue(i.id)
-            except (ServiceError, requests.JSONDecodeError):
+            todo.append(i)
+
+        # Fetch the next issues and covers while the operator answers prompts for this one.
+        for i, (cv_issue, cover) in prefetch(
+            todo, self._prefetch_issue, workers=PREFETCH_WORKERS, ahead=PREFETCH_ISSUES
+        ):
+            # Report on any writes that finished while we were working on the last issue, and
+            # send the credits that are due, whether that issue was created or updated.
+            self._finish_writes()
+            self.barda.credits.flush_due()
+
+            if cv_issue is None:
                 questionary.print(
                     "Failed to retrieve information from Comic Vine for Issue: "
-                    f"{i.volume.name} #{i.number}. Skipping...",
+                    f"{i.volume_name} #{i.number}. Skipping...",
                     style=Styles.ERROR,
                 )
                 continue
 
             if i.number is not None:
                 # Check to see if issue already exists on Metron
-                if m := self.metron.issues_list(
-                    params={"series_id": series_id, "number": i.number}
-                ):
+                if m := self.issue_index.get(i.number):
                     if not update_issue:
                         questionary.print(
                             f"{series.name} #{i.number} already exists. Skipping...",
@@ -1183,7 +1330,7 @@ class ComicVineImporter(BaseImporter):
                         )
                         continue
 
-                    mt_issue = self.metron.issue(m[0].id)
+                    mt_issue = self.metron.issue_for_update(m[0])
                     if self._update_metron_issue(cv_issue, mt_issue):
                         questionary.print(
                             f"Updated {mt_issue.series.name} #{mt_issue.number}.",  # type: ignore
@@ -1197,13 +1344,10 @@ class ComicVineImporter(BaseImporter):
                     continue
 
             if cv_issue and cv_issue.number is not None:
-                new_issue = self._create_issue(series_id, cv_issue, gcd_series_id)
-                if new_issue is None:
-                    questionary.print(
-                        f"Failed to create issue #{cv_issue.number}", style=Styles.ERROR
-                    )
-                    continue
-                questionary.print(f"Added issue #{new_issue['number']}", Styles.SUCCESS)
+                self._create_issue(series_id, cv_issue, gcd_series_id, cover)
+
+        self._finish_writes(wait=True)
+        self.barda.flush_credits()
 
     def _patch_cvid(self, cv_id: int, metron_id: int) -> bool:
         data = {"cv_id": cv_id}
@@ -1215,11 +1359,13 @@ class ComicVineImporter(BaseImporter):
                 style=Styles.ERROR,
             )
             return False
+        if self.update_mirror:
+            self.mirror.cv_id_set("issue", metron_id)
         return True
 
-    def _get_series_from_cv(self, series_name: str, m_series) -> List[VolumeEntry] | None:
+    def _get_series_from_cv(self, series_name: str, m_series) -> List[CVVolumeSummary] | None:
         try:
-            return self.cv.list_volumes(
+            return self.cv.list_volume_summaries(
                 params={
                     "filter": f"name:{series_name}",
                 },
@@ -1233,7 +1379,7 @@ class ComicVineImporter(BaseImporter):
             )
             return None
 
-    def _get_cv_series(self, metron_series, num: int) -> VolumeEntry | None:
+    def _get_cv_series(self, metron_series, num: int) -> CVVolumeSummary | None:
         title = metron_series.display_name.rsplit(" ", 1)[0]  # Remove the series year
         cleaned_title = clean_search_series_title(title)
         results = self._get_series_from_cv(cleaned_title, metron_series)
@@ -1264,14 +1410,14 @@ class ComicVineImporter(BaseImporter):
     def import_cvid_by_publisher(self) -> None:
         pub_id = self._choose_publisher()
         series_type_id = self._choose_series_type()
-        series_lst = self.metron.series_list(
-            params={"publisher_id": pub_id, "series_type_id": series_type_id}
+        series_lst = self.mirror.list(
+            self.metron, "series", {"publisher_id": pub_id, "series_type_id": series_type_id}
         )
         questionary.print(f"Going to start matching {len(series_lst)} series", style=Styles.SUCCESS)
         for s in series_lst:
             questionary.print(f"Searching for {s.display_name}", style=Styles.TITLE)
-            metron_issues = self.metron.issues_list(
-                params={"series_id": s.id, "missing_cv_id": True}
+            metron_issues = self.mirror.list(
+                self.metron, "issue", {"series_id": s.id, "missing_cv_id": True}
             )
             if metron_issues:
                 num_issues = len(metron_issues)
@@ -1294,7 +1440,7 @@ class ComicVineImporter(BaseImporter):
                     case _:
                         # Retrieve Issue List from Comic Vine
                         try:
-                            cv_list = self.cv.list_issues(
+                            cv_list = self.cv.list_issue_summaries(
                                 params={
                                     "filter": f"volume:{cv_series.id}",
                                     "sort": "cover_date:asc",
@@ -1324,21 +1470,21 @@ class ComicVineImporter(BaseImporter):
                 )
                 if idx is None:
                     questionary.print(
-                        f"No issue found on Metron for '{x.volume.name} #{x.number}'",
+                        f"No issue found on Metron for '{x.volume_name} #{x.number}'",
                         style=Styles.WARNING,
                     )
                     continue
 
                 if self._patch_cvid(x.id, metron_issues[idx].id):
                     questionary.print(
-                        f"Add CVID: {x.id} to '{metron_issues[idx].series.name} "
+                        f"Add CVID: {x.id} to '{metron_issues[idx].series_name} "
                         f"#{metron_issues[idx].number}'",
                         style=Styles.SUCCESS,
                     )
 
                 else:
                     questionary.print(
-                        f"Failed to update '{metron_issues[idx].series.name} "
+                        f"Failed to update '{metron_issues[idx].series_name} "
                         f"#{metron_issues[idx].number}'",
                         style=Styles.WARNING,
                     )
@@ -1355,9 +1501,9 @@ class ComicVineImporter(BaseImporter):
                 continue
 
             # Retrieve Issue List from Metron
-            metron_issues = self.metron.issues_list(
-                params={"series_id": series_id, "missing_cv_id": True}
-            )  # type: ignore  # noqa: E501
+            metron_issues = self.mirror.list(
+                self.metron, "issue", {"series_id": series_id, "missing_cv_id": True}
+            )
             if not metron_issues:
                 questionary.print("No issues on metron need a Comic Vine ID.", style=Styles.SUCCESS)
                 continue
@@ -1368,7 +1514,7 @@ class ComicVineImporter(BaseImporter):
 
             # Retrieve Issue List from Comic Vine
             try:
-                cv_list = self.cv.list_issues(
+                cv_list = self.cv.list_issue_summaries(
                     params={"filter": f"volume:{series.id}", "sort": "cover_date:asc"},
                     max_results=1500,
                 )
@@ -1397,14 +1543,14 @@ class ComicVineImporter(BaseImporter):
 
                 if self._patch_cvid(x.id, metron_issues[idx].id):
                     questionary.print(
-                        f"Add CVID: {x.id} to '{metron_issues[idx].series.name} "
+                        f"Add CVID: {x.id} to '{metron_issues[idx].series_name} "
                         f"#{metron_issues[idx].number}'",
                         style=Styles.SUCCESS,
                     )
 
                 else:
                     questionary.print(
-                        f"Failed to update '{metron_issues[idx].series.name} "
+                        f"Failed to update '{metron_issues[idx].series_name} "
                         f"#{metron_issues[idx].number}'",
                         style=Styles.WARNING,
                     )
@@ -1419,12 +1565,14 @@ class ComicVineImporter(BaseImporter):
                 style=Styles.ERROR,
             )
             return False
+        if self.update_mirror:
+            self.mirror.cv_id_set("series", metron_id)
         return True
 
     def import_series_cvid_by_publisher(self) -> None:
         pub_id = self._choose_publisher()
-        series_lst = self.metron.series_list(
-            params={"publisher_id": pub_id, "missing_cv_id": True},
+        series_lst = self.mirror.list(
+            self.metron, "series", {"publisher_id": pub_id, "missing_cv_id": True}
         )
         questionary.print(f"Going to start matching {len(series_lst)} series", style=Styles.SUCCESS)
         for s in series_lst:
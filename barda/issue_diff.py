@@ -0,0 +1,122 @@
+"""
+Issue diff module.
+
+This module provides the following functions:
+
+- diff_issue
+- describe_changes
+
+They build the smallest PATCH body that brings a Metron issue up to date, so writes that
+wouldn't change anything are never sent.
+"""
+
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+# PATCH field name and label for each ID list field, in the order they're reported.
+RESOURCE_FIELDS = {
+    "reprints": "Reprints",
+    "characters": "Characters",
+    "teams": "Teams",
+    "arcs": "Story Arcs",
+    "universes": "Universes",
+}
+
+LABELS = {
+    "name": "Stories",
+    "upc": "Barcode",
+    "price": "Price",
+    "page": "Pages",
+    **RESOURCE_FIELDS,
+    "cv_id": "Comic Vine ID",
+}
+
+
+def _same_price(current: Decimal | None, proposed: Any) -> bool:
+    if current is None:
+        return False
+    try:
+        return Decimal(current) == Decimal(str(proposed))
+    except InvalidOperation:
+        return False
+
+
+def _ids(items: list[Any] | None) -> list[int]:
+    return [item.id for item in items] if items else []
+
+
+def _merge_ids(current: list[int], proposed: list[int]) -> list[int] | None:
+    """Return the current IDs followed by the new ones, or None if nothing is new."""
+    seen = set(current)
+    added = [i for i in dict.fromkeys(proposed) if i not in seen]
+    return current + added if added else None
+
+
+def diff_issue(
+    issue: Any,
+    stories: list[str] | None = None,
+    upc: str | None = None,
+    price: Decimal | str | None = None,
+    pages: int | None = None,
+    reprints: list[int] | None = None,
+    characters: list[int] | None = None,
+    teams: list[int] | None = None,
+    arcs: list[int] | None = None,
+    universes: list[int] | None = None,
+    cv_id: int | None = None,
+) -> dict[str, Any]:
+    """
+    Compare the proposed values with a Metron issue and return the fields that would change.
+
+    A value of None means there is nothing to propose for that field. ID lists are merged with
+    the issue's current resources, since Metron replaces the whole list on a PATCH, and are only
+    sent when they add something. The Comic Vine ID is only filled in when the issue has none.
+
+    Args:
+        issue (Issue): The current Metron issue.
+        stories (list): Story titles.
+        upc (str): Barcode.
+        price (Decimal): Cover price.
+        pages (int): Page count.
+        reprints (list): Metron IDs of reprinted issues.
+        characters (list): Metron character IDs.
+        teams (list): Metron team IDs.
+        arcs (list): Metron story arc IDs.
+        universes (list): Metron universe IDs.
+        cv_id (int): Comic Vine ID.
+
+    Returns:
+        The PATCH body. It's empty if the issue is already up to date.
+    """
+    data: dict[str, Any] = {}
+    if stories is not None and list(issue.story_titles or []) != stories:
+        data["name"] = stories
+    if upc is not None and issue.upc != upc:
+        data["upc"] = upc
+    if price is not None and not _same_price(issue.price, price):
+        data["price"] = price
+    if pages is not None and issue.page_count != pages:
+        data["page"] = pages
+
+    proposed = {
+        "reprints": reprints,
+        "characters": characters,
+        "teams": teams,
+        "arcs": arcs,
+        "universes": universes,
+    }
+    for field, ids in proposed.items():
+        if ids and (merged := _merge_ids(_ids(getattr(issue, field)), ids)) is not None:
+            data[field] = merged
+
+    if cv_id is not None and not issue.cv_id:
+        data["cv_id"] = cv_id
+    return data
+
+
+def describe_changes(data: dict[str, Any]) -> str:
+    """Return a message listing the changed fields of a PATCH body."""
+    msg = "Changed:"
+    for field, value in data.items():
+        msg += f"\n\t{LABELS.get(field, field)}: {value}"
+    return msg
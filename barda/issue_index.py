@@ -0,0 +1,95 @@
+"""
+IssueIndex module.
+
+This module provides the following classes:
+
+- IssueIndex
+"""
+
+import re
+import threading
+from typing import Any, Iterable
+
+from mokkari.session import Session
+
+LEADING_ZEROS = re.compile(r"^0+(?=\d)")
+
+
+def normalize_number(number: str | int | float | None) -> str:
+    """
+    Normalize an issue number so different spellings of it compare equal.
+
+    For example "#001", "1" and " 1 " are all "1", and "½" is "1/2".
+    """
+    if number is None:
+        return ""
+    result = str(number).strip().casefold().lstrip("#").strip()
+    result = result.replace("½", "1/2").replace("¼", "1/4").replace("¾", "3/4")
+    return LEADING_ZEROS.sub("", result)
+
+
+class IssueIndex:
+    """
+    Map of issue number to the Metron IDs of a series' issues.
+
+    Built from one issue list request, it replaces a search per issue when checking whether
+    an issue already exists, and is kept up to date as issues are created. A number is reserved
+    while its issue is being created, so a repeated number isn't submitted twice. The prefetch
+    threads read it while issues are added, so access is serialized.
+
+    Args:
+        series_id (int): The Metron series ID.
+        issues (Iterable): Issues with ``id`` and ``number`` attributes, e.g. BaseIssue.
+    """
+
+    def __init__(self, series_id: int, issues: Iterable[Any] = ()) -> None:
+        self.series_id = series_id
+        self.issues: dict[str, list[int]] = {}
+        # Numbers of the issues being created.
+        self.reserved: set[str] = set()
+        self.lock = threading.Lock()
+        for issue in issues:
+            self.add(issue.number, issue.id)
+
+    @classmethod
+    def load(cls, metron: Session, series_id: int) -> "IssueIndex":
+        """Build the index from the series' issue list on Metron."""
+        return cls(series_id, metron.issues_list(params={"series_id": series_id}))
+
+    def add(self, number: str | None, issue_id: int) -> None:
+        """Add a newly created issue."""
+        with self.lock:
+            ids = self.issues.setdefault(normalize_number(number), [])
+            if issue_id not in ids:
+                ids.append(issue_id)
+
+    def reserve(self, number: str | None) -> bool:
+        """
+        Reserve a number for an issue about to be created.
+
+        Returns:
+            False if an issue with this number exists or is already being created.
+        """
+        key = normalize_number(number)
+        with self.lock:
+            if self.issues.get(key) or key in self.reserved:
+                return False
+            self.reserved.add(key)
+            return True
+
+    def release(self, number: str | None) -> None:
+        """Release a reserved number once its issue was created or failed to be."""
+        with self.lock:
+            self.reserved.discard(normalize_number(number))
+
+    def get(self, number: str | None) -> list[int]:
+        """Return the IDs of the issues with this number."""
+        with self.lock:
+            return list(self.issues.get(normalize_number(number), []))
+
+    def __contains__(self, number: str | None) -> bool:
+        return bool(self.get(number))
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(ids) for ids in self.issues.values())
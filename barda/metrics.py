@@ -0,0 +1,121 @@
+"""
+Metrics module.
+
+This module provides the following classes:
+
+- EndpointStats
+- WriteMetrics
+
+and the shared ``METRICS`` instance that PostData records to.
+"""
+
+import json
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Upper bounds, in seconds, of the latency histogram buckets. The last bucket is unbounded.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass
+class EndpointStats:
+    """Counters for the writes to one Metron endpoint."""
+
+    requests: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    bytes_sent: int = 0
+    retries: int = 0
+    rate_limit_wait: float = 0.0
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        labels = [f"<={b}" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}"]
+        return {
+            "requests": self.requests,
+            "mean_seconds": self.seconds / self.requests if self.requests else 0.0,
+            "max_seconds": self.max_seconds,
+            "histogram": dict(zip(labels, self.histogram)),
+            "bytes_sent": self.bytes_sent,
+            "retries": self.retries,
+            "rate_limit_wait": self.rate_limit_wait,
+            "errors": dict(self.errors),
+        }
+
+
+class WriteMetrics:
+    """Thread-safe per-endpoint instrumentation of the writes to Metron."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.lock = threading.Lock()
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointStats()
+        return self.endpoints[endpoint]
+
+    def record(
+        self,
+        endpoint: str,
+        seconds: float,
+        bytes_sent: int = 0,
+        retries: int = 0,
+        waited: float = 0.0,
+    ) -> None:
+        """
+        Record one request.
+
+        Args:
+            endpoint (str): The endpoint written to, e.g. "issue".
+            seconds (float): Time from sending the request to receiving the response.
+            bytes_sent (int): Size of the request body.
+            retries (int): Number of retries made by the transport.
+            waited (float): Seconds spent waiting for the rate limiter.
+        """
+        with self.lock:
+            stats = self._stats(endpoint)
+            stats.requests += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.bytes_sent += bytes_sent
+            stats.retries += retries
+            stats.rate_limit_wait += waited
+
+    def error(self, endpoint: str, err: Exception) -> None:
+        """Count a failed write by its exception class."""
+        with self.lock:
+            errors = self._stats(endpoint).errors
+            name = type(err).__name__
+            errors[name] = errors.get(name, 0) + 1
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return the stats for each endpoint."""
+        with self.lock:
+            return {endpoint: stats.summary() for endpoint, stats in self.endpoints.items()}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.endpoints = {}
+
+    def write(self, path: Path, task: str) -> None:
+        """Append a summary line to a JSONL file and start counting again."""
+        if not (endpoints := self.summary()):
+            return
+        record = {
+            "time": datetime.now(tz=timezone.utc).isoformat(),
+            "task": task,
+            "endpoints": endpoints,
+        }
+        with path.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+        self.reset()
+
+
+METRICS = WriteMetrics()
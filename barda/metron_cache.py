@@ -0,0 +1,267 @@
+"""
+MetronCache module.
+
+This module provides the following classes:
+
+- CachedResponse
+- MetronCache
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from logging import getLogger
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+LOGGER = getLogger(__name__)
+
+ONE_HOUR = 60 * 60
+ONE_DAY = 24 * ONE_HOUR
+
+# Seconds before a cached response has to be revalidated, by endpoint. Reference data rarely
+# changes, while issues and series are edited all the time. Issues a patch is based on are always
+# revalidated, see MetronSession.issue_for_update().
+DEFAULT_TTLS: dict[str, int] = {
+    "arc": ONE_DAY,
+    "character": ONE_DAY,
+    "creator": ONE_DAY,
+    "issue": 6 * ONE_HOUR,
+    "publisher": 7 * ONE_DAY,
+    "role": 30 * ONE_DAY,
+    "series": 6 * ONE_HOUR,
+    "series_type": 30 * ONE_DAY,
+    "team": ONE_DAY,
+    "universe": 7 * ONE_DAY,
+}
+DEFAULT_TTL = ONE_HOUR
+
+# Stale responses are kept this long so they can be revalidated instead of downloaded again.
+MAX_AGE = 30 * ONE_DAY
+
+
+def cache_key(url: str, params: dict[str, Any] | None = None) -> str:
+    """Return the key mokkari uses for a request."""
+    if not params:
+        return url
+    ordered_params = OrderedDict(sorted(params.items(), key=lambda t: t[0]))
+    return f"{url}?{urlencode(ordered_params)}"
+
+
+def _parse_key(key: str) -> tuple[str, int | None, int | None]:
+    """Return the endpoint, the resource ID and any series filter of a cache key."""
+    parsed = urlparse(key)
+    path = [p for p in parsed.path.split("/") if p]
+    path = path[1:] if path and path[0] == "api" else path
+    endpoint = path[0] if path else ""
+    item = int(path[1]) if len(path) > 1 and path[1].isdigit() else None
+    series = parse_qs(parsed.query).get("series_id", [None])[0]
+    return endpoint, item, int(series) if series and series.isdigit() else None
+
+
+class CachedResponse(NamedTuple):
+    """A stored response and the validators to revalidate it with."""
+
+    data: Any
+    etag: str | None
+    last_modified: str | None
+
+
+class MetronCache:
+    """
+    Persistent cache of Metron reads, for use as a mokkari Session cache.
+
+    Responses expire after a per-endpoint TTL. Expired responses are kept with their ``ETag``
+    and ``Last-Modified`` headers, so MetronSession can revalidate them with a conditional
+    request. PostData calls ``written()`` after each write to drop the responses it affected.
+
+    The cache may be invalidated from the background write threads, so access is serialized.
+
+    A read-only cache, used by --offline, serves responses whatever their age and is never
+    changed.
+
+    Args:
+        db_name (str): Path and database name to use.
+        ttls (dict, optional): Seconds a response stays fresh, by endpoint.
+        read_only (bool): Serve stored responses regardless of age and don't change the cache.
+    """
+
+    def __init__(
+        self,
+        db_name: str | Path = "metron.db",
+        ttls: dict[str, int] | None = None,
+        read_only: bool = False,
+    ):
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        # Validators from the response being stored, set by MetronSession.
+        self.validators: dict[str, tuple[str | None, str | None]] = {}
+        self.hits = 0
+        self.misses = 0
+        if read_only:
+            self.con = self._connect_read_only(Path(db_name))
+        else:
+            self.con = sqlite3.connect(db_name, check_same_thread=False)
+            self._create_tables()
+            with self.lock, self.con:
+                self.con.execute("DELETE FROM responses WHERE stored < ?", (time.time() - MAX_AGE,))
+
+    def _create_tables(self) -> None:
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key PRIMARY KEY, endpoint, item, series, "
+                "json, etag, last_modified, stored)"
+            )
+            self.con.execute(
+                "CREATE INDEX IF NOT EXISTS responses_endpoint ON responses (endpoint)"
+            )
+
+    def _connect_read_only(self, db_name: Path) -> sqlite3.Connection:
+        """Open the database read-only, or an empty in-memory cache if it has no responses."""
+        if db_name.exists():
+            con = sqlite3.connect(
+                f"{db_name.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+            )
+            if con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'responses'"
+            ).fetchone():
+                return con
+            con.close()
+        LOGGER.warning(f"There are no cached Metron responses in '{db_name}'.")
+        self.con = sqlite3.connect(":memory:", check_same_thread=False)
+        self._create_tables()
+        return self.con
+
+    def _ttl(self, endpoint: str) -> float:
+        if self.read_only:
+            return float("inf")
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, key: str) -> Any | None:
+        """Return a fresh response, or None if there isn't one."""
+        endpoint, _, _ = _parse_key(key)
+        with self.lock:
+            row = self.con.execute(
+                "SELECT json FROM responses WHERE key = ? AND stored >= ?",
+                (key, time.time() - self._ttl(endpoint)),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def stale(self, key: str) -> CachedResponse | None:
+        """Return a stored response regardless of its age, with its validators."""
+        with self.lock:
+            row = self.con.execute(
+                "SELECT json, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return CachedResponse(json.loads(row[0]), row[1], row[2]) if row else None
+
+    def note_validators(self, key: str, etag: str | None, last_modified: str | None) -> None:
+        """Remember the validators of a response that is about to be stored."""
+        with self.lock:
+            self.validators[key] = (etag, last_modified)
+
+    def store(self, key: str, value: Any) -> None:
+        """Save a response. Validators of a revalidated response are kept."""
+        if self.read_only:
+            return
+        endpoint, item, series = _parse_key(key)
+        with self.lock, self.con:
+            if key in self.validators:
+                etag, last_modified = self.validators.pop(key)
+            else:
+                row = self.con.execute(
+                    "SELECT etag, last_modified FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                etag, last_modified = row if row else (None, None)
+            self.con.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, endpoint, item, series, json, etag, last_modified, stored) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    endpoint,
+                    item,
+                    series,
+                    json.dumps(value),
+                    etag,
+                    last_modified,
+                    time.time(),
+                ),
+            )
+
+    def invalidate(self, endpoint: str, item: int | None = None, series: int | None = None) -> None:
+        """
+        Drop the responses a write to `endpoint` may have changed.
+
+        Args:
+            endpoint (str): The endpoint written to.
+            item (int, optional): The ID of the resource written. Its detail response is dropped.
+            series (int, optional): For issues, only lists of this series (or of every series)
+                are dropped.
+        """
+        if self.read_only:
+            return
+        with self.lock, self.con:
+            if series is None:
+                self.con.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND item IS NULL", (endpoint,)
+                )
+            else:
+                self.con.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND item IS NULL "
+                    "AND (series IS NULL OR series = ?)",
+                    (endpoint, series),
+                )
+            if item is not None:
+                self.con.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND item = ?", (endpoint, item)
+                )
+
+    def written(self, endpoint: list[str | int], data: Any, resp: Any) -> None:
+        """
+        Drop the responses affected by a successful write.
+
+        Args:
+            endpoint (list): The endpoint written to, e.g. ["issue"] or ["issue", 31].
+            data: The payload that was sent.
+            resp: Metron's response.
+        """
+        resource = str(endpoint[0])
+        item = int(endpoint[1]) if len(endpoint) > 1 else None
+        if item is None and isinstance(resp, dict):
+            item = resp.get("id")
+        data = data if isinstance(data, dict) else {}
+
+        match resource:
+            case "credit":
+                # Credits only show up in the issue's detail response.
+                rows = resp if isinstance(resp, list) else []
+                for issue in {row["issue"] for row in rows if isinstance(row, dict)}:
+                    self._drop_item("issue", issue)
+            case "variant":
+                if data.get("issue"):
+                    self._drop_item("issue", int(data["issue"]))
+            case "issue":
+                series = data.get("series") or (resp.get("series") if resp else None)
+                series = series.get("id") if isinstance(series, dict) else series
+                self.invalidate("issue", item, int(series) if series else None)
+                # The series' issue count changes.
+                self.invalidate("series", int(series) if series else None)
+            case _:
+                self.invalidate(resource, item)
+
+    def _drop_item(self, endpoint: str, item: int) -> None:
+        if self.read_only:
+            return
+        with self.lock, self.con:
+            self.con.execute(
+                "DELETE FROM responses WHERE endpoint = ? AND item = ?", (endpoint, item)
+            )
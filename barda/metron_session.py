@@ -0,0 +1,131 @@
+"""
+MetronSession module.
+
+This module provides the following classes:
+
+- MetronSession
+"""
+
+import threading
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Any, Iterator
+
+import requests
+from mokkari import exceptions
+from mokkari.schemas.issue import Issue
+from mokkari.session import Session
+from mokkari.sqlite_cache import SqliteCache
+
+from barda.metron_cache import MetronCache, cache_key
+from barda.rate_limit import LIMITER, METRON, endpoint_from_url
+from barda.retry import RetryPolicy
+
+LOGGER = getLogger(__name__)
+
+
+class MetronSession(Session):
+    """
+    Mokkari Session that sends its reads through barda's shared rate limiter.
+
+    With a MetronCache, expired responses are revalidated with a conditional request, so an
+    unchanged response costs a 304 instead of a full download.
+
+    Reads a write is based on can be made in a ``revalidate()`` block, which skips fresh cached
+    responses so they are always checked against Metron.
+
+    An offline session never sends a request: anything not in the cache raises an ApiError.
+
+    Args:
+        username (str): The username for authentication with metron.cloud
+        passwd (str): The password used for authentication with metron.cloud
+        cache (SqliteCache | MetronCache, optional): Cache to use
+        user_agent (str, optional): The user agent string for barda.
+        retry (RetryPolicy, optional): How failed requests are retried.
+        offline (bool): Serve requests only from the cache.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        passwd: str,
+        cache: SqliteCache | MetronCache | None = None,
+        user_agent: str | None = None,
+        retry: RetryPolicy | None = None,
+        offline: bool = False,
+    ) -> None:
+        super(MetronSession, self).__init__(username, passwd, cache=cache, user_agent=user_agent)
+        self.session = requests.Session()
+        self.retry = retry or RetryPolicy()
+        self.offline = offline
+        # Whether the calling thread is in a revalidate() block.
+        self.revalidating = threading.local()
+
+    @contextmanager
+    def revalidate(self) -> Iterator[None]:
+        """Revalidate the cached responses read on this thread in the block, even fresh ones."""
+        previous = getattr(self.revalidating, "active", False)
+        self.revalidating.active = True
+        try:
+            yield
+        finally:
+            self.revalidating.active = previous
+
+    def issue_for_update(self, _id: int) -> Issue:
+        """Return an issue revalidated against Metron, as the base of a patch to it."""
+        with self.revalidate():
+            return self.issue(_id)
+
+    def _get_results_from_cache(self, key: str) -> Any | None:
+        if getattr(self.revalidating, "active", False) and not self.offline:
+            return None
+        return super()._get_results_from_cache(key)
+
+    def _request_data(self, url: str, params: dict[str, str | int] | None = None) -> Any:
+        if params is None:
+            params = {}
+
+        endpoint = endpoint_from_url(url, "/api/")
+        key = cache_key(url, params)
+        if self.offline:
+            raise exceptions.ApiError(f"Offline: {key} isn't in the Metron cache.")
+        headers = dict(self.header)
+        stale = self.cache.stale(key) if isinstance(self.cache, MetronCache) else None
+        if stale is not None:
+            if stale.etag:
+                headers["If-None-Match"] = stale.etag
+            if stale.last_modified:
+                headers["If-Modified-Since"] = stale.last_modified
+
+        def attempt(timeout: float) -> requests.Response:
+            response = self.session.get(
+                url,
+                params=params,
+                timeout=timeout,
+                auth=(self.username, self.passwd),
+                headers=headers,
+            )
+            LIMITER.update(METRON, endpoint, response.status_code, response.headers)
+            return response
+
+        try:
+            response = self.retry.call(
+                "GET",
+                attempt,
+                timeout=2.5,
+                describe=f"GET {endpoint}",
+                acquire=lambda: LIMITER.acquire(METRON, endpoint),
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            raise exceptions.ApiError(f"Connection error: {e!r}") from e
+
+        if response.status_code >= 500 or response.status_code == 429:
+            raise exceptions.ApiError(f"Metron returned {response.status_code} for GET {endpoint}.")
+        if response.status_code == 304 and stale is not None:
+            LOGGER.debug(f"Revalidated cached response for {key}")
+            return stale.data
+        if isinstance(self.cache, MetronCache):
+            self.cache.note_validators(
+                key, response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+        return response.json()
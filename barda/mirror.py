@@ -0,0 +1,305 @@
+"""
+MetronMirror module.
+
+This module provides the following classes:
+
+- MetronMirror
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from mokkari import exceptions
+from mokkari.session import Session
+
+from barda.metron_cache import cache_key
+from barda.projections import IssueSummary, SeriesSummary
+
+LOGGER = getLogger(__name__)
+
+ONE_HOUR = 60 * 60
+ONE_DAY = 24 * ONE_HOUR
+
+# Filters on fields a write can change, so a summary can stop matching them. They are left out
+# of the change scans, which have to see the summaries that no longer match.
+PREDICATES = frozenset({"missing_cv_id"})
+
+# Session list method and projection for each kind of mirrored summary.
+MIRRORED: dict[str, tuple[str, Any]] = {
+    "series": ("series_list", SeriesSummary),
+    "issue": ("issues_list", IssueSummary),
+}
+
+
+class MetronMirror:
+    """
+    Local copy of Metron series and issue list queries, kept up to date with "modified since"
+    cursors.
+
+    The first time a query is listed every result is downloaded. After that only the summaries
+    modified since the query's cursor are fetched: the ones still matching the query are updated,
+    and the ones that no longer match (e.g. an issue that got its Comic Vine ID) are dropped. The
+    list of changes used for that is scoped to the query's filters other than the ``PREDICATES``,
+    e.g. one publisher's series, and is fetched once and shared by all queries with that scope for
+    ``max_age`` seconds. A query refreshed less than ``max_age`` seconds ago is read without any
+    request.
+
+    ``sync()`` refreshes every query that was listed in the last ``unused_ttl`` seconds and drops
+    the others, so browsing a series once doesn't make it part of every later sync.
+
+    Results are returned as compact SeriesSummary and IssueSummary records.
+
+    Args:
+        db_name (str): Path and database name to use.
+        max_age (float): Seconds a query is used without being refreshed.
+        unused_ttl (float): Seconds a query is kept and synced after it was last listed.
+    """
+
+    def __init__(
+        self,
+        db_name: str | Path = "mirror.db",
+        max_age: float = ONE_HOUR,
+        unused_ttl: float = 30 * ONE_DAY,
+    ) -> None:
+        self.max_age = max_age
+        self.unused_ttl = unused_ttl
+        self.con = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.Lock()
+        # Changes by scan scope: the cursor they were fetched from, when they were fetched, and
+        # the modification time of each changed ID. Reused for ``max_age`` seconds.
+        self.changes: dict[str, tuple[datetime, float, dict[int, datetime]]] = {}
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS mirror_queries "
+                "(query PRIMARY KEY, resource, params, cursor, synced, used)"
+            )
+            columns = [row[1] for row in self.con.execute("PRAGMA table_info(mirror_queries)")]
+            if "used" not in columns:
+                # Mirrors from before queries expired count as used when they were last synced.
+                self.con.execute("ALTER TABLE mirror_queries ADD COLUMN used")
+                self.con.execute("UPDATE mirror_queries SET used = synced")
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS mirror_items "
+                "(query, id, json, modified, PRIMARY KEY (query, id))"
+            )
+
+    def _query(self, query: str) -> tuple[datetime | None, float] | None:
+        with self.lock:
+            row = self.con.execute(
+                "SELECT cursor, synced FROM mirror_queries WHERE query = ?", (query,)
+            ).fetchone()
+        if row is None:
+            return None
+        return (datetime.fromisoformat(row[0]) if row[0] else None), row[1]
+
+    def _items(self, resource: str, query: str) -> list[Any]:
+        with self.lock:
+            rows = self.con.execute(
+                "SELECT json FROM mirror_items WHERE query = ? ORDER BY id", (query,)
+            ).fetchall()
+        projection = MIRRORED[resource][1]
+        return [projection.from_json(json.loads(row[0])) for row in rows]
+
+    def _fetch(self, metron: Session, resource: str, params: dict[str, Any]) -> list[Any]:
+        return getattr(metron, MIRRORED[resource][0])(params=params)
+
+    @staticmethod
+    def _scope(params: dict[str, Any]) -> dict[str, Any]:
+        """Return the filters of a query that its change scan keeps."""
+        return {key: value for key, value in params.items() if key not in PREDICATES}
+
+    def _changed(
+        self, metron: Session, resource: str, scope: dict[str, Any], since: datetime
+    ) -> dict[int, datetime]:
+        """Return the IDs of everything of `resource` in `scope` modified after `since`."""
+        key = cache_key(resource, scope)
+        cached = self.changes.get(key)
+        if cached and cached[0] <= since and cached[1] >= time.time() - self.max_age:
+            fetched = cached[2]
+        else:
+            items = self._fetch(metron, resource, {**scope, "modified_gt": since.isoformat()})
+            fetched = {item.id: item.modified for item in items}
+            self.changes[key] = (since, time.time(), fetched)
+        return {i: modified for i, modified in fetched.items() if modified > since}
+
+    def _save(
+        self,
+        resource: str,
+        query: str,
+        params: dict[str, Any],
+        cursor: datetime | None,
+        items: list[Any],
+        removed: set[int] | None = None,
+    ) -> None:
+        with self.lock, self.con:
+            if removed is None:
+                self.con.execute("DELETE FROM mirror_items WHERE query = ?", (query,))
+            else:
+                self.con.executemany(
+                    "DELETE FROM mirror_items WHERE query = ? AND id = ?",
+                    [(query, i) for i in removed],
+                )
+            self.con.executemany(
+                "INSERT OR REPLACE INTO mirror_items (query, id, json, modified) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        query,
+                        item.id,
+                        json.dumps(item.model_dump(mode="json")),
+                        item.modified.isoformat(),
+                    )
+                    for item in items
+                ],
+            )
+            self.con.execute(
+                "INSERT INTO mirror_queries (query, resource, params, cursor, synced, used) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (query) DO UPDATE "
+                "SET cursor = excluded.cursor, synced = excluded.synced",
+                (
+                    query,
+                    resource,
+                    json.dumps(params),
+                    cursor.isoformat() if cursor else None,
+                    time.time(),
+                    time.time(),
+                ),
+            )
+
+    def refresh(self, metron: Session, resource: str, params: dict[str, Any]) -> int:
+        """
+        Bring one query up to date, downloading it in full if it isn't mirrored yet.
+
+        Args:
+            metron (Session): Session to fetch the summaries with.
+            resource (str): "series" or "issue".
+            params (dict): The query's filters, e.g. {"series_id": 3, "missing_cv_id": True}.
+
+        Returns:
+            The number of summaries fetched.
+        """
+        query = cache_key(resource, params)
+        cursor = state[0] if (state := self._query(query)) else None
+        if cursor is None:
+            items = self._fetch(metron, resource, params)
+            latest = max((item.modified for item in items), default=None)
+            self._save(resource, query, params, latest, items)
+            return len(items)
+
+        changed = self._changed(metron, resource, self._scope(params), cursor)
+        items = self._fetch(metron, resource, {**params, "modified_gt": cursor.isoformat()})
+        matching = {item.id for item in items}
+        # Changed summaries that aren't in the query anymore.
+        removed = set(changed) - matching
+        latest = max([cursor, *changed.values()])
+        self._save(resource, query, params, latest, items, removed)
+        return len(items)
+
+    def list(self, metron: Session, resource: str, params: dict[str, Any]) -> list[Any]:
+        """
+        Return the results of a series or issue list query from the mirror.
+
+        The query is refreshed first if it hasn't been in the last ``max_age`` seconds. If Metron
+        can't be reached, the mirrored results are returned as they are.
+
+        Args:
+            metron (Session): Session to fetch the summaries with.
+            resource (str): "series" or "issue".
+            params (dict): The query's filters.
+        """
+        query = cache_key(resource, params)
+        state = self._query(query)
+        if state is None or state[1] < time.time() - self.max_age:
+            try:
+                self.refresh(metron, resource, params)
+            except exceptions.ApiError:
+                if state is None:
+                    raise
+                LOGGER.warning(f"Unable to refresh mirrored {resource} list: {params}")
+        with self.lock, self.con:
+            self.con.execute(
+                "UPDATE mirror_queries SET used = ? WHERE query = ?", (time.time(), query)
+            )
+        return self._items(resource, query)
+
+    def cv_id_set(self, resource: str, metron_id: int) -> None:
+        """
+        Drop a summary from the queries filtered on ``missing_cv_id`` once it has a Comic Vine ID.
+
+        Args:
+            resource (str): "series" or "issue".
+            metron_id (int): The Metron ID that was given a Comic Vine ID.
+        """
+        with self.lock, self.con:
+            queries = [
+                row[0]
+                for row in self.con.execute(
+                    "SELECT query, params FROM mirror_queries WHERE resource = ?", (resource,)
+                )
+                if json.loads(row[1]).get("missing_cv_id")
+            ]
+            self.con.executemany(
+                "DELETE FROM mirror_items WHERE query = ? AND id = ?",
+                [(query, metron_id) for query in queries],
+            )
+
+    def _drop_unused(self) -> int:
+        """Remove the queries that haven't been listed in the last ``unused_ttl`` seconds."""
+        with self.lock, self.con:
+            queries = [
+                row[0]
+                for row in self.con.execute(
+                    "SELECT query FROM mirror_queries WHERE used < ?",
+                    (time.time() - self.unused_ttl,),
+                )
+            ]
+            self.con.executemany(
+                "DELETE FROM mirror_items WHERE query = ?", [(query,) for query in queries]
+            )
+            self.con.executemany(
+                "DELETE FROM mirror_queries WHERE query = ?", [(query,) for query in queries]
+            )
+        return len(queries)
+
+    def sync(self, metron: Session) -> dict[str, int]:
+        """
+        Refresh every mirrored query that was used recently, and drop the others. Meant to be run
+        on a schedule with --sync-mirror.
+
+        Returns:
+            The number of summaries fetched, by resource.
+        """
+        if removed := self._drop_unused():
+            LOGGER.info(f"Removed {removed} mirrored lists that weren't used recently.")
+        with self.lock:
+            rows = self.con.execute(
+                "SELECT resource, params, cursor FROM mirror_queries"
+            ).fetchall()
+        counts: dict[str, int] = {resource: 0 for resource in MIRRORED}
+        # Fetch the changes of each scope once, from the oldest cursor of its queries.
+        oldest: dict[str, tuple[str, dict[str, Any], datetime]] = {}
+        for resource, params, cursor in rows:
+            if not cursor:
+                continue
+            scope = self._scope(json.loads(params))
+            key = cache_key(resource, scope)
+            since = datetime.fromisoformat(cursor)
+            if key not in oldest or since < oldest[key][2]:
+                oldest[key] = (resource, scope, since)
+        for resource, scope, since in oldest.values():
+            try:
+                self._changed(metron, resource, scope, since)
+            except exceptions.ApiError as err:
+                LOGGER.warning(f"Unable to fetch {resource} changes for {scope}: {err}")
+        for resource, params, _ in rows:
+            try:
+                counts[resource] += self.refresh(metron, resource, json.loads(params))
+            except exceptions.ApiError as err:
+                LOGGER.warning(f"Unable to sync mirrored {resource} list {params}: {err}")
+        return counts
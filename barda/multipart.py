@@ -0,0 +1,147 @@
+"""
+Multipart module.
+
+This module provides the following classes:
+
+- MultipartStream
+"""
+
+import io
+import os
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO
+
+CHUNK_SIZE = 64 * 1024
+
+ImageSource = str | Path | bytes | BinaryIO | tuple[str, bytes | BinaryIO]
+
+
+def image_name(image: ImageSource) -> str:
+    """Return the filename of an image source."""
+    if isinstance(image, tuple):
+        return image[0]
+    if isinstance(image, (str, Path)):
+        return Path(image).name
+    if isinstance(image, bytes):
+        return "image"
+    return Path(getattr(image, "name", "image")).name
+
+
+def _open_image(image: ImageSource) -> tuple[str, BinaryIO, bool]:
+    """Return the filename, a file object and whether the file object was opened here."""
+    name = image_name(image)
+    if isinstance(image, tuple):
+        image = image[1]
+    if isinstance(image, (str, Path)):
+        return name, Path(image).open("rb"), True
+    if isinstance(image, bytes):
+        return name, io.BytesIO(image), True
+    return name, image, False
+
+
+class MultipartStream:
+    """
+    A multipart/form-data body that is read in chunks as it is sent.
+
+    Unlike ``requests``' ``files`` argument, the image is never copied into memory as a whole.
+    It is read from its file object (or path) while the request body is being written, so a
+    processed cover can be handed over as a buffer and an image on disk is streamed from disk.
+
+    Form values are encoded the way ``requests`` does: a list becomes one part per item and
+    ``None`` values are skipped.
+
+    Args:
+        data (dict): The form values.
+        image (ImageSource): A path, bytes, a binary file object or a (filename, bytes or file
+            object) tuple.
+    """
+
+    def __init__(self, data: dict[str, Any], image: ImageSource) -> None:
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        name, self.file, self._owns_file = _open_image(image)
+        self.image_name = name
+        self.fields = list(self._items(data))
+        self.file_start = self.file.tell()
+        self.file_size = self.file.seek(0, os.SEEK_END) - self.file_start
+        self.file.seek(self.file_start)
+
+        fields = b"".join(self._field(key, value) for key, value in self.fields)
+        quoted = name.replace('"', "%22")
+        self.head = (
+            fields
+            + (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="image"; filename="{quoted}"\r\n\r\n'
+            ).encode()
+        )
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self.position = 0
+
+    @staticmethod
+    def _items(data: dict[str, Any]):
+        for key, value in data.items():
+            for v in value if isinstance(value, (list, tuple)) else [value]:
+                if v is not None:
+                    yield key, v
+
+    def _field(self, key: str, value: Any) -> bytes:
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        return (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'.encode()
+            + value
+            + b"\r\n"
+        )
+
+    def __len__(self) -> int:
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Move to `offset`. Used by urllib3 to rewind the body before a retry."""
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += len(self)
+        self.position = max(0, min(offset, len(self)))
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes of the body, or the rest of it if `size` is negative."""
+        if size is None or size < 0:
+            size = len(self) - self.position
+        chunks = []
+        while size > 0 and self.position < len(self):
+            chunk = self._read_part(min(size, CHUNK_SIZE))
+            chunks.append(chunk)
+            size -= len(chunk)
+            self.position += len(chunk)
+        return b"".join(chunks)
+
+    def _read_part(self, size: int) -> bytes:
+        pos = self.position
+        head_end = len(self.head)
+        file_end = head_end + self.file_size
+        if pos < head_end:
+            end = pos + size
+            return self.head[pos:end]
+        if pos < file_end:
+            self.file.seek(self.file_start + pos - head_end)
+            chunk = self.file.read(min(size, file_end - pos))
+            if not chunk:
+                raise OSError("Image ended before its expected size.")
+            return chunk
+        start = pos - file_end
+        end = start + size
+        return self.tail[start:end]
+
+    def close(self) -> None:
+        """Close the image file if it was opened here, otherwise rewind it for the next use."""
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.seek(self.file_start)
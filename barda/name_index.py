@@ -0,0 +1,283 @@
+"""
+NameIndex module.
+
+This module provides the following classes:
+
+- IndexedName
+- NameIndex
+"""
+
+import difflib
+import re
+import sqlite3
+import threading
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+from mokkari import exceptions
+from mokkari.session import Session
+
+LOGGER = getLogger(__name__)
+
+# Session list method for each kind of resource in the index.
+RESOURCES: dict[str, str] = {
+    "arc": "arcs_list",
+    "character": "characters_list",
+    "creator": "creators_list",
+    "team": "teams_list",
+}
+
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for lookups: case, accents and punctuation are ignored.
+
+    For example "Spider-Man" and "spider man" are both "spider man", and "Pépé" is "pepe".
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_WORD.sub(" ", stripped).strip()
+
+
+class IndexedName(NamedTuple):
+    """A Metron resource found in the index."""
+
+    id: int
+    name: str
+
+
+class _Names:
+    """In-memory lookup tables for one resource."""
+
+    def __init__(self) -> None:
+        self.names: dict[int, str] = {}
+        self.keys: dict[str, set[int]] = {}
+        self.tokens: dict[str, set[int]] = {}
+        self.sorted_keys: list[str] = []
+        self.dirty = False
+
+    def add(self, metron_id: int, key: str) -> None:
+        if key not in self.keys:
+            self.keys[key] = set()
+            self.dirty = True
+        self.keys[key].add(metron_id)
+        for token in key.split():
+            self.tokens.setdefault(token, set()).add(metron_id)
+
+    def remove(self, metron_id: int, key: str) -> None:
+        ids = self.keys.get(key, set())
+        ids.discard(metron_id)
+        if not ids:
+            self.keys.pop(key, None)
+            self.dirty = True
+        for token in key.split():
+            self.tokens.get(token, set()).discard(metron_id)
+
+    def prefixed(self, prefix: str) -> Iterable[str]:
+        if self.dirty:
+            self.sorted_keys = sorted(self.keys)
+            self.dirty = False
+        i = bisect_left(self.sorted_keys, prefix)
+        while i < len(self.sorted_keys) and self.sorted_keys[i].startswith(prefix):
+            yield self.sorted_keys[i]
+            i += 1
+
+
+class NameIndex:
+    """
+    Local index of the names and aliases of Metron characters, teams, arcs and creators.
+
+    The index is filled by ``sync()``, which only asks Metron for what changed since the last
+    sync, and by the names the importers find or confirm. ``search()`` looks a name up by exact
+    match, prefix, tokens and finally fuzzy match, so candidates are found without a search
+    request. ComicVineImporter asks Metron when the index has nothing, or, for a resource that
+    hasn't been synced yet, when the name itself isn't in the index.
+
+    An index that isn't persisted, as in a dry run, is read from the database but only changed
+    in memory.
+
+    Args:
+        db_name (str): Path and database name to use.
+        persist (bool): Save added names and synced changes to the database.
+    """
+
+    def __init__(self, db_name: str | Path = "names.db", persist: bool = True) -> None:
+        self.persist = persist
+        self.con = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.resources: dict[str, _Names] = {resource: _Names() for resource in RESOURCES}
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS names "
+                "(resource, id, name, key, alias, PRIMARY KEY (resource, id, key))"
+            )
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS name_sync (resource PRIMARY KEY, modified)"
+            )
+            rows = self.con.execute("SELECT resource, id, name, key, alias FROM names").fetchall()
+        for resource, metron_id, name, key, alias in rows:
+            names = self.resources[resource]
+            names.add(metron_id, key)
+            if not alias:
+                names.names[metron_id] = name
+
+    def add(self, resource: str, metron_id: int, name: str, alias: bool = False) -> None:
+        """
+        Add a resource's name, replacing its previous name, or one of its aliases.
+
+        Args:
+            resource (str): One of "arc", "character", "creator" or "team".
+            metron_id (int): The Metron ID.
+            name (str): The name.
+            alias (bool): Whether `name` is another name for the resource, e.g. the one Comic
+                Vine uses.
+        """
+        self.add_many(resource, [(metron_id, name)], alias)
+
+    def add_many(
+        self, resource: str, items: Iterable[tuple[int, str]], alias: bool = False
+    ) -> None:
+        """Add the names of many resources in one transaction."""
+        names = self.resources[resource]
+        with self.lock, self.con:
+            for metron_id, name in items:
+                if not (key := normalize_name(name)):
+                    continue
+                if not alias and (old := names.names.get(metron_id)) is not None:
+                    old_key = normalize_name(old)
+                    names.remove(metron_id, old_key)
+                    if self.persist:
+                        self.con.execute(
+                            "DELETE FROM names WHERE resource = ? AND id = ? AND key = ?",
+                            (resource, metron_id, old_key),
+                        )
+                names.add(metron_id, key)
+                if not alias or metron_id not in names.names:
+                    names.names[metron_id] = name
+                if self.persist:
+                    self.con.execute(
+                        "INSERT OR REPLACE INTO names (resource, id, name, key, alias) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (resource, metron_id, name, key, alias),
+                    )
+
+    def has(self, resource: str, name: str) -> bool:
+        """Return whether a name, or an alias with the same spelling, is in the index."""
+        with self.lock:
+            return normalize_name(name) in self.resources[resource].keys
+
+    def search(self, resource: str, name: str, limit: int = 10) -> list[IndexedName]:
+        """
+        Return the resources matching a name, best matches first.
+
+        Exact matches come first, then names starting with `name`, names containing all its
+        words, and finally close spellings.
+
+        Args:
+            resource (str): One of "arc", "character", "creator" or "team".
+            name (str): The name to look up.
+            limit (int): Maximum number of results.
+        """
+        if not (key := normalize_name(name)):
+            return []
+        names = self.resources[resource]
+        found: list[int] = []
+
+        def extend(ids: Iterable[int]) -> None:
+            found.extend(sorted(i for i in ids if i not in found))
+
+        with self.lock:
+            extend(names.keys.get(key, set()))
+            for prefixed in names.prefixed(key):
+                if len(found) >= limit:
+                    break
+                extend(names.keys[prefixed])
+            if len(found) < limit:
+                token_ids = [names.tokens.get(token, set()) for token in key.split()]
+                extend(set.intersection(*token_ids) if token_ids else set())
+            if not found:
+                for close in difflib.get_close_matches(key, names.keys, n=limit, cutoff=0.8):
+                    extend(names.keys[close])
+            return [IndexedName(i, names.names.get(i, "")) for i in found[:limit]]
+
+    def synced(self, resource: str) -> datetime | None:
+        """Return the modification time up to which `resource` has been synced."""
+        with self.lock:
+            row = self.con.execute(
+                "SELECT modified FROM name_sync WHERE resource = ?", (resource,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def _remove_missing(self, resource: str, metron_ids: set[int]) -> int:
+        """Remove the names and aliases of every resource not in `metron_ids`."""
+        names = self.resources[resource]
+        with self.lock, self.con:
+            rows = self.con.execute(
+                "SELECT id, key FROM names WHERE resource = ?", (resource,)
+            ).fetchall()
+            missing = [(metron_id, key) for metron_id, key in rows if metron_id not in metron_ids]
+            for metron_id, key in missing:
+                names.remove(metron_id, key)
+                names.names.pop(metron_id, None)
+            if self.persist:
+                self.con.executemany(
+                    "DELETE FROM names WHERE resource = ? AND id = ?",
+                    [(resource, metron_id) for metron_id, _ in missing],
+                )
+        return len({metron_id for metron_id, _ in missing})
+
+    def sync(
+        self, metron: Session, resources: Iterable[str] = RESOURCES, full: bool = False
+    ) -> dict[str, int]:
+        """
+        Fetch the names changed on Metron since the last sync.
+
+        The first sync of a resource, or a full sync, downloads every name, which takes a while.
+        A full sync also removes the resources that were deleted on Metron.
+
+        Args:
+            metron (Session): Session to fetch the names with.
+            resources (Iterable): The resources to sync.
+            full (bool): Replace the names instead of fetching only the changed ones.
+
+        Returns:
+            The number of names fetched, by resource.
+        """
+        counts: dict[str, int] = {}
+        for resource in resources:
+            since = None if full else self.synced(resource)
+            params: dict[str, Any] = {"modified_gt": since.isoformat()} if since else {}
+            try:
+                items = getattr(metron, RESOURCES[resource])(params=params)
+            except exceptions.ApiError as err:
+                LOGGER.warning(f"Unable to sync {resource} names: {err}")
+                continue
+            self.add_many(resource, ((item.id, item.name) for item in items))
+            if since is None and (removed := self._remove_missing(resource, {i.id for i in items})):
+                LOGGER.info(f"Removed {removed} {resource}s deleted on Metron from the index.")
+            latest = max((item.modified for item in items), default=since)
+            if latest is not None and self.persist:
+                with self.lock, self.con:
+                    self.con.execute(
+                        "INSERT OR REPLACE INTO name_sync (resource, modified) VALUES (?, ?)",
+                        (resource, latest.isoformat()),
+                    )
+            counts[resource] = len(items)
+        return counts
+
+    def start_sync(self, metron: Session) -> threading.Thread | None:
+        """Bring the resources that have been synced before up to date in a background thread."""
+        resources = [resource for resource in RESOURCES if self.synced(resource) is not None]
+        if not resources:
+            return None
+        thread = threading.Thread(
+            target=self.sync, args=(metron, resources), name="name-index", daemon=True
+        )
+        thread.start()
+        return thread
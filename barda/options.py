@@ -1,6 +1,7 @@
 """Utility to create an argument parser"""
 
 import argparse
+from pathlib import Path
 
 from barda import __version__
 
@@ -16,5 +17,46 @@ def make_parser():
         version=f"%(prog)s {__version__}",
         help="Show the version number and exit",
     )
+    parser.add_argument(
+        "--dry-run",
+        nargs="?",
+        const=Path("barda-journal.jsonl"),
+        type=Path,
+        metavar="JOURNAL",
+        help="Record writes to a JSONL journal instead of sending them to Metron",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Read only from the local Comic Vine and Metron caches. Implies --dry-run",
+    )
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        metavar="JOURNAL",
+        help="Resend a dry run journal to a stub server and report the write throughput",
+    )
+    parser.add_argument(
+        "--stub-url",
+        default="http://localhost:8000",
+        help="Server to send the --replay journal to",
+    )
+    parser.add_argument(
+        "--sync-names",
+        action="store_true",
+        help="Download the names of Metron characters, teams, arcs and creators for local lookup",
+    )
+    parser.add_argument(
+        "--sync-mirror",
+        action="store_true",
+        help="Update the local copy of the Metron series and issue lists, e.g. from a cron job",
+    )
+    parser.add_argument(
+        "--warm-volumes",
+        nargs="+",
+        type=int,
+        metavar="CV_ID",
+        help="Download the issues, credits and covers of Comic Vine volumes ahead of an import",
+    )
 
     return parser
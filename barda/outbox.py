@@ -0,0 +1,219 @@
+"""
+Outbox module.
+
+This module provides the following classes:
+
+- ConversionKey
+- OutboxEntry
+- Outbox
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from barda.multipart import image_name
+from barda.resource_keys import Resources
+
+
+class ConversionKey(NamedTuple):
+    """
+    A conversion cache entry to save with the Metron ID from a write's response.
+
+    Args:
+        source (str): Either "cv" or "gcd".
+        resource (int): The Resource enum value.
+        key (int): The Comic Vine or GCD ID.
+    """
+
+    source: str
+    resource: int
+    key: int
+
+
+class OutboxEntry(NamedTuple):
+    """A write recorded in the outbox."""
+
+    id: int
+    action: str
+    endpoint: list[str | int]
+    data: Any
+    ref: str | None
+    keys: list[ConversionKey]
+
+
+def _journal_data(data: Any) -> str:
+    # Images held in memory aren't journaled, only their name.
+    if isinstance(data, dict) and data.get("image") and not isinstance(data["image"], (str, Path)):
+        data = {**data, "image": image_name(data["image"])}
+    return json.dumps(data, default=str)
+
+
+def write_ref(endpoint: list[str | int], data: Any) -> str | None:
+    """
+    Return a key identifying what a write creates or changes, used for idempotency checks.
+
+    Args:
+        endpoint (list): The endpoint being written to, e.g. ["issue"] or ["issue", 31].
+        data: The payload being sent.
+    """
+    if len(endpoint) > 1:
+        return "/".join(str(e) for e in endpoint)
+    if not isinstance(data, dict):
+        return None
+    resource = endpoint[0]
+    if resource == "issue" and data.get("series") and data.get("number"):
+        return issue_ref(data["series"], data["number"])
+    if data.get("cv_id"):
+        return f"{resource}/cv:{data['cv_id']}"
+    return None
+
+
+def issue_ref(series_id: int, number: str) -> str:
+    """Return the ref used for the creation of issue `number` in series `series_id`."""
+    return f"issue/series:{series_id}/number:{number}"
+
+
+class Outbox:
+    """
+    SQLite journal of writes to Metron.
+
+    Every write is recorded before it is sent and marked done once Metron responds, so an
+    interrupted run can be resumed. The journal lives in the conversions database, which lets a
+    write be marked done in the same transaction that saves its conversion cache entries.
+
+    The connection may be used from the background write threads, so access is serialized.
+
+    Args:
+        db_name (str): Path and database name to use. Normally the conversions database.
+    """
+
+    def __init__(self, db_name: str | Path = "barda.db") -> None:
+        self.con = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY, action, endpoint, "
+                "data, ref, keys, status, metron, error, created, updated)"
+            )
+            self.con.execute("CREATE INDEX IF NOT EXISTS outbox_ref ON outbox (ref, status)")
+            self.con.execute("CREATE TABLE IF NOT EXISTS conversions (resource, cv, metron)")
+            self.con.execute("CREATE TABLE IF NOT EXISTS gcddb (resource, gcd, metron)")
+            self.con.execute("CREATE TABLE IF NOT EXISTS gcd_missing (gcd PRIMARY KEY, checked)")
+        self.prune()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(tz=timezone.utc).isoformat()
+
+    def begin(
+        self,
+        action: str,
+        endpoint: list[str | int],
+        data: Any,
+        keys: list[ConversionKey] | None = None,
+    ) -> int:
+        """
+        Record a write that is about to be sent.
+
+        Returns:
+            The outbox entry ID.
+        """
+        with self.lock, self.con:
+            cur = self.con.execute(
+                "INSERT INTO outbox (action, endpoint, data, ref, keys, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+                (
+                    action,
+                    json.dumps(endpoint),
+                    _journal_data(data),
+                    write_ref(endpoint, data),
+                    json.dumps(keys or []),
+                    self._now(),
+                    self._now(),
+                ),
+            )
+            return cur.lastrowid  # type: ignore
+
+    def finish(self, entry_id: int, metron_id: int | None) -> None:
+        """
+        Mark a write done and save its conversion cache entries in the same transaction.
+
+        Args:
+            entry_id (int): The outbox entry ID.
+            metron_id (int): The Metron ID of the created or updated resource.
+        """
+        with self.lock, self.con:
+            row = self.con.execute("SELECT keys FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+            keys = [ConversionKey(*k) for k in json.loads(row[0])] if row else []
+            if metron_id is not None:
+                for key in keys:
+                    table, column = (
+                        ("gcddb", "gcd") if key.source == "gcd" else ("conversions", "cv")
+                    )
+                    self.con.execute(
+                        f"INSERT INTO {table} (resource, {column}, metron) VALUES (?, ?, ?)",
+                        (key.resource, key.key, metron_id),
+                    )
+                    if key.source == "gcd" and key.resource == Resources.Issue.value:
+                        self.con.execute("DELETE FROM gcd_missing WHERE gcd = ?", (key.key,))
+            self.con.execute(
+                "UPDATE outbox SET status = 'done', metron = ?, updated = ? WHERE id = ?",
+                (metron_id, self._now(), entry_id),
+            )
+
+    def fail(self, entry_id: int, error: str) -> None:
+        """Mark a write that Metron rejected, so it isn't resumed."""
+        with self.lock, self.con:
+            self.con.execute(
+                "UPDATE outbox SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                (error, self._now(), entry_id),
+            )
+
+    def pending(self) -> list[OutboxEntry]:
+        """Return the writes that were started but never confirmed, oldest first."""
+        with self.lock:
+            rows = self.con.execute(
+                "SELECT id, action, endpoint, data, ref, keys FROM outbox "
+                "WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+        return [
+            OutboxEntry(
+                row[0],
+                row[1],
+                json.loads(row[2]),
+                json.loads(row[3]),
+                row[4],
+                [ConversionKey(*k) for k in json.loads(row[5])],
+            )
+            for row in rows
+        ]
+
+    def done(self, ref: str) -> int | None:
+        """Return the Metron ID from a completed write with the given ref, if there is one."""
+        with self.lock:
+            row = self.con.execute(
+                "SELECT metron FROM outbox WHERE ref = ? AND status = 'done' "
+                "ORDER BY id DESC LIMIT 1",
+                (ref,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def discard(self) -> None:
+        """Forget about any pending writes."""
+        with self.lock, self.con:
+            self.con.execute(
+                "UPDATE outbox SET status = 'discarded', updated = ? WHERE status = 'pending'",
+                (self._now(),),
+            )
+
+    def prune(self, days: int = 30) -> None:
+        """Remove finished entries older than `days`."""
+        cutoff = (datetime.now(tz=timezone.utc) - timedelta(days=days)).isoformat()
+        with self.lock, self.con:
+            self.con.execute(
+                "DELETE FROM outbox WHERE status != 'pending' AND updated < ?", (cutoff,)
+            )
@@ -1,20 +1,28 @@
 import json
 import platform
+import time
 from enum import Enum, auto, unique
 from logging import getLogger
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, List, Union
 
 import requests
-from ratelimit import limits, sleep_and_retry
 from requests.adapters import HTTPAdapter
-from urllib3 import Retry
 
 from barda import __version__, exceptions
+from barda.credit_writer import CreditResult, CreditWriter
+from barda.dry_run import PayloadRecorder
+from barda.metrics import METRICS, WriteMetrics
+from barda.metron_cache import MetronCache
+from barda.multipart import MultipartStream, image_name
+from barda.outbox import ConversionKey, Outbox, OutboxEntry
+from barda.rate_limit import LIMITER, METRON, WRITE
+from barda.retry import RetryPolicy
 
 LOGGER = getLogger(__name__)
 
-ONE_MINUTE = 60
+# Statuses from a proxy in front of Metron, after which it's unknown whether a write was saved.
+GATEWAY_STATUS = frozenset({502, 504})
 
 
 @unique
@@ -24,58 +32,222 @@ class RequestAction(Enum):
 
 
 class PostData:
-    def __init__(self, user: str, passwd: str) -> None:
+    """
+    Write data to Metron.
+
+    All writes share one keep-alive session, so the connection (and TLS handshake) to Metron
+    is only set up once per pool slot instead of once per request.
+
+    Args:
+        user (str): Metron username.
+        passwd (str): Metron password.
+        pool_size (int): Maximum number of pooled connections to keep open.
+        warm_up (bool): Open a connection to Metron before the first write.
+        outbox (Outbox, optional): Journal every write in this outbox before sending it.
+        journal (Path, optional): Dry run. Record the writes to this JSONL file instead of
+            sending them to Metron.
+        metrics (WriteMetrics, optional): Where to record per-endpoint request metrics.
+        retry (RetryPolicy, optional): How failed requests are retried.
+        read_cache (MetronCache, optional): Metron read cache to invalidate after each write.
+    """
+
+    def __init__(
+        self,
+        user: str,
+        passwd: str,
+        pool_size: int = 4,
+        warm_up: bool = False,
+        outbox: Outbox | None = None,
+        journal: Path | None = None,
+        metrics: WriteMetrics = METRICS,
+        retry: RetryPolicy | None = None,
+        read_cache: MetronCache | None = None,
+    ) -> None:
         self.user = user
         self.passwd = passwd
+        self.outbox = outbox
+        self.metrics = metrics
+        self.retry = retry or RetryPolicy()
+        self.read_cache = read_cache
+        # Recorded writes don't reach Metron, so they don't count against the rate limit.
+        self.rate_limited = journal is None
         self.api_url = "https://metron.cloud/api/{}/"
         self.header = {
             "User-Agent": f"Barda/{__version__} ({platform.system()}; {platform.release()})"
         }
+        self.session = self._create_session(pool_size)
+        if journal is not None:
+            self.session.mount("https://", PayloadRecorder(journal))
+        self.credits = CreditWriter(lambda rows: self._write(RequestAction.Post, ["credit"], rows))
+        if warm_up:
+            self.warm_up()
 
-    @sleep_and_retry
-    @limits(calls=10, period=ONE_MINUTE)
-    def _request(self, request_type: RequestAction, endpoint: List[Union[str, int]], data):
-        url = self.api_url.format("/".join(str(e) for e in endpoint))
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled by the RetryPolicy, so they can be bounded by a deadline.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        return session
+
+    def warm_up(self) -> None:
+        """Open a keep-alive connection to Metron so the first write doesn't pay for it."""
+        try:
+            self.session.head(
+                self.api_url.format("issue"),
+                timeout=10,
+                headers=self.header,
+                auth=(self.user, self.passwd),
+            )
+        except requests.exceptions.RequestException as e:
+            LOGGER.warning(f"Unable to warm up connection to Metron: {repr(e)}")
+
+    def close(self) -> None:
+        """Send any buffered credits and close the pooled connections."""
+        self.credits.flush()
+        self.session.close()
+
+    def _write(
+        self,
+        request_type: RequestAction,
+        endpoint: List[Union[str, int]],
+        data,
+        keys: list[ConversionKey] | None = None,
+        entry_id: int | None = None,
+    ):
+        if self.outbox is not None and entry_id is None:
+            entry_id = self.outbox.begin(request_type.name, endpoint, data, keys)
 
-        if "image" in data.keys():
-            i = data.pop("image")
-            if i:
-                img_path = Path(i)
-                files = {"image": (img_path.name, img_path.read_bytes())}
+        try:
+            if endpoint == ["credit"]:
+                resp = self._post_credits(endpoint, data)
             else:
-                files = None
+                resp = self._request(request_type, endpoint, data)
+        except exceptions.ApiConnectionError as err:
+            # Metron may or may not have received it, so leave it pending to be checked later.
+            self.metrics.error(str(endpoint[0]), err)
+            raise
+        except exceptions.ApiError as err:
+            self.metrics.error(str(endpoint[0]), err)
+            if entry_id is not None:
+                self.outbox.fail(entry_id, str(err))  # type: ignore
+            raise
+
+        if entry_id is not None:
+            metron_id = resp.get("id") if isinstance(resp, dict) else None
+            self.outbox.finish(entry_id, metron_id)  # type: ignore
+        if self.read_cache is not None:
+            self.read_cache.written(endpoint, data, resp)
+        return resp
+
+    def replay(self, entry: OutboxEntry):
+        """
+        Resend a write left pending in the outbox by an interrupted run.
+
+        Temporary images from the interrupted run are gone, so the write is resent without one.
+        """
+        data = entry.data
+        # Images kept in memory are journaled by name only, so they can't be resent either.
+        if isinstance(data, dict) and data.get("image") and not Path(data["image"]).exists():
+            LOGGER.warning(f"Image for outbox entry {entry.id} no longer exists.")
+            data["image"] = ""
+        return self._write(RequestAction[entry.action], entry.endpoint, data, entry_id=entry.id)
+
+    def _send(self, method: str, endpoint: List[Union[str, int]], **kwargs) -> requests.Response:
+        """Send a request through the rate limiter and retry policy, and record its metrics."""
+        url = self.api_url.format("/".join(str(e) for e in endpoint))
+        name = str(endpoint[0])
+        # Credits have their own budget. Every other write shares the write budget.
+        budget = name if name == "credit" else WRITE
+        attempts = 0
+        waited = 0.0
+
+        def attempt(timeout: float) -> requests.Response:
+            nonlocal attempts
+            attempts += 1
+            if isinstance(kwargs.get("data"), MultipartStream):
+                kwargs["data"].seek(0)
+            response = self.session.request(
+                method, url, timeout=timeout, auth=(self.user, self.passwd), **kwargs
+            )
+            if self.rate_limited:
+                LIMITER.update(METRON, budget, response.status_code, response.headers)
+            return response
+
+        def acquire() -> float:
+            nonlocal waited
+            wait = LIMITER.acquire(METRON, budget) if self.rate_limited else 0.0
+            waited += wait
+            return wait
+
+        start = time.perf_counter()
+        try:
+            response = self.retry.call(
+                method, attempt, timeout=40, describe=f"{method} {name}", acquire=acquire
+            )
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            # The request may have reached Metron, so the write is left pending to be resumed.
+            LOGGER.error(f"Connection error: {repr(e)}")
+            raise exceptions.ApiConnectionError(f"Connection error: {repr(e)}") from e
+        except requests.exceptions.RequestException as e:
+            LOGGER.error(f"Request error: {repr(e)}")
+            raise exceptions.ApiError(f"Request error: {repr(e)}") from e
+
+        self.metrics.record(
+            name,
+            time.perf_counter() - start - waited,
+            bytes_sent=int(response.request.headers.get("Content-Length", 0)),
+            retries=attempts - 1,
+            waited=waited,
+        )
+
+        status = response.status_code
+        if status in GATEWAY_STATUS:
+            raise exceptions.ApiConnectionError(
+                f"Metron returned {status} for {method} {name} after {attempts} attempts. "
+                "The write may or may not have been saved."
+            )
+        if status >= 500 or status == 429:
+            raise exceptions.ApiError(
+                f"Metron returned {status} for {method} {name} after {attempts} attempts."
+            )
+        return response
+
+    def _request(self, request_type: RequestAction, endpoint: List[Union[str, int]], data):
+        # Copy the payload, so the caller's data still has its image.
+        data = dict(data)
+        i = data.pop("image", "")
+        if i:
+            # Stream the image in the request body instead of reading it into memory first.
+            body = MultipartStream(data, i)
+            headers = {**self.header, "Content-Type": body.content_type}
+            i = image_name(i)
         else:
-            i = ""
-            files = None
+            body = None
+            headers = self.header
 
         LOGGER.debug(f"request() data: {data}")
 
-        session = requests.Session()
-        retry = Retry(connect=10, backoff_factor=4.5)
-        session.mount("https://", HTTPAdapter(max_retries=retry))
         try:
-            match request_type:
-                case RequestAction.Post:
-                    response = session.post(
-                        url,
-                        timeout=40,
-                        headers=self.header,
-                        auth=(self.user, self.passwd),
-                        data=data,
-                        files=files,
-                    )
-                case RequestAction.Patch:
-                    response = session.patch(
-                        url,
-                        timeout=40,
-                        headers=self.header,
-                        auth=(self.user, self.passwd),
-                        data=data,
-                        files=files,
-                    )
-        except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout) as e:
-            LOGGER.error(f"Connection error: {repr(e)}")
-            raise exceptions.ApiError(f"Connection error: {repr(e)}") from e
+            response = self._send(
+                "POST" if request_type == RequestAction.Post else "PATCH",
+                endpoint,
+                headers=headers,
+                data=data if body is None else body,
+            )
+        finally:
+            if body is not None:
+                body.close()
 
         if response.status_code == 400:
             LOGGER.error(f"Bad Request: data={data}, image={i}")
@@ -87,11 +259,7 @@ class PostData:
             raise exceptions.ApiError(resp["detail"])
         return resp
 
-    @sleep_and_retry
-    @limits(calls=28, period=ONE_MINUTE)
     def _post_credits(self, endpoint: List[Union[str, int]], data):
-        url = self.api_url.format("/".join(str(e) for e in endpoint))
-
         header = {
             "User-Agent": f"Barda/{__version__} ({platform.system()}; {platform.release()})",
             "Content-Type": "application/json",
@@ -99,20 +267,7 @@ class PostData:
 
         LOGGER.debug(f"post_credits data: {data}")
 
-        try:
-            session = requests.Session()
-            retry = Retry(connect=10, backoff_factor=4.5)
-            session.mount("https://", HTTPAdapter(max_retries=retry))
-            response = session.post(
-                url,
-                timeout=40,
-                headers=header,
-                auth=(self.user, self.passwd),
-                data=json.dumps(data),
-            )
-        except requests.exceptions.ConnectionError as e:
-            LOGGER.error(f"Connection error: {repr(e)}")
-            raise exceptions.ApiError(f"Connection error: {repr(e)}") from e
+        response = self._send("POST", endpoint, headers=header, data=json.dumps(data))
 
         if response.status_code == 400:
             LOGGER.error(f"Bad Request: data={data}")
@@ -130,43 +285,65 @@ class PostData:
         return resp
 
     def patch_arc(self, id_: int, data):
-        return self._request(RequestAction.Patch, ["arc", id_], data)
+        return self._write(RequestAction.Patch, ["arc", id_], data)
 
-    def post_arc(self, data):
-        return self._request(RequestAction.Post, ["arc"], data)
+    def post_arc(self, data, keys: list[ConversionKey] | None = None):
+        return self._write(RequestAction.Post, ["arc"], data, keys)
 
     def patch_character(self, id_: int, data):
-        return self._request(RequestAction.Patch, ["character", id_], data)
+        return self._write(RequestAction.Patch, ["character", id_], data)
 
-    def post_character(self, data):
-        return self._request(RequestAction.Post, ["character"], data)
+    def post_character(self, data, keys: list[ConversionKey] | None = None):
+        return self._write(RequestAction.Post, ["character"], data, keys)
 
     def patch_creator(self, id_: int, data):
-        return self._request(RequestAction.Patch, ["creator", id_], data)
+        return self._write(RequestAction.Patch, ["creator", id_], data)
 
-    def post_creator(self, data):
-        return self._request(RequestAction.Post, ["creator"], data)
+    def post_creator(self, data, keys: list[ConversionKey] | None = None):
+        return self._write(RequestAction.Post, ["creator"], data, keys)
 
     def patch_issue(self, id_: int, data):
-        return self._request(RequestAction.Patch, ["issue", id_], data)
+        return self._write(RequestAction.Patch, ["issue", id_], data)
 
-    def post_issue(self, data):
-        return self._request(RequestAction.Post, ["issue"], data)
+    def post_issue(self, data, keys: list[ConversionKey] | None = None):
+        return self._write(RequestAction.Post, ["issue"], data, keys)
 
     def patch_series(self, id_: int, data):
-        return self._request(RequestAction.Patch, ["series", id_], data)
+        return self._write(RequestAction.Patch, ["series", id_], data)
 
-    def post_series(self, data):
-        return self._request(RequestAction.Post, ["series"], data)
+    def post_series(self, data, keys: list[ConversionKey] | None = None):
+        return self._write(RequestAction.Post, ["series"], data, keys)
 
     def patch_team(self, id_: int, data):
-        return self._request(RequestAction.Patch, ["team", id_], data)
-
-    def post_team(self, data):
-        return self._request(RequestAction.Post, ["team"], data)
-
-    def post_credit(self, data):
-        return self._post_credits(["credit"], data)
+        return self._write(RequestAction.Patch, ["team", id_], data)
+
+    def post_team(self, data, keys: list[ConversionKey] | None = None):
+        return self._write(RequestAction.Post, ["team"], data, keys)
+
+    def post_credit(
+        self,
+        data,
+        defer: bool = False,
+        on_done: Callable[[list[CreditResult]], None] | None = None,
+    ):
+        """
+        Post a list of credits.
+
+        Args:
+            data (list): The credit rows to post.
+            defer (bool): Buffer the rows and send them with other credits in a bulk post.
+            on_done (Callable, optional): With `defer`, called with the row results once sent.
+
+        Returns:
+            The Metron response, or a list of CreditResult objects when `defer` is set.
+        """
+        if defer:
+            return self.credits.add(data, on_done)
+        return self._write(RequestAction.Post, ["credit"], data)
+
+    def flush_credits(self) -> list[CreditResult]:
+        """Send any buffered credits."""
+        return self.credits.flush()
 
     def post_variant(self, data):
-        return self._request(RequestAction.Post, ["variant"], data)
+        return self._write(RequestAction.Post, ["variant"], data)
@@ -0,0 +1,54 @@
+"""
+Prefetch module.
+
+This module provides the following functions:
+
+- prefetch
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+def prefetch(
+    items: Iterable[T], fetch: Callable[[T], R], workers: int = 4, ahead: int = 8
+) -> Iterator[tuple[T, R]]:
+    """
+    Fetch items in a thread pool ahead of the consumer, yielding them in their original order.
+
+    At most `ahead` fetches are started before the consumer catches up, so a slow consumer
+    doesn't pull the whole list. The fetches still go through the shared rate limiter, so they
+    only use the rate budget the consumer isn't using. An error is raised when the consumer
+    reaches the item that failed, and fetches not yet started are cancelled if the consumer stops
+    early.
+
+    Args:
+        items (Iterable): The items to fetch, e.g. issue IDs.
+        fetch (Callable): Returns the fetched value of one item. Must be thread-safe.
+        workers (int): Number of fetches running at the same time.
+        ahead (int): Maximum number of items fetched but not yet consumed.
+
+    Yields:
+        Each item with its fetched value.
+    """
+    pending: deque[tuple[T, Future[R]]] = deque()
+    iterator = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="prefetch")
+    try:
+        for item in iterator:
+            pending.append((item, executor.submit(fetch, item)))
+            if len(pending) >= max(ahead, 1):
+                break
+        while pending:
+            item, future = pending.popleft()
+            if (nxt := next(iterator, _DONE)) is not _DONE:
+                pending.append((nxt, executor.submit(fetch, nxt)))  # type: ignore
+            yield item, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,111 @@
+"""
+Projections module.
+
+This module provides the following classes:
+
+- SeriesSummary
+- IssueSummary
+- CVVolumeSummary
+- CVIssueSummary
+
+Compact records of the fields barda reads from Metron's and Comic Vine's list results, for the
+jobs that hold thousands of them at once.
+"""
+
+from typing import Any, NamedTuple
+
+
+class SeriesSummary(NamedTuple):
+    """A series from a Metron series list."""
+
+    id: int
+    display_name: str
+    issue_count: int
+    year_began: int | None
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "SeriesSummary":
+        """Build from a series list result, without validating the whole schema."""
+        return cls(
+            data["id"],
+            data.get("display_name") or "",
+            data.get("issue_count") or 0,
+            data.get("year_began"),
+        )
+
+
+class IssueSummary(NamedTuple):
+    """An issue from a Metron issue list."""
+
+    id: int
+    number: str
+    series_name: str
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "IssueSummary":
+        """Build from an issue list result, without validating the whole schema."""
+        series = data.get("series") or {}
+        return cls(data["id"], data.get("number") or "", series.get("name") or "")
+
+
+class CVVolumeSummary(NamedTuple):
+    """A volume from a Comic Vine volume list."""
+
+    id: int
+    name: str
+    start_year: int | None
+    issue_count: int
+    publisher_name: str
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "CVVolumeSummary":
+        """Build from a volume list result requested with ``CV_VOLUME_FIELDS``."""
+        publisher = data.get("publisher") or {}
+        start_year = str(data.get("start_year") or "")
+        return cls(
+            data["id"],
+            data.get("name") or "",
+            int(start_year) if start_year.isdigit() else None,
+            data.get("count_of_issues") or 0,
+            publisher.get("name") or "",
+        )
+
+
+class CVIssueSummary(NamedTuple):
+    """An issue from a Comic Vine issue list."""
+
+    id: int
+    number: str | None
+    volume_name: str
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "CVIssueSummary":
+        """Build from an issue list result requested with ``CV_ISSUE_LIST_FIELDS``."""
+        volume = data.get("volume") or {}
+        return cls(data["id"], data.get("issue_number"), volume.get("name") or "")
+
+
+# Comic Vine fields requested for each projection.
+CV_VOLUME_FIELDS = "id,name,start_year,count_of_issues,publisher"
+CV_ISSUE_LIST_FIELDS = "id,issue_number,volume"
+# The issue fields the importer reads, plus the ones simyan's Issue schema requires.
+CV_ISSUE_FIELDS = ",".join(
+    [
+        "id",
+        "issue_number",
+        "name",
+        "cover_date",
+        "store_date",
+        "description",
+        "image",
+        "volume",
+        "character_credits",
+        "team_credits",
+        "story_arc_credits",
+        "person_credits",
+        "api_detail_url",
+        "site_detail_url",
+        "date_added",
+        "date_last_updated",
+    ]
+)
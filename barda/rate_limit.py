@@ -0,0 +1,212 @@
+"""
+Rate limit module.
+
+This module provides the following classes:
+
+- TokenBucket
+- RateLimiter
+
+and the shared ``LIMITER`` instance that all barda HTTP traffic goes through.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from logging import getLogger
+from urllib.parse import urlparse
+
+LOGGER = getLogger(__name__)
+
+ONE_MINUTE = 60
+ONE_HOUR = 3600
+
+METRON = "metron"
+COMIC_VINE = "comicvine"
+
+# Budget shared by the Metron POST and PATCH requests, other than credits.
+WRITE = "write"
+
+# Budgets are (calls, period in seconds). A key is either a service, a service/endpoint pair,
+# or service/* which applies to every endpoint of the service that doesn't have its own budget.
+DEFAULT_BUDGETS: dict[str, tuple[int, int]] = {
+    METRON: (30, ONE_MINUTE),
+    f"{METRON}/credit": (28, ONE_MINUTE),
+    f"{METRON}/{WRITE}": (10, ONE_MINUTE),
+    COMIC_VINE: (20, ONE_MINUTE),
+    f"{COMIC_VINE}/*": (200, ONE_HOUR),
+}
+
+# Status codes servers use to tell us to slow down.
+THROTTLED_STATUS = frozenset({420, 429})
+
+
+def endpoint_from_url(url: str, prefix: str) -> str:
+    """
+    Return the first path segment after `prefix`.
+
+    For example "https://metron.cloud/api/issue/?page=2" with a prefix of "/api/" gives "issue".
+    """
+    path = urlparse(url).path.removeprefix(prefix)
+    return path.strip("/").split("/")[0]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Convert a Retry-After header, either seconds or an HTTP date, to seconds."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    The refill rate drops after the server throttles us and creeps back up to the configured rate
+    as requests succeed again.
+
+    Args:
+        calls (int): Number of calls allowed per period. Also the size of the bucket.
+        period (float): Length of the period in seconds.
+    """
+
+    def __init__(self, calls: int, period: float) -> None:
+        self.capacity = float(calls)
+        self.max_rate = calls / period
+        self.rate = self.max_rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` and halve the refill rate."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = min(self.tokens, 0.0)
+            self.rate = max(self.rate / 2, self.max_rate / 8)
+
+    def relax(self) -> None:
+        """Move the refill rate back towards the configured rate after a successful call."""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 16)
+
+
+class RateLimiter:
+    """
+    Registry of token buckets for each service and endpoint.
+
+    Args:
+        budgets (dict): Mapping of budget key to (calls, period). See ``DEFAULT_BUDGETS``.
+    """
+
+    def __init__(self, budgets: dict[str, tuple[int, int]] | None = None) -> None:
+        self.budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self.buckets: dict[str, TokenBucket] = {}
+        self.waited: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, key: str, budget_key: str | None = None) -> TokenBucket | None:
+        with self.lock:
+            if key not in self.buckets:
+                budget = self.budgets.get(budget_key or key)
+                if budget is None:
+                    return None
+                self.buckets[key] = TokenBucket(*budget)
+            return self.buckets[key]
+
+    def _buckets(self, service: str, endpoint: str | None) -> list[TokenBucket]:
+        buckets = [self._bucket(service)]
+        if endpoint:
+            key = f"{service}/{endpoint}"
+            budget_key = key if key in self.budgets else f"{service}/*"
+            buckets.append(self._bucket(key, budget_key))
+        return [b for b in buckets if b is not None]
+
+    def acquire(self, service: str, endpoint: str | None = None) -> float:
+        """
+        Block until both the service and the endpoint budget allow another call.
+
+        Args:
+            service (str): The service being called, e.g. ``METRON``.
+            endpoint (str): The endpoint being called, e.g. "issue".
+
+        Returns:
+            The number of seconds spent waiting for a token.
+        """
+        wait = max((b.reserve() for b in self._buckets(service, endpoint)), default=0.0)
+        if wait > 0:
+            LOGGER.debug(f"Waiting {wait:.2f}s for a {service}/{endpoint} token.")
+            time.sleep(wait)
+
+        key = f"{service}/{endpoint}" if endpoint else service
+        with self.lock:
+            self.waited[key] = self.waited.get(key, 0.0) + wait
+            self.calls[key] = self.calls.get(key, 0) + 1
+        return wait
+
+    def update(self, service: str, endpoint: str | None, status: int, headers) -> None:
+        """
+        Adjust the budgets from a server response.
+
+        A throttled response pauses the buckets for the ``Retry-After`` period (a minute if the
+        server doesn't say), and an exhausted ``X-RateLimit-Remaining`` pauses them until
+        ``X-RateLimit-Reset``.
+
+        Args:
+            service (str): The service that was called.
+            endpoint (str): The endpoint that was called.
+            status (int): The HTTP status code of the response.
+            headers: The response headers.
+        """
+        buckets = self._buckets(service, endpoint)
+        pause = None
+        if status in THROTTLED_STATUS:
+            pause = parse_retry_after(headers.get("Retry-After")) or ONE_MINUTE
+            LOGGER.warning(f"{service}/{endpoint} throttled. Pausing for {pause:.0f}s.")
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            reset = headers.get("X-RateLimit-Reset")
+            if reset and reset.isdigit():
+                reset_at = float(reset)
+                # Some servers send an epoch time, others the seconds left.
+                pause = reset_at - time.time() if reset_at > time.time() else reset_at
+
+        for bucket in buckets:
+            if pause is not None and pause > 0:
+                bucket.pause(pause)
+            else:
+                bucket.relax()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Return the number of calls and total seconds spent waiting for each key."""
+        with self.lock:
+            return {
+                key: {"calls": self.calls[key], "waited": self.waited.get(key, 0.0)}
+                for key in self.calls
+            }
+
+
+LIMITER = RateLimiter()
@@ -0,0 +1,121 @@
+"""
+ReferenceData module.
+
+This module provides the following classes:
+
+- ReferenceData
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from mokkari import exceptions
+from mokkari.schemas.base import BaseResource
+from mokkari.schemas.generic import GenericItem
+from mokkari.session import Session
+from pydantic import TypeAdapter
+
+LOGGER = getLogger(__name__)
+
+ONE_WEEK = 7 * 24 * 60 * 60
+
+# Session method and schema for each kind of reference data.
+KINDS: dict[str, tuple[str, type]] = {
+    "series_type": ("series_type_list", GenericItem),
+    "universe": ("universes_list", BaseResource),
+    "publisher": ("publishers_list", BaseResource),
+    "role": ("role_list", GenericItem),
+}
+
+
+class ReferenceData:
+    """
+    On-disk store of the small Metron lists the importers pick from.
+
+    Series types, universes, publishers and roles are kept for ``ttl`` seconds. The Runner
+    refreshes them in a background thread at startup and shares one store with every importer,
+    so the pickers don't wait on Metron.
+
+    Args:
+        db_name (str): Path and database name to use.
+        ttl (int): Seconds before a list is fetched again.
+    """
+
+    def __init__(self, db_name: str | Path = "reference.db", ttl: int = ONE_WEEK) -> None:
+        self.ttl = ttl
+        self.con = sqlite3.connect(db_name, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.refreshed = threading.Event()
+        self.refreshed.set()
+        with self.lock, self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS reference (kind PRIMARY KEY, json, updated)"
+            )
+
+    def _load(self, kind: str, fresh_only: bool = True) -> list[Any] | None:
+        with self.lock:
+            row = self.con.execute(
+                "SELECT json, updated FROM reference WHERE kind = ?", (kind,)
+            ).fetchone()
+        if row is None or (fresh_only and row[1] < time.time() - self.ttl):
+            return None
+        return TypeAdapter(list[KINDS[kind][1]]).validate_python(json.loads(row[0]))
+
+    def _fetch(self, kind: str, metron: Session) -> list[Any]:
+        items = getattr(metron, KINDS[kind][0])()
+        data = json.dumps([item.model_dump(mode="json") for item in items])
+        with self.lock, self.con:
+            self.con.execute(
+                "INSERT OR REPLACE INTO reference (kind, json, updated) VALUES (?, ?, ?)",
+                (kind, data, time.time()),
+            )
+        return items
+
+    def refresh(self, metron: Session, force: bool = False) -> None:
+        """Fetch every list that has expired, or all of them if `force` is set."""
+        for kind in KINDS:
+            if force or self._load(kind) is None:
+                try:
+                    self._fetch(kind, metron)
+                except exceptions.ApiError as err:
+                    LOGGER.warning(f"Unable to refresh {kind} list: {err}")
+
+    def start_refresh(self, metron: Session) -> threading.Thread:
+        """Refresh the expired lists in a background thread."""
+        self.refreshed.clear()
+
+        def run() -> None:
+            try:
+                self.refresh(metron)
+            finally:
+                self.refreshed.set()
+
+        thread = threading.Thread(target=run, name="reference-data", daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, kind: str, metron: Session) -> list[Any]:
+        """
+        Return a list, fetching it from Metron if it has expired.
+
+        If a background refresh is running it's waited for first. An expired list is still
+        returned if Metron can't be reached.
+
+        Args:
+            kind (str): One of "series_type", "universe", "publisher" or "role".
+            metron (Session): Session to fetch the list with.
+        """
+        self.refreshed.wait()
+        if (items := self._load(kind)) is not None:
+            return items
+        try:
+            return self._fetch(kind, metron)
+        except exceptions.ApiError:
+            if (items := self._load(kind, fresh_only=False)) is not None:
+                return items
+            raise
@@ -7,6 +7,7 @@ This module provides the following classes:
 """
 
 import sqlite3
+import time
 from enum import Enum, unique
 from typing import Any
 
@@ -34,6 +35,7 @@ class ResourceKeys:
         self.cur = self.con.cursor()
         self.cur.execute("CREATE TABLE IF NOT EXISTS conversions (resource, cv, metron)")
         self.cur.execute("CREATE TABLE IF NOT EXISTS gcddb (resource, gcd, metron)")
+        self.cur.execute("CREATE TABLE IF NOT EXISTS gcd_missing (gcd PRIMARY KEY, checked)")
 
     def get_gcd(self, resource: int, gcd: int) -> Any | None:
         """
@@ -59,6 +61,9 @@ class ResourceKeys:
             "INSERT INTO gcddb(resource, gcd, metron) VALUES(?,?,?)",
             (resource, gcd, metron),
         )
+        # The issue is on Metron now, so it's no longer missing.
+        if resource == Resources.Issue.value:
+            self.cur.execute("DELETE FROM gcd_missing WHERE gcd = ?", (gcd,))
         self.con.commit()
 
     def get_cv(self, resource: int, cv: int) -> Any | None:
@@ -115,3 +120,34 @@ class ResourceKeys:
         self.cur.execute("DELETE FROM conversions WHERE resource = ? and cv = ?", (resource, cv))
         self.con.commit()
         return self.get_cv(resource, cv) is None
+
+    def is_missing_gcd(self, gcd: int, ttl: float) -> bool:
+        """
+        Return whether a GCD issue ID wasn't found on Metron recently.
+
+        Args:
+            gcd (int): The GCD issue ID.
+            ttl (float): Seconds after which a missing issue is searched for again.
+        """
+        self.cur.execute(
+            "SELECT 1 FROM gcd_missing WHERE gcd = ? AND checked >= ?", (gcd, time.time() - ttl)
+        )
+        return self.cur.fetchone() is not None
+
+    def store_missing_gcd(self, gcd: int) -> None:
+        """
+        Save a GCD issue ID that wasn't found on Metron.
+
+        Args:
+            gcd (int): The GCD issue ID.
+        """
+        self.cur.execute(
+            "INSERT OR REPLACE INTO gcd_missing(gcd, checked) VALUES(?,?)", (gcd, time.time())
+        )
+        self.con.commit()
+
+    def clear_missing_gcd(self) -> int:
+        """Forget every GCD issue that wasn't found, and return how many there were."""
+        self.cur.execute("DELETE FROM gcd_missing")
+        self.con.commit()
+        return self.cur.rowcount
@@ -0,0 +1,145 @@
+"""
+Retry module.
+
+This module provides the following classes:
+
+- RetryPolicy
+"""
+
+import random
+import time
+from logging import getLogger
+from typing import Callable, Optional
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from barda.rate_limit import parse_retry_after
+
+LOGGER = getLogger(__name__)
+
+# Statuses worth retrying. 429 and 503 mean the server refused the request, so they are safe to
+# retry for any method. The others may hide a request that was processed.
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+REFUSED_STATUS = frozenset({429, 503})
+
+# PATCH isn't here: a PATCH that may have been processed is left to the outbox, which checks
+# Metron before it's sent again.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def never_sent(err: requests.exceptions.RequestException) -> bool:
+    """Return True if a request failed before any of it reached the server."""
+    if isinstance(err, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(err.args[0], "reason", None) if err.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class RetryPolicy:
+    """
+    Retry HTTP requests with exponential backoff and jitter, bounded by a per-call deadline.
+
+    Connection errors and the statuses in ``RETRY_STATUS`` are retried. A ``Retry-After``
+    header is honoured, and no attempt is started or allowed to run past the deadline. Time spent
+    waiting for a rate limit token doesn't count against the deadline. POSTs and PATCHes are only
+    retried when the request never reached the server or was refused, so they aren't sent twice.
+
+    Args:
+        attempts (int): Maximum number of attempts, including the first one.
+        backoff (float): Base delay in seconds. Doubled after every attempt.
+        max_backoff (float): Upper limit on the delay between attempts.
+        deadline (float): Maximum number of seconds for all the attempts of one call.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        deadline: float = 120.0,
+    ) -> None:
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Return the delay before the next attempt. Uses full jitter on the backoff."""
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        jittered = random.uniform(0, ceiling)
+        return max(jittered, retry_after) if retry_after is not None else jittered
+
+    @staticmethod
+    def _retryable_status(method: str, status: int) -> bool:
+        if method in IDEMPOTENT_METHODS:
+            return status in RETRY_STATUS
+        return status in REFUSED_STATUS
+
+    @staticmethod
+    def _retryable_error(method: str, err: requests.exceptions.RequestException) -> bool:
+        if not isinstance(err, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return False
+        return method in IDEMPOTENT_METHODS or never_sent(err)
+
+    def call(
+        self,
+        method: str,
+        send: Callable[[float], requests.Response],
+        timeout: float,
+        describe: str = "request",
+        acquire: Optional[Callable[[], float]] = None,
+    ) -> requests.Response:
+        """
+        Call `send` until it gets a response that shouldn't be retried.
+
+        Args:
+            method (str): The HTTP method, which decides what is safe to retry.
+            send (Callable): Sends the request with the timeout it's given and returns the response.
+            timeout (float): Timeout of a single attempt. Shortened to fit within the deadline.
+            describe (str): What is being sent, for the log.
+            acquire (Callable, optional): Waits for a rate limit token before each attempt and
+                returns the seconds waited. The deadline is extended by that wait.
+
+        Returns:
+            The response. After the last attempt it may still have a retryable status.
+
+        Raises:
+            requests.exceptions.RequestException: The error of the last attempt.
+        """
+        start = time.monotonic()
+        end = start + self.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            if acquire is not None:
+                end += acquire()
+            remaining = end - time.monotonic()
+            try:
+                response = send(max(min(timeout, remaining), 0.1))
+            except requests.exceptions.RequestException as err:
+                if not self._retryable_error(method, err):
+                    raise
+                error: requests.exceptions.RequestException | None = err
+                retry_after = None
+                reason = repr(err)
+            else:
+                if not self._retryable_status(method, response.status_code):
+                    return response
+                error = None
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                reason = f"status {response.status_code}"
+
+            wait = self.delay(attempt, retry_after)
+            elapsed = time.monotonic() - start
+            if attempt >= self.attempts or time.monotonic() + wait >= end:
+                LOGGER.warning(
+                    f"Giving up on {describe} after {attempt} attempts in {elapsed:.1f}s: {reason}"
+                )
+                if error is not None:
+                    error.add_note(f"Gave up after {attempt} attempts in {elapsed:.1f}s.")
+                    raise error
+                return response
+
+            LOGGER.info(f"Retrying {describe} in {wait:.1f}s ({reason}).")
+            time.sleep(wait)
@@ -0,0 +1,129 @@
+"""
+RoleResolver module.
+
+This module provides the following classes:
+
+- RoleResolver
+"""
+
+import json
+import re
+import sqlite3
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Iterable
+
+LOGGER = getLogger(__name__)
+
+SEPARATORS = re.compile(r"[\s\-_.]+")
+
+# Comic Vine spellings of Metron roles. Learned synonyms are added to these in the database.
+DEFAULT_SYNONYMS: dict[str, str] = {
+    "penciler": "penciller",
+    "pencils": "penciller",
+    "pencil": "penciller",
+    "inks": "inker",
+    "inking": "inker",
+    "finisher": "finishes",
+    "finish": "finishes",
+    "colors": "colorist",
+    "colours": "colorist",
+    "colourist": "colorist",
+    "colorer": "colorist",
+    "letters": "letterer",
+    "lettering": "letterer",
+    "covers": "cover",
+    "cover art": "cover",
+    "cover artist": "cover",
+    "plotter": "plot",
+    "scripter": "script",
+    "breakdown": "breakdowns",
+    "layout": "layouts",
+}
+
+
+def normalize_role(name: str) -> str:
+    """
+    Normalize a role name so different spellings of it compare equal.
+
+    For example "Editor-in-Chief", "editor in chief" and " Editor In  Chief" are all
+    "editor in chief".
+    """
+    return SEPARATORS.sub(" ", name.casefold()).strip()
+
+
+class RoleResolver:
+    """
+    Map Comic Vine role names to Metron role IDs.
+
+    Built once per run from Metron's role list. Role names are looked up in a hash map of
+    normalized names, then in a synonym table kept in the conversions database. Roles picked by
+    hand are learned into that table, so the same role doesn't have to be picked again.
+
+    Args:
+        roles (Iterable): Metron roles with ``id`` and ``name`` attributes, e.g. GenericItem.
+        db_name (str): Path and database name to use.
+    """
+
+    def __init__(self, roles: Iterable[Any], db_name: str | Path = "barda.db") -> None:
+        self.roles = list(roles)
+        self.by_name: dict[str, int] = {normalize_role(role.name): role.id for role in self.roles}
+        self.con = sqlite3.connect(db_name)
+        with self.con:
+            self.con.execute(
+                "CREATE TABLE IF NOT EXISTS role_synonyms (synonym PRIMARY KEY, role_ids)"
+            )
+        self.synonyms: dict[str, list[int]] = {
+            synonym: [self.by_name[name]]
+            for synonym, name in DEFAULT_SYNONYMS.items()
+            if name in self.by_name
+        }
+        for synonym, role_ids in self.con.execute("SELECT synonym, role_ids FROM role_synonyms"):
+            self.synonyms[synonym] = json.loads(role_ids)
+
+    def get(self, name: str) -> list[int]:
+        """Return the role IDs of one role name, or an empty list if it's unknown."""
+        key = normalize_role(name)
+        if key in self.by_name:
+            return [self.by_name[key]]
+        return self.synonyms.get(key, [])
+
+    def resolve(self, names: list[str]) -> list[int]:
+        """
+        Return the role IDs of a creator's role names.
+
+        If none of the names are known on their own, the whole list is looked up, in case it was
+        learned as a group.
+
+        Args:
+            names (list): The role names, e.g. ["writer", "penciler"].
+        """
+        role_ids: list[int] = []
+        for name in names:
+            role_ids.extend(i for i in self.get(name) if i not in role_ids)
+        if not role_ids and len(names) > 1:
+            role_ids = list(self.synonyms.get(self._group_key(names), []))
+        return role_ids
+
+    def learn(self, names: list[str], role_ids: list[int]) -> None:
+        """
+        Save the role IDs picked for role names that couldn't be resolved.
+
+        Args:
+            names (list): The role names, which are saved as one synonym.
+            role_ids (list): The Metron role IDs they stand for.
+        """
+        if not names or not role_ids:
+            return
+        key = self._group_key(names)
+        self.synonyms[key] = list(role_ids)
+        with self.con:
+            self.con.execute(
+                "INSERT OR REPLACE INTO role_synonyms (synonym, role_ids) VALUES (?, ?)",
+                (key, json.dumps(list(role_ids))),
+            )
+        LOGGER.info(f"Learned role synonym '{key}': {role_ids}")
+
+    @staticmethod
+    def _group_key(names: list[str]) -> str:
+        return ", ".join(normalize_role(name) for name in names)
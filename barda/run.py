@@ -1,10 +1,18 @@
 from enum import Enum, auto, unique
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
 
 import questionary
 
+from barda import __version__
 from barda.importer_comic_geek import GeeksImporter
 from barda.importer_comic_vine import ComicVineImporter
 from barda.logging import init_logging
+from barda.metrics import METRICS
+from barda.metron_session import MetronSession
+from barda.name_index import NameIndex
+from barda.reference_data import ReferenceData
 from barda.resource_keys import ResourceKeys, Resources
 from barda.settings import BardaSettings
 from barda.styles import Styles
@@ -22,6 +30,7 @@ class TaskType(Enum):
     GCD_Update_Issue = auto()
     Update_Resource = auto()
     Delete_Resource = auto()
+    Clear_Missing_GCD_Issues = auto()
 
     def __str__(self) -> str:
         return self.name.replace("_", " ")
@@ -32,6 +41,28 @@ class Runner:
 
     def __init__(self, config: BardaSettings) -> None:
         self.config = config
+        self.scratch_dir: TemporaryDirectory | None = None
+        self.reference = ReferenceData(config.reference_data)
+        self.names = NameIndex(config.name_index, persist=not config.dry_run)
+
+    def _start_dry_run(self) -> None:
+        """Use a scratch copy of the conversions database, so synthetic IDs aren't saved."""
+        self.scratch_dir = TemporaryDirectory()
+        scratch = Path(self.scratch_dir.name) / self.config.conversions.name
+        if self.config.conversions.exists():
+            copyfile(self.config.conversions, scratch)
+        self.config.conversions = scratch
+        questionary.print(
+            f"Dry run: writes will be recorded to '{self.config.dry_run}'.", style=Styles.WARNING
+        )
+
+    def _metron_session(self) -> MetronSession:
+        return MetronSession(
+            self.config.metron_user,
+            self.config.metron_password,
+            user_agent=f"Barda/{__version__}",
+            offline=self.config.offline,
+        )
 
     @staticmethod
     def _select_resource() -> int:
@@ -71,6 +102,13 @@ class Runner:
         else:
             questionary.print(f"Failed to delete CV ID: {cv_id}", style=Styles.WARNING)
 
+    def _clear_missing_gcd(self) -> None:
+        conv = ResourceKeys(str(self.config.conversions))
+        count = conv.clear_missing_gcd()
+        questionary.print(
+            f"Cleared {count} GCD issues that weren't found on Metron.", style=Styles.SUCCESS
+        )
+
     @staticmethod
     def _what_task():
         choices = []
@@ -129,33 +167,58 @@ class Runner:
         # Start logging
         init_logging()
 
+        if self.config.dry_run:
+            self._start_dry_run()
+
+        # Have the pickers' lists and the name index ready by the time a task needs them.
+        if self.config.offline:
+            questionary.print("Offline: reading only from the local caches.", style=Styles.WARNING)
+        else:
+            self.reference.start_refresh(self._metron_session())
+            self.names.start_sync(self._metron_session())
+
         task = self._what_task()
-        match task:
-            case TaskType.CV_Import_Series.value:
-                if self.config.cv_api_key:
-                    with ComicVineImporter(self.config) as importer_obj:
-                        importer_obj.run()
-            case TaskType.Import_CVID_by_Series.value:
-                if self.config.cv_api_key:
-                    with ComicVineImporter(self.config) as importer_obj:
-                        importer_obj.import_cvid_by_series()
-            case TaskType.Import_CVID_by_Publisher.value:
-                if self.config.cv_api_key:
-                    with ComicVineImporter(self.config) as importer_obj:
-                        importer_obj.import_cvid_by_publisher()
-            case TaskType.Update_Resource.value:
-                self._update_resource_key()
-            case TaskType.Delete_Resource.value:
-                self._delete_resource_key()
-            case TaskType.LOCG_Import_Issue.value:
-                with GeeksImporter(self.config) as locg:
-                    locg.run()
-            case TaskType.GCD_Update_Issue.value:
-                gcd = GcdUpdate(self.config)
-                gcd.run()
-            case TaskType.Import_Series_CVID_by_Publisher.value:
-                if self.config.cv_api_key:
-                    with ComicVineImporter(self.config) as importer_obj:
-                        importer_obj.import_series_cvid_by_publisher()
-            case _:
-                questionary.print("Invalid choice.", style=Styles.ERROR)
+        try:
+            match task:
+                case TaskType.CV_Import_Series.value:
+                    if self.config.cv_api_key:
+                        with ComicVineImporter(
+                            self.config, self.reference, self.names
+                        ) as importer_obj:
+                            importer_obj.run()
+                case TaskType.Import_CVID_by_Series.value:
+                    if self.config.cv_api_key:
+                        with ComicVineImporter(
+                            self.config, self.reference, self.names
+                        ) as importer_obj:
+                            importer_obj.import_cvid_by_series()
+                case TaskType.Import_CVID_by_Publisher.value:
+                    if self.config.cv_api_key:
+                        with ComicVineImporter(
+                            self.config, self.reference, self.names
+                        ) as importer_obj:
+                            importer_obj.import_cvid_by_publisher()
+                case TaskType.Update_Resource.value:
+                    self._update_resource_key()
+                case TaskType.Delete_Resource.value:
+                    self._delete_resource_key()
+                case TaskType.Clear_Missing_GCD_Issues.value:
+                    self._clear_missing_gcd()
+                case TaskType.LOCG_Import_Issue.value:
+                    with GeeksImporter(self.config, self.reference) as locg:
+                        locg.run()
+                case TaskType.GCD_Update_Issue.value:
+                    with GcdUpdate(self.config, self.reference) as gcd:
+                        gcd.run()
+                case TaskType.Import_Series_CVID_by_Publisher.value:
+                    if self.config.cv_api_key:
+                        with ComicVineImporter(
+                            self.config, self.reference, self.names
+                        ) as importer_obj:
+                            importer_obj.import_series_cvid_by_publisher()
+                case _:
+                    questionary.print("Invalid choice.", style=Styles.ERROR)
+        finally:
+            # Machine-readable summary of the task's writes, for tuning throughput.
+            task_name = next((t.name for t in TaskType if t.value == task), str(task))
+            METRICS.write(self.config.metrics_file, task_name)
@@ -18,15 +18,41 @@ class BardaSettings:
         self.metron_password: str = ""
         self.cv_api_key: Optional[str] = None
 
+        # Maximum size of the Comic Vine response cache
+        self.cv_cache_size_mb: int = 512
+
+        # Metron write connection pool
+        self.pool_size: int = 4
+        self.warm_up: bool = False
+
+        # Retry policy for all HTTP requests
+        self.retry_attempts: int = 5
+        self.retry_deadline: float = 120.0
+
+        # Days before a GCD reprint that wasn't found on Metron is searched for again
+        self.gcd_missing_days: int = 30
+
+        # Record writes to this journal instead of sending them. Set from the command line.
+        self.dry_run: Optional[Path] = None
+
+        # Serve every read from the local caches and never touch the network. Set from the
+        # command line.
+        self.offline: bool = False
+
         self.config = configparser.ConfigParser()
 
         # setting & json file locations
         folder = Path(config_dir) if config_dir else get_settings_folder()
         self.settings_file = folder / "settings.ini"
+        self.metrics_file = folder / "metrics.jsonl"
         cache_folder = Path(save_cache_path("barda"))
         self.conversions = cache_folder / "barda.db"
         self.cv_cache = cache_folder / "cv.db"
+        self.image_cache = cache_folder / "images"
         self.metron_cache = cache_folder / "metron.db"
+        self.reference_data = cache_folder / "reference.db"
+        self.name_index = cache_folder / "names.db"
+        self.mirror = cache_folder / "mirror.db"
 
         if not self.settings_file.parent.exists():
             self.settings_file.parent.mkdir()
@@ -37,6 +63,11 @@ class BardaSettings:
         else:
             self.load()
 
+    @property
+    def gcd_missing_ttl(self) -> int:
+        """Seconds before a GCD reprint that wasn't found on Metron is searched for again."""
+        return self.gcd_missing_days * 24 * 60 * 60
+
     def load(self) -> None:
         """Method to retrieve a users settings."""
         self.config.read(self.settings_file)
@@ -47,9 +78,27 @@ class BardaSettings:
         if self.config.has_option("metron", "password"):
             self.metron_password = self.config["metron"]["password"]
 
+        if self.config.has_option("metron", "pool_size"):
+            self.pool_size = self.config.getint("metron", "pool_size")
+
+        if self.config.has_option("metron", "warm_up"):
+            self.warm_up = self.config.getboolean("metron", "warm_up")
+
         if self.config.has_option("comic_vine", "api_key"):
             self.cv_api_key = self.config["comic_vine"]["api_key"]
 
+        if self.config.has_option("comic_vine", "cache_size_mb"):
+            self.cv_cache_size_mb = self.config.getint("comic_vine", "cache_size_mb")
+
+        if self.config.has_option("gcd", "missing_days"):
+            self.gcd_missing_days = self.config.getint("gcd", "missing_days")
+
+        if self.config.has_option("retry", "attempts"):
+            self.retry_attempts = self.config.getint("retry", "attempts")
+
+        if self.config.has_option("retry", "deadline"):
+            self.retry_deadline = self.config.getfloat("retry", "deadline")
+
     def save(self) -> None:
         """Method to save a users settings"""
         if not self.config.has_section("metron"):
@@ -57,12 +106,26 @@ class BardaSettings:
 
         self.config["metron"]["user"] = self.metron_user
         self.config["metron"]["password"] = self.metron_password
+        self.config["metron"]["pool_size"] = str(self.pool_size)
+        self.config["metron"]["warm_up"] = str(self.warm_up)
 
         if not self.config.has_section("comic_vine"):
             self.config.add_section("comic_vine")
 
         if self.cv_api_key:
             self.config["comic_vine"]["api_key"] = self.cv_api_key
+        self.config["comic_vine"]["cache_size_mb"] = str(self.cv_cache_size_mb)
+
+        if not self.config.has_section("retry"):
+            self.config.add_section("retry")
+
+        self.config["retry"]["attempts"] = str(self.retry_attempts)
+        self.config["retry"]["deadline"] = str(self.retry_deadline)
+
+        if not self.config.has_section("gcd"):
+            self.config.add_section("gcd")
+
+        self.config["gcd"]["missing_days"] = str(self.gcd_missing_days)
 
         with self.settings_file.open("w") as configfile:
             self.config.write(configfile)
@@ -3,15 +3,15 @@ from logging import getLogger
 from typing import Any, List
 
 import questionary
-from mokkari import api
 from mokkari.schemas.series import BaseSeries
-from mokkari.session import Session
 
 from barda.exceptions import ApiError
 from barda.gcd.db import DB
 from barda.gcd.gcd_issue import GCD_Issue
 from barda.importer_base import BaseImporter
-from barda.post_data import PostData
+from barda.issue_diff import describe_changes, diff_issue
+from barda.prefetch import prefetch
+from barda.reference_data import ReferenceData
 from barda.settings import BardaSettings
 from barda.styles import Styles
 from barda.utils import fix_story_chapters
@@ -20,10 +20,8 @@ LOGGER = getLogger(__name__)
 
 
 class GcdUpdate(BaseImporter):
-    def __init__(self, config: BardaSettings) -> None:
-        super(GcdUpdate, self).__init__(config)
-        self.metron: Session = api(config.metron_user, config.metron_password)
-        self.barda = PostData(config.metron_user, config.metron_password)
+    def __init__(self, config: BardaSettings, reference: ReferenceData | None = None) -> None:
+        super(GcdUpdate, self).__init__(config, reference)
         self.reprint_only: bool = False
 
     # GCD methods
@@ -150,68 +148,47 @@ class GcdUpdate(BaseImporter):
             )
             return False
 
-        data: dict[str, Any] = {}
-        updated = False
-        msg = "Changed:"
-        if not self.reprint_only:
-            gcd_stories = self._get_gcd_stories(gcd.id) if gcd is not None else None
-            if gcd_stories is not None and issue.story_titles != gcd_stories:
-                data["name"] = gcd_stories
-                msg += f"\n\tStories: {gcd_stories}"
-                updated = True
-
-            if gcd.barcode is not None and issue.upc != gcd.barcode:
-                data["upc"] = gcd.barcode
-                msg += f"\n\tBarcode: {gcd.barcode}"
-                updated = True
-
-            if gcd.price is not None and issue.price != gcd.price:
-                data["price"] = gcd.price
-                msg += f"\n\tPrice: {gcd.price}"
-                updated = True
-
-            if gcd.pages is not None and issue.page_count != gcd.pages:
-                data["page"] = gcd.pages
-                msg += f"\n\tPages: {gcd.pages}"
-                updated = True
-
-        gcd_reprints_lst = self.get_gcd_reprints(gcd.id) if gcd is not None else None
-        reprints_lst = (
-            self.get_metron_reprint(gcd_reprints_lst, issue)
-            if gcd_reprints_lst and gcd_reprints_lst is not None
-            else []
-        )
-
-        if reprints_lst:
-            if issue.reprints:
-                original_reprints_lst = self._create_metron_reprint_lst(issue.reprints)
-                if original_reprints_lst != reprints_lst:
-                    data["reprints"] = reprints_lst
-                    msg += f"\n\tReprints: {reprints_lst}"
-                    updated = True
-            else:
-                data["reprints"] = reprints_lst
-                msg += f"\n\tReprints: {reprints_lst}"
-                updated = True
+        gcd_reprints_lst = self.get_gcd_reprints(gcd.id)
+        reprints_lst = self.get_metron_reprint(gcd_reprints_lst, issue) if gcd_reprints_lst else []
+
+        if self.reprint_only:
+            data = diff_issue(issue, reprints=reprints_lst)
+        else:
+            data = diff_issue(
+                issue,
+                stories=self._get_gcd_stories(gcd.id),
+                upc=gcd.barcode,
+                price=gcd.price,
+                pages=gcd.pages,
+                reprints=reprints_lst,
+            )
 
-        if not updated:
+        if not data:
             questionary.print(
                 f"Nothing to update for '{issue.series.name} #{issue.number}'", style=Styles.SUCCESS
             )
             return False
 
+        msg = describe_changes(data)
+        self._submit_write(
+            self.async_barda.patch_issue(issue.id, data),
+            lambda future: self._finish_update_issue(future, issue, data, msg),
+        )
+        return True
+
+    @staticmethod
+    def _finish_update_issue(future, issue, data: dict[str, Any], msg: str) -> None:
         try:
-            self.barda.patch_issue(issue.id, data)
+            future.result()
         except ApiError:
             questionary.print(
                 f"Failed to update '{issue.series.name} #{issue.number}'. Data: {data}",
                 style=Styles.ERROR,
             )
-            return False
+            return
 
         questionary.print(msg, style=Styles.SUCCESS)
-
-        return True
+        questionary.print(f"Updated {issue.series.name} #{issue.number}", style=Styles.SUCCESS)
 
     def run(self) -> None:
         gcd_series_id = self._get_gcd_series_id()
@@ -222,7 +199,13 @@ class GcdUpdate(BaseImporter):
 
         issue_lst = self.metron.issues_list({"series_id": metron_series_id})
         self.reprint_only = questionary.confirm("Do you want to only update the reprints?").ask()
-        for i in issue_lst:
-            m_issue = self.metron.issue(i.id)
-            if self._update_issue(gcd_series_id, m_issue):
-                questionary.print(f"Updated {i.issue_name}", style=Styles.SUCCESS)
+        # Fetch the next issues while the current one is compared with GCD.
+        for _, m_issue in prefetch(
+            [i.id for i in issue_lst],
+            self.metron.issue_for_update,
+            workers=self.prefetch_workers,
+            ahead=2 * self.prefetch_workers,
+        ):
+            self._update_issue(gcd_series_id, m_issue)
+            self._finish_writes()
+        self._finish_writes(wait=True)
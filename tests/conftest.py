@@ -3,8 +3,29 @@ from argparse import ArgumentParser
 import pytest
 
 from barda.options import make_parser
+from barda.settings import BardaSettings
+
+# Settings that name a database or folder in the cache folder.
+CACHE_PATHS = {
+    "conversions": "barda.db",
+    "cv_cache": "cv.db",
+    "image_cache": "images",
+    "metron_cache": "metron.db",
+    "reference_data": "reference.db",
+    "name_index": "names.db",
+    "mirror": "mirror.db",
+}
 
 
 @pytest.fixture(scope="session")
 def parser() -> ArgumentParser:
     return make_parser()
+
+
+@pytest.fixture()
+def settings(tmp_path) -> BardaSettings:
+    """Settings whose databases and image cache are in the test's temporary folder."""
+    config = BardaSettings(config_dir=str(tmp_path))
+    for name, path in CACHE_PATHS.items():
+        setattr(config, name, tmp_path / path)
+    return config
@@ -0,0 +1,33 @@
+import threading
+import time
+
+from barda.async_post_data import AsyncPostData
+
+
+class FakePostData:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def post_issue(self, data, keys=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        self.in_flight -= 1
+        return {"id": data["number"]}
+
+
+def test_writes_overlap_and_are_bounded() -> None:
+    fake = FakePostData()
+    writer = AsyncPostData(fake, max_in_flight=2)  # type: ignore
+    futures = [writer.submit(writer.post_issue({"number": i})) for i in range(6)]
+    writer.close()
+    assert [f.result()["id"] for f in futures] == list(range(6))
+    assert fake.max_in_flight == 2
+
+
+def test_close_joins_worker_threads() -> None:
+    writer = AsyncPostData(FakePostData(), max_in_flight=2)  # type: ignore
+    writer.submit(writer.post_issue({"number": 1})).result()
+    writer.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith("asyncio_")]
@@ -0,0 +1,34 @@
+from barda.comicvine_session import ComicvineSession
+from barda.projections import CV_ISSUE_LIST_FIELDS, CVIssueSummary, CVVolumeSummary
+
+
+def test_list_summaries_request_only_their_fields(monkeypatch):
+    session = ComicvineSession(api_key="key")
+    calls = []
+
+    def get_request(endpoint, params=None, skip_cache=False):
+        calls.append((endpoint, dict(params)))
+        if endpoint == "/issues/":
+            results = [{"id": 1, "issue_number": "1", "volume": {"id": 5, "name": "Batman"}}]
+        else:
+            results = [
+                {
+                    "id": 5,
+                    "name": "Batman",
+                    "start_year": "1940",
+                    "count_of_issues": 713,
+                    "publisher": {"id": 10, "name": "DC Comics"},
+                }
+            ]
+        return {"results": results, "number_of_total_results": 1}
+
+    monkeypatch.setattr(session, "_get_request", get_request)
+    issues = session.list_issue_summaries(params={"filter": "volume:5"})
+    volumes = session.list_volume_summaries(params={"filter": "name:Batman"})
+
+    assert issues == [CVIssueSummary(1, "1", "Batman")]
+    assert volumes == [CVVolumeSummary(5, "Batman", 1940, 713, "DC Comics")]
+    assert calls[0] == (
+        "/issues/",
+        {"filter": "volume:5", "field_list": CV_ISSUE_LIST_FIELDS, "limit": 100},
+    )
@@ -0,0 +1,45 @@
+from barda.credit_writer import CreditWriter
+from barda.exceptions import ApiError
+
+
+class FakeCreditEndpoint:
+    def __init__(self, bad_creator: int | None = None) -> None:
+        self.bad_creator = bad_creator
+        self.posts: list[list[dict]] = []
+
+    def __call__(self, rows: list[dict]) -> list[dict]:
+        self.posts.append(rows)
+        if any(row["creator"] == self.bad_creator for row in rows):
+            raise ApiError("Bad request")
+        return rows
+
+
+def test_rows_are_coalesced_across_calls() -> None:
+    endpoint = FakeCreditEndpoint()
+    writer = CreditWriter(endpoint, max_rows=10)
+    first = writer.add([{"issue": 1, "creator": 1, "role": [1]}])
+    second = writer.add([{"issue": 2, "creator": 2, "role": [1]}])
+    assert not endpoint.posts
+    writer.flush()
+    assert len(endpoint.posts) == 1
+    assert first[0].ok and second[0].ok
+
+
+def test_full_buffer_is_flushed() -> None:
+    endpoint = FakeCreditEndpoint()
+    writer = CreditWriter(endpoint, max_rows=2)
+    writer.add([{"issue": 1, "creator": i, "role": [1]} for i in range(3)])
+    assert [len(p) for p in endpoint.posts] == [2, 1]
+
+
+def test_failed_row_is_isolated() -> None:
+    endpoint = FakeCreditEndpoint(bad_creator=3)
+    writer = CreditWriter(endpoint, max_rows=10)
+    reported = []
+    results = writer.add(
+        [{"issue": 1, "creator": i, "role": [1]} for i in range(4)], on_done=reported.extend
+    )
+    writer.flush()
+    assert [r.ok for r in results] == [True, True, True, False]
+    assert results[3].error == "Bad request"
+    assert reported == results
@@ -0,0 +1,70 @@
+import sqlite3
+import time
+from datetime import date
+
+from barda.cv_cache import ComicvineCache
+
+URL = "https://comicvine.gamespot.com/api"
+
+
+def test_ttl_by_endpoint(tmp_path):
+    cache = ComicvineCache(tmp_path / "cv.db", ttls={"person": 3600, "issues": 0})
+    person = f"{URL}/person/4040-1/?api_key=*****&format=json"
+    issues = f"{URL}/issues/?api_key=*****&filter=volume%3A1&format=json"
+    cache.insert(person, {"results": {"id": 1}})
+    cache.insert(issues, {"results": []})
+    time.sleep(0.01)
+    assert cache.select(person) == {"results": {"id": 1}}
+    assert cache.select(issues) == {}
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_lru_eviction(tmp_path):
+    cache = ComicvineCache(tmp_path / "cv.db", max_bytes=150)
+    big = {"results": "x" * 30}
+    for i in range(3):
+        cache.insert(f"{URL}/team/4060-{i}/", big)
+        time.sleep(0.01)
+    # Reading team 0 makes team 1 the least recently used.
+    assert cache.select(f"{URL}/team/4060-0/")
+    cache.insert(f"{URL}/team/4060-3/", big)
+    assert cache.select(f"{URL}/team/4060-1/") == {}
+    assert cache.select(f"{URL}/team/4060-0/")
+    assert cache.stats()["evictions"] >= 1
+    assert cache.total <= 150
+
+
+def test_size_survives_reopen(tmp_path):
+    cache = ComicvineCache(tmp_path / "cv.db")
+    cache.insert(f"{URL}/issue/4000-1/", {"results": {}})
+    cache.insert(f"{URL}/issue/4000-1/", {"results": {}})
+    assert ComicvineCache(tmp_path / "cv.db").total == cache.total == len('{"results": {}}')
+
+
+def test_simyan_responses_are_migrated(tmp_path):
+    url = f"{URL}/volume/4050-1/?api_key=*****&format=json"
+    con = sqlite3.connect(tmp_path / "cv.db")
+    con.execute("CREATE TABLE queries (query, response, query_date)")
+    con.execute(
+        "INSERT INTO queries VALUES (?, ?, ?)",
+        (url, '{"results": {"id": 1}}', date.today().isoformat()),
+    )
+    con.commit()
+    con.close()
+
+    cache = ComicvineCache(tmp_path / "cv.db")
+    assert cache.select(url) == {"results": {"id": 1}}
+    assert not cache.con.execute("SELECT 1 FROM sqlite_master WHERE name = 'queries'").fetchone()
+
+
+def test_read_only_cache_is_not_changed(tmp_path):
+    ComicvineCache(tmp_path / "cv.db").insert(f"{URL}/issue/4000-1/", {"results": {}})
+    before = (tmp_path / "cv.db").read_bytes()
+
+    cache = ComicvineCache(tmp_path / "cv.db", read_only=True)
+    assert cache.select(f"{URL}/issue/4000-1/") == {"results": {}}
+    cache.insert(f"{URL}/issue/4000-2/", {"results": {}})
+    assert (tmp_path / "cv.db").read_bytes() == before
+
+    assert ComicvineCache(tmp_path / "missing.db", read_only=True).select(URL) == {}
+    assert not (tmp_path / "missing.db").exists()
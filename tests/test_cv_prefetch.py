@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from simyan.exceptions import ServiceError
+
+from barda.exceptions import ApiError
+from barda.importer_comic_vine import ComicVineImporter
+from barda.issue_index import IssueIndex
+from barda.prefetch import prefetch
+
+
+class FakeComicvine:
+    def __init__(self, sessions):
+        sessions.append(threading.current_thread().name)
+
+    def get_issue(self, cv_id):
+        if cv_id == 3:
+            raise ServiceError("Unknown endpoint")
+        image = SimpleNamespace(original_url=f"https://cv/{cv_id}.jpg")
+        return SimpleNamespace(id=cv_id, number=str(cv_id), image=image)
+
+
+def test_prefetch_issue_uses_a_session_per_thread(settings, monkeypatch):
+    importer = ComicVineImporter(settings)
+    importer.issue_index = IssueIndex(1, [SimpleNamespace(id=10, number="2")])
+    sessions: list[str] = []
+    monkeypatch.setattr(importer, "_new_cv_session", lambda: FakeComicvine(sessions))
+    monkeypatch.setattr(importer, "_get_image", lambda url, img_type: f"cover {url}")
+
+    todo = [SimpleNamespace(id=i) for i in (1, 2, 3)]
+    results = [result for _, result in prefetch(todo, importer._prefetch_issue, workers=2)]
+
+    assert results[0][1] == "cover https://cv/1.jpg"
+    # Issue 2 is already on Metron, so its cover isn't needed.
+    assert results[1][0].id == 2 and results[1][1] is None
+    assert results[2] == (None, None)
+    assert len(sessions) == len(set(sessions)) <= 2
+
+
+def test_failed_create_releases_the_number(settings):
+    importer = ComicVineImporter(settings)
+    importer.issue_index = IssueIndex(1)
+    assert importer.issue_index.reserve("2")
+    failed: Future = Future()
+    failed.set_exception(ApiError("Bad request"))
+    importer._finish_create_issue(failed, SimpleNamespace(number="2"), None)  # type: ignore
+    assert importer.issue_index.reserve("2")
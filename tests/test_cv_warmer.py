@@ -0,0 +1,93 @@
+import os
+from types import SimpleNamespace
+
+from simyan.exceptions import ServiceError
+
+from barda.cv_warmer import VolumeWarmer
+from barda.image import CVImage
+from barda.image_cache import ImageCache
+from barda.importer_comic_vine import ComicVineImporter, ImageType
+from barda.projections import CVIssueSummary
+
+PNG = b"\x89PNG" * 10
+
+
+def entries(*ids):
+    return [SimpleNamespace(id=i) for i in ids]
+
+
+class FakeComicvine:
+    def __init__(self):
+        self.calls = []
+
+    def list_issue_summaries(self, params=None, max_results=500):
+        self.calls.append(("issues", params["filter"]))
+        return [CVIssueSummary(1, "1", "Batman"), CVIssueSummary(2, "2", "Batman")]
+
+    def get_issue(self, cv_id):
+        self.calls.append(("issue", cv_id))
+        if cv_id == 2:
+            raise ServiceError("Unknown endpoint")
+        return SimpleNamespace(
+            id=cv_id,
+            image=SimpleNamespace(original_url=f"https://cv/{cv_id}.jpg"),
+            creators=entries(10, 11),
+            characters=entries(20),
+            teams=[],
+            story_arcs=entries(30),
+        )
+
+    def get_creator(self, cv_id):
+        self.calls.append(("creator", cv_id))
+        return SimpleNamespace(id=cv_id)
+
+    get_character = get_team = get_story_arc = get_creator
+
+
+def test_warm_volume(tmp_path, monkeypatch):
+    images = ImageCache(tmp_path / "images")
+    monkeypatch.setattr(images, "fetch", lambda url: b"cover")
+    cv = FakeComicvine()
+    counts = VolumeWarmer(cv, images).warm(5)  # type: ignore
+
+    assert counts == {
+        "issue": 1,
+        "cover": 1,
+        "creator": 2,
+        "character": 1,
+        "team": 0,
+        "arc": 1,
+        "errors": 1,
+    }
+    assert cv.calls[0] == ("issues", "volume:5")
+
+
+def test_image_cache_prunes_oldest(tmp_path):
+    images = ImageCache(tmp_path / "images")
+    for i in range(3):
+        images.put(f"https://cv/{i}.jpg", b"12345")
+        path = images._path(f"https://cv/{i}.jpg")
+        os.utime(path, (i, i))
+
+    images.max_bytes = 10
+    assert images.prune() == 1
+    assert images.get("https://cv/0.jpg") is None
+    assert images.get("https://cv/2.jpg") == b"12345"
+
+
+def test_put_enforces_the_size_cap(tmp_path):
+    images = ImageCache(tmp_path / "images", max_bytes=10)
+    for i in range(4):
+        images.put(f"https://cv/{i}.jpg", b"12345")
+        os.utime(images._path(f"https://cv/{i}.jpg"), (i, i))
+    assert images.total is not None and images.total <= 10
+    assert images.get("https://cv/3.jpg") == b"12345"
+
+
+def test_import_reads_warmed_images_without_saving_new_ones(settings, monkeypatch):
+    importer = ComicVineImporter(settings)
+    monkeypatch.setattr(ImageCache, "download", staticmethod(lambda url: PNG))
+    monkeypatch.setattr(CVImage, "resize_cover", lambda self: None)
+
+    assert importer._get_image("https://cv/1.png", ImageType.Cover)
+    assert not settings.image_cache.exists()
@@ -0,0 +1,58 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from barda.dry_run import replay_journal
+from barda.post_data import PostData
+
+
+def test_writes_are_recorded(tmp_path) -> None:
+    journal = tmp_path / "journal.jsonl"
+    barda = PostData("user", "passwd", journal=journal)
+    image = BytesIO(b"cover")
+    image.name = "cover.jpg"
+
+    issue = barda.post_issue({"series": 1, "number": "1", "characters": [2, 3], "image": image})
+    barda.patch_issue(5, {"upc": "123"})
+    barda.post_credit([{"issue": issue["id"], "creator": 1, "role": [1]}])
+
+    assert issue["id"] < 0 and issue["number"] == "1"
+    records = [json.loads(line) for line in journal.read_text().splitlines()]
+    assert [r["endpoint"] for r in records] == [["issue"], ["issue", "5"], ["credit"]]
+    assert records[0]["data"]["characters"] == [2, 3]
+    assert records[0]["image"] == "cover.jpg" and records[0]["image_size"] == 5
+    assert records[1]["id"] == 5
+    assert records[2]["data"][0]["issue"] == issue["id"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _reply(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_POST = do_PATCH = _reply
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_journal_replay(tmp_path) -> None:
+    journal = tmp_path / "journal.jsonl"
+    barda = PostData("user", "passwd", journal=journal)
+    image = BytesIO(b"cover")
+    image.name = "cover.jpg"
+    barda.post_issue({"series": 1, "number": "1", "image": image})
+    barda.patch_issue(5, {"upc": "123"})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        result = replay_journal(journal, f"http://127.0.0.1:{server.server_port}", workers=2)
+    finally:
+        server.shutdown()
+    assert result["requests"] == 2
+    assert result["errors"] == 0
@@ -1,3 +1,4 @@
+from io import BytesIO
 from pathlib import Path
 from shutil import copyfile
 
@@ -60,3 +61,12 @@ def test_convert_resource(tmp_path: Path) -> None:
     img = CVImage(test_file)
     img.resize_resource()
     assert get_image_width(test_file) == RESOURCE_WIDTH
+
+
+def test_cover_resize_in_memory() -> None:
+    buffer = BytesIO(TEST_COVER.read_bytes())
+    buffer.name = "cover.jpg"
+    img = CVImage(buffer)
+    img.resize_cover()
+    assert buffer.tell() == 0
+    assert get_image_width(buffer) == COVER_WIDTH  # type: ignore
@@ -0,0 +1,42 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from barda.issue_diff import describe_changes, diff_issue
+
+
+def make_issue(**kwargs) -> SimpleNamespace:
+    fields = {
+        "story_titles": ["Origin"],
+        "upc": "75960608936900111",
+        "price": Decimal("3.99"),
+        "page_count": 32,
+        "reprints": [],
+        "characters": [SimpleNamespace(id=1), SimpleNamespace(id=2)],
+        "teams": [],
+        "arcs": [],
+        "universes": [],
+        "cv_id": 1234,
+    }
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+def test_unchanged_issue_has_no_patch() -> None:
+    issue = make_issue()
+    data = diff_issue(
+        issue,
+        stories=["Origin"],
+        upc="75960608936900111",
+        price="3.99",
+        pages=32,
+        characters=[2, 1],
+        cv_id=99,
+    )
+    assert data == {}
+
+
+def test_only_changed_fields_are_sent() -> None:
+    issue = make_issue(cv_id=None)
+    data = diff_issue(issue, price=Decimal("4.99"), pages=32, characters=[2, 3], cv_id=99)
+    assert data == {"price": Decimal("4.99"), "characters": [1, 2, 3], "cv_id": 99}
+    assert "Characters: [1, 2, 3]" in describe_changes(data)
@@ -0,0 +1,57 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from barda.issue_index import IssueIndex, normalize_number
+
+
+@pytest.mark.parametrize(
+    "number, expected",
+    [
+        ("1", "1"),
+        ("#001", "1"),
+        (" 0 ", "0"),
+        ("½", "1/2"),
+        ("1.5", "1.5"),
+        ("Annual 1", "annual 1"),
+    ],
+)
+def test_normalize_number(number: str, expected: str) -> None:
+    assert normalize_number(number) == expected
+
+
+def test_index_lookup_and_add() -> None:
+    index = IssueIndex(
+        5, [SimpleNamespace(id=10, number="001"), SimpleNamespace(id=11, number="2")]
+    )
+    assert index.get("1") == [10]
+    assert "3" not in index
+    index.add("3", 12)
+    assert "#3" in index
+    assert len(index) == 3
+
+
+def test_reserved_number_is_only_created_once() -> None:
+    index = IssueIndex(5, [SimpleNamespace(id=10, number="1")])
+    assert not index.reserve("001")
+    assert index.reserve("2")
+    assert not index.reserve("#2")
+    index.release("2")
+    assert index.reserve("2")
+
+
+def test_concurrent_adds_and_reads():
+    index = IssueIndex(1)
+
+    def add(start):
+        for i in range(start, start + 200):
+            index.add(str(i), i)
+            assert str(i) in index
+
+    threads = [threading.Thread(target=add, args=(n * 200,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(index) == 800
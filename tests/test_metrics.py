@@ -0,0 +1,43 @@
+import json
+from io import BytesIO
+
+import pytest
+
+from barda.exceptions import ApiError
+from barda.metrics import WriteMetrics
+from barda.post_data import PostData
+
+
+def test_writes_are_counted_per_endpoint(tmp_path) -> None:
+    metrics = WriteMetrics()
+    barda = PostData("user", "passwd", journal=tmp_path / "journal.jsonl", metrics=metrics)
+    image = BytesIO(b"x" * 1000)
+    image.name = "cover.jpg"
+    barda.post_issue({"series": 1, "number": "1", "image": image})
+    barda.patch_issue(5, {"upc": "123"})
+    barda.post_credit([{"issue": 5, "creator": 1, "role": [1]}])
+
+    summary = metrics.summary()
+    assert summary["issue"]["requests"] == 2
+    assert summary["issue"]["bytes_sent"] > 1000
+    assert summary["credit"]["requests"] == 1
+    assert sum(summary["credit"]["histogram"].values()) == 1
+
+
+def test_errors_are_counted_and_summary_written(tmp_path, monkeypatch) -> None:
+    metrics = WriteMetrics()
+    barda = PostData("user", "passwd", metrics=metrics)
+
+    def bad_request(*args):
+        raise ApiError("Bad request")
+
+    monkeypatch.setattr(barda, "_request", bad_request)
+    with pytest.raises(ApiError):
+        barda.post_series({"name": "Foo"})
+
+    path = tmp_path / "metrics.jsonl"
+    metrics.write(path, "CV_Import_Series")
+    record = json.loads(path.read_text())
+    assert record["task"] == "CV_Import_Series"
+    assert record["endpoints"]["series"]["errors"] == {"ApiError": 1}
+    assert not metrics.summary()
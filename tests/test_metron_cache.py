@@ -0,0 +1,73 @@
+import requests
+
+from barda.metron_cache import MetronCache, cache_key
+from barda.metron_session import MetronSession
+
+API = "https://metron.cloud/api/"
+
+
+def test_expired_response_is_not_fresh(tmp_path) -> None:
+    cache = MetronCache(tmp_path / "metron.db", ttls={"issue": 0, "publisher": 3600})
+    cache.store(f"{API}issue/1/", {"id": 1})
+    cache.store(f"{API}publisher/1/", {"id": 1})
+    assert cache.get(f"{API}issue/1/") is None
+    assert cache.stale(f"{API}issue/1/").data == {"id": 1}
+    assert cache.get(f"{API}publisher/1/") == {"id": 1}
+
+
+def test_writes_invalidate_affected_responses(tmp_path) -> None:
+    cache = MetronCache(tmp_path / "metron.db")
+    series_1 = cache_key(f"{API}issue/", {"series_id": 1, "number": "2"})
+    series_2 = cache_key(f"{API}issue/", {"series_id": 2, "number": "2"})
+    for key in [series_1, series_2, f"{API}issue/7/", f"{API}series/1/", f"{API}team/"]:
+        cache.store(key, {"results": []})
+
+    cache.written(["issue"], {"series": 1, "number": "2"}, {"id": 8})
+    assert cache.get(series_1) is None
+    assert cache.get(series_2) is not None
+    assert cache.get(f"{API}series/1/") is None
+
+    cache.written(["credit"], [], [{"id": 1, "issue": 7}])
+    assert cache.get(f"{API}issue/7/") is None
+    assert cache.get(f"{API}team/") is not None
+
+
+def test_stale_response_is_revalidated(tmp_path, monkeypatch) -> None:
+    cache = MetronCache(tmp_path / "metron.db", ttls={"issue": 0})
+    key = f"{API}issue/1/"
+    cache.note_validators(key, '"abc"', None)
+    cache.store(key, {"id": 1})
+    session = MetronSession("user", "passwd", cache=cache)
+    sent_headers = {}
+
+    def not_modified(url, headers, **kwargs) -> requests.Response:
+        sent_headers.update(headers)
+        response = requests.Response()
+        response.status_code = 304
+        return response
+
+    monkeypatch.setattr(session.session, "get", not_modified)
+    assert session._request_data(key) == {"id": 1}
+    assert sent_headers["If-None-Match"] == '"abc"'
+
+
+def test_revalidate_skips_fresh_responses(tmp_path, monkeypatch) -> None:
+    cache = MetronCache(tmp_path / "metron.db")
+    key = f"{API}issue/1/"
+    cache.note_validators(key, '"abc"', None)
+    cache.store(key, {"id": 1})
+    session = MetronSession("user", "passwd", cache=cache)
+    sent_headers = []
+
+    def not_modified(url, headers, **kwargs) -> requests.Response:
+        sent_headers.append(headers)
+        response = requests.Response()
+        response.status_code = 304
+        return response
+
+    monkeypatch.setattr(session.session, "get", not_modified)
+    assert session._call(["issue", 1]) == {"id": 1}
+    assert not sent_headers
+    with session.revalidate():
+        assert session._call(["issue", 1]) == {"id": 1}
+    assert sent_headers[0]["If-None-Match"] == '"abc"'
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+from mokkari.schemas.series import BaseSeries
+
+from barda.mirror import MetronMirror
+from barda.projections import IssueSummary, SeriesSummary
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeMetron:
+    """Serves series of publisher 1, some of which are missing a Comic Vine ID."""
+
+    def __init__(self):
+        self.series = {i: {"missing": True, "modified": START} for i in range(1, 4)}
+        self.calls = []
+
+    def series_list(self, params=None):
+        self.calls.append(params)
+        since = datetime.fromisoformat(params["modified_gt"]) if "modified_gt" in params else None
+        return [
+            BaseSeries(
+                id=i,
+                year_began=2000,
+                issue_count=1,
+                volume=1,
+                modified=s["modified"],
+                display_name=f"Series {i}",
+            )
+            for i, s in self.series.items()
+            if (since is None or s["modified"] > since)
+            and ("missing_cv_id" not in params or s["missing"])
+        ]
+
+    def edit(self, series_id, **kwargs):
+        self.series[series_id].update(kwargs, modified=START + timedelta(days=len(self.calls)))
+
+
+def test_mirror_refreshes_incrementally(tmp_path):
+    metron = FakeMetron()
+    params = {"publisher_id": 1, "missing_cv_id": True}
+    mirror = MetronMirror(tmp_path / "mirror.db", max_age=0)
+    assert [s.id for s in mirror.list(metron, "series", params)] == [1, 2, 3]  # type: ignore
+    assert mirror.list(metron, "series", params)[0] == SeriesSummary(  # type: ignore
+        1, "Series 1", 1, 2000
+    )
+
+    # Series 2 got its Comic Vine ID and series 4 was added.
+    metron.edit(2, missing=False)
+    metron.series[4] = {"missing": True, "modified": START + timedelta(days=5)}
+    assert [s.id for s in mirror.list(metron, "series", params)] == [1, 3, 4]  # type: ignore
+    assert all("modified_gt" in call for call in metron.calls[1:])
+    # The change scan keeps the publisher filter but not missing_cv_id.
+    assert {"publisher_id": 1, "modified_gt": START.isoformat()} in metron.calls
+
+    # A new mirror reads it back and the sync shares one change list between queries.
+    mirror = MetronMirror(tmp_path / "mirror.db")
+    metron.calls = []
+    assert [s.id for s in mirror.list(metron, "series", params)] == [1, 3, 4]  # type: ignore
+    assert metron.calls == []
+    mirror.list(metron, "series", {"publisher_id": 1})  # type: ignore
+    metron.calls = []
+    assert mirror.sync(metron) == {"series": 0, "issue": 0}  # type: ignore
+    assert len(metron.calls) == 3
+
+
+def test_cv_id_set_drops_summary_from_missing_queries(tmp_path):
+    metron = FakeMetron()
+    mirror = MetronMirror(tmp_path / "mirror.db")
+    missing = {"publisher_id": 1, "missing_cv_id": True}
+    mirror.list(metron, "series", missing)  # type: ignore
+    mirror.list(metron, "series", {"publisher_id": 1})  # type: ignore
+
+    mirror.cv_id_set("series", 2)
+    assert [s.id for s in mirror.list(metron, "series", missing)] == [1, 3]  # type: ignore
+    assert [s.id for s in mirror.list(metron, "series", {"publisher_id": 1})] == [  # type: ignore
+        1,
+        2,
+        3,
+    ]
+
+
+def test_sync_drops_unused_queries(tmp_path):
+    metron = FakeMetron()
+    mirror = MetronMirror(tmp_path / "mirror.db", unused_ttl=60)
+    mirror.list(metron, "series", {"publisher_id": 1})  # type: ignore
+    mirror.list(metron, "series", {"publisher_id": 1, "missing_cv_id": True})  # type: ignore
+    with mirror.con:
+        mirror.con.execute("UPDATE mirror_queries SET used = 0 WHERE params LIKE '%missing%'")
+
+    metron.calls = []
+    mirror.sync(metron)  # type: ignore
+    assert not any("missing_cv_id" in call for call in metron.calls)
+    assert mirror.con.execute("SELECT COUNT(*) FROM mirror_queries").fetchone()[0] == 1
+    assert mirror.con.execute("SELECT COUNT(*) FROM mirror_items").fetchone()[0] == 3
+
+
+def test_issue_summary():
+    data = {"id": 5, "number": "1", "series": {"name": "Batman", "volume": 1, "year_began": 1940}}
+    assert IssueSummary.from_json(data) == IssueSummary(5, "1", "Batman")
+    assert not hasattr(IssueSummary.from_json(data), "__dict__")
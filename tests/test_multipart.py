@@ -0,0 +1,35 @@
+from io import BytesIO
+
+import requests
+
+from barda.multipart import MultipartStream
+
+
+def test_body_matches_requests_encoding() -> None:
+    data = {"series": 1, "characters": [2, 3], "desc": None}
+    image = BytesIO(b"\x89PNG" * 50_000)
+    image.name = "cover.png"
+    stream = MultipartStream(data, image)
+
+    body = b"".join(iter(lambda: stream.read(8192), b""))
+    assert len(body) == len(stream)
+    assert body.count(b'name="characters"') == 2
+    assert b'name="desc"' not in body
+    assert b'filename="cover.png"' in body
+    assert image.getvalue() in body
+
+
+def test_body_is_streamed_by_requests() -> None:
+    image = BytesIO(b"data")
+    image.name = "cover.jpg"
+    stream = MultipartStream({"series": 1}, image)
+    prepared = requests.Request("POST", "https://metron.cloud/api/issue/", data=stream).prepare()
+    assert prepared.body is stream
+    assert prepared.headers["Content-Length"] == str(len(stream))
+
+
+def test_seek_rewinds_for_retries() -> None:
+    stream = MultipartStream({"series": 1}, ("cover.jpg", b"data"))
+    first = stream.read()
+    stream.seek(0)
+    assert stream.read() == first
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from barda.importer_comic_vine import ComicVineImporter
+from barda.name_index import NameIndex, normalize_name
+from barda.resource_keys import Resources
+
+
+def _item(id_, name, day=1):
+    return SimpleNamespace(id=id_, name=name, modified=datetime(2024, 1, day, tzinfo=timezone.utc))
+
+
+class FakeMetron:
+    def __init__(self):
+        self.params = []
+        self.items = [_item(1, "Spider-Man"), _item(2, "Spider-Woman"), _item(3, "Mary Jane")]
+
+    def characters_list(self, params=None):
+        self.params.append(params)
+        return self.items
+
+    arcs_list = creators_list = teams_list = characters_list
+
+
+def test_normalize_name():
+    assert normalize_name("Spider-Man") == "spider man"
+    assert normalize_name(" Pépé Le  Pew ") == "pepe le pew"
+
+
+def test_search(tmp_path):
+    index = NameIndex(tmp_path / "names.db")
+    index.add_many("character", [(1, "Spider-Man"), (2, "Spider-Woman"), (3, "Mary Jane Watson")])
+    assert [i.id for i in index.search("character", "spider man")] == [1]
+    assert [i.id for i in index.search("character", "Spider")] == [1, 2]
+    assert [i.id for i in index.search("character", "Watson Mary")] == [3]
+    assert index.search("character", "Spidr-Woman")[0].id == 2
+    assert index.search("team", "Spider-Man") == []
+
+
+def test_aliases_and_renames_persist(tmp_path):
+    db = tmp_path / "names.db"
+    index = NameIndex(db)
+    index.add("character", 1, "Spider-Man")
+    index.add("character", 1, "Spiderman", alias=True)
+    index.add("character", 3, "Mary Jane")
+    index.add("character", 3, "Mary Jane Watson")
+
+    index = NameIndex(db)
+    assert index.search("character", "spiderman")[0].name == "Spider-Man"
+    assert index.search("character", "Mary Jane Watson")[0].id == 3
+    assert [i.id for i in index.search("character", "Mary Jane")] == [3]
+
+
+def test_sync_is_incremental(tmp_path):
+    index = NameIndex(tmp_path / "names.db")
+    metron = FakeMetron()
+    assert index.sync(metron, ["character"]) == {"character": 3}  # type: ignore
+    assert metron.params == [{}]
+
+    metron.items = [_item(4, "Venom", day=2)]
+    index.sync(metron, ["character"])  # type: ignore
+    assert metron.params[1] == {"modified_gt": "2024-01-01T00:00:00+00:00"}
+    assert index.search("character", "venom")[0].id == 4
+    assert index.synced("character") == datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def test_full_sync_removes_deleted_names(tmp_path):
+    metron = FakeMetron()
+    index = NameIndex(tmp_path / "names.db")
+    index.sync(metron, ["character"])
+    index.add("character", 2, "Spider Gwen", alias=True)
+
+    metron.items = [_item(1, "Spider-Man"), _item(3, "Mary Jane")]
+    index.sync(metron, ["character"], full=True)
+    assert metron.params[-1] == {}
+    assert 2 not in [found.id for found in index.search("character", "Spider-Woman")]
+    assert 2 not in [found.id for found in index.search("character", "Spider Gwen")]
+    reopened = NameIndex(tmp_path / "names.db")
+    assert 2 not in [found.id for found in reopened.search("character", "Spider-Woman")]
+
+
+def test_dry_run_index_is_not_persisted(tmp_path):
+    NameIndex(tmp_path / "names.db").add("character", 1, "Spider-Man")
+    index = NameIndex(tmp_path / "names.db", persist=False)
+    index.add("character", 1, "Spidey", alias=True)
+    assert index.search("character", "Spidey")[0].id == 1
+    assert NameIndex(tmp_path / "names.db").search("character", "Spidey") == []
+
+
+def test_unsynced_index_only_trusts_exact_names(settings):
+    importer = ComicVineImporter(settings)
+    metron = FakeMetron()
+    importer.metron = metron  # type: ignore
+    importer.names.add("character", 2, "Spider-Woman")
+
+    assert len(importer._find_names(Resources.Character, "Spider")) == 3
+    assert metron.params == [{"name": "Spider"}]
+    assert importer._find_names(Resources.Character, "Spider-Woman")[0].id == 2
+    assert len(metron.params) == 1
+
+    importer.names.sync(metron, ["character"])  # type: ignore
+    assert [i.id for i in importer._find_names(Resources.Character, "Spider")] == [1, 2]
+    assert len(metron.params) == 2
@@ -0,0 +1,63 @@
+import pytest
+from mokkari import exceptions
+from simyan.exceptions import ServiceError
+
+from barda import cli
+from barda.comicvine_session import ComicvineSession
+from barda.cv_cache import ComicvineCache
+from barda.metron_cache import MetronCache
+from barda.metron_session import MetronSession
+from barda.settings import BardaSettings
+
+API = "https://metron.cloud/api/"
+
+
+def no_network(*args, **kwargs):
+    raise AssertionError("An offline session sent a request")
+
+
+def test_offline_metron_reads_expired_cache(tmp_path, monkeypatch) -> None:
+    MetronCache(tmp_path / "metron.db").store(f"{API}issue/1/", {"id": 1})
+    cache = MetronCache(tmp_path / "metron.db", ttls={"issue": 0}, read_only=True)
+    session = MetronSession("user", "passwd", cache=cache, offline=True)
+    monkeypatch.setattr(session.session, "get", no_network)
+
+    assert cache.get(f"{API}issue/1/") == {"id": 1}
+    with pytest.raises(exceptions.ApiError):
+        session._request_data(f"{API}issue/2/")
+    # Journaled writes don't drop the responses an offline run depends on.
+    cache.written(["issue"], {"series": 1}, {"id": 1})
+    assert cache.get(f"{API}issue/1/") == {"id": 1}
+
+
+def test_offline_comic_vine_reads_expired_cache(tmp_path, monkeypatch) -> None:
+    online = ComicvineSession(api_key="key", cache=ComicvineCache(tmp_path / "cv.db"))
+    monkeypatch.setattr(online, "_perform_get_request", lambda url, params: {"results": {}})
+    online._get_request(endpoint="/issue/4000-1/")
+
+    cache = ComicvineCache(tmp_path / "cv.db", ttls={"issue": 0}, read_only=True)
+    offline = ComicvineSession(api_key="key", cache=cache, offline=True)
+    monkeypatch.setattr(offline.session, "get", no_network)
+
+    assert offline._get_request(endpoint="/issue/4000-1/") == {"results": {}}
+    with pytest.raises(ServiceError):
+        offline._get_request(endpoint="/issue/4000-2/")
+
+
+def test_offline_implies_dry_run(parser, monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(cli, "BardaSettings", lambda: BardaSettings(config_dir=str(tmp_path)))
+    config = cli.get_configs(parser.parse_args(["--offline"]))
+    assert config.offline
+    assert config.dry_run is not None
+
+
+def test_read_only_metron_cache_is_not_changed(tmp_path) -> None:
+    MetronCache(tmp_path / "metron.db").store(f"{API}issue/1/", {"id": 1})
+    before = (tmp_path / "metron.db").read_bytes()
+    cache = MetronCache(tmp_path / "metron.db", read_only=True)
+    cache.store(f"{API}issue/2/", {"id": 2})
+    assert cache.get(f"{API}issue/1/") == {"id": 1}
+    assert (tmp_path / "metron.db").read_bytes() == before
+
+    assert MetronCache(tmp_path / "missing.db", read_only=True).get(f"{API}issue/1/") is None
+    assert not (tmp_path / "missing.db").exists()
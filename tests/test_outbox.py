@@ -0,0 +1,143 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+import questionary
+import requests
+from mokkari import exceptions
+
+from barda.exceptions import ApiConnectionError, ApiError
+from barda.importer_base import BaseImporter
+from barda.outbox import ConversionKey, Outbox, OutboxEntry, issue_ref
+from barda.post_data import PostData, RequestAction
+from barda.resource_keys import ResourceKeys, Resources
+
+
+@pytest.fixture()
+def db(tmp_path):
+    return tmp_path / "barda.db"
+
+
+def test_finish_saves_conversions(db) -> None:
+    outbox = Outbox(db)
+    key = ConversionKey("gcd", Resources.Issue.value, 1234)
+    entry_id = outbox.begin("Post", ["issue"], {"series": 5, "number": "1"}, [key])
+    assert [e.id for e in outbox.pending()] == [entry_id]
+
+    outbox.finish(entry_id, 99)
+    assert not outbox.pending()
+    assert outbox.done(issue_ref(5, "1")) == 99
+    assert ResourceKeys(str(db)).get_gcd(Resources.Issue.value, 1234) == 99
+
+
+def test_failed_and_discarded_entries_are_not_pending(db) -> None:
+    outbox = Outbox(db)
+    failed = outbox.begin("Patch", ["issue", 1], {"upc": "1"})
+    outbox.begin("Patch", ["issue", 2], {"upc": "2"})
+    outbox.fail(failed, "Bad request")
+    assert len(outbox.pending()) == 1
+    outbox.discard()
+    assert not outbox.pending()
+
+
+def test_connection_error_leaves_write_pending(db, monkeypatch) -> None:
+    outbox = Outbox(db)
+    barda = PostData("user", "passwd", outbox=outbox)
+
+    def no_connection(*args):
+        raise ApiConnectionError("Connection error")
+
+    monkeypatch.setattr(barda, "_request", no_connection)
+    with pytest.raises(ApiError):
+        barda.patch_issue(1, {"upc": "1"})
+    assert [e.endpoint for e in outbox.pending()] == [["issue", 1]]
+
+    monkeypatch.setattr(barda, "_request", lambda *args: {"id": 1})
+    entry = outbox.pending()[0]
+    barda.replay(entry)
+    assert not outbox.pending()
+    assert RequestAction[entry.action] == RequestAction.Patch
+
+
+def test_request_error_fails_write_and_keeps_payload(db, monkeypatch) -> None:
+    outbox = Outbox(db)
+    barda = PostData("user", "passwd", outbox=outbox)
+
+    def redirects(*args, **kwargs):
+        raise requests.exceptions.TooManyRedirects("Exceeded 30 redirects.")
+
+    monkeypatch.setattr(barda.session, "request", redirects)
+    data = {"upc": "1", "image": ""}
+    with pytest.raises(ApiError):
+        barda.patch_issue(1, data)
+    assert not outbox.pending()
+    assert data == {"upc": "1", "image": ""}
+
+
+def test_applied_patch_is_not_resent() -> None:
+    current = SimpleNamespace(cv_id=5, upc="1", characters=[SimpleNamespace(id=2)])
+    importer = SimpleNamespace(metron=SimpleNamespace(issue=lambda _: current))
+    applied = OutboxEntry(1, "Patch", ["issue", 7], {"cv_id": 5, "characters": [2]}, None, [])
+    changed = OutboxEntry(2, "Patch", ["issue", 7], {"upc": "2"}, None, [])
+    assert BaseImporter._patch_applied(importer, applied) == 7  # type: ignore
+    assert BaseImporter._patch_applied(importer, changed) is None  # type: ignore
+
+
+def json_response(data) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode()
+    return response
+
+
+def test_resume_finds_an_interrupted_create_on_metron(settings, monkeypatch) -> None:
+    importer = BaseImporter(settings)
+    found: list[dict] = []
+    monkeypatch.setattr(
+        importer.metron.session,
+        "get",
+        lambda url, **kwargs: json_response({"count": len(found), "next": None, "results": found}),
+    )
+    # The name was searched for before the character was created, so no match is cached.
+    assert importer.metron.characters_list(params={"name": "Foo"}) == []
+
+    def sent_then_lost(*args, **kwargs):
+        if not found:
+            found.append({"id": 9, "name": "Foo", "modified": "2024-01-01T00:00:00Z"})
+        raise requests.exceptions.ReadTimeout("Read timed out.")
+
+    monkeypatch.setattr(importer.barda.session, "request", sent_then_lost)
+    key = ConversionKey("cv", Resources.Character.value, 5)
+    with pytest.raises(ApiError):
+        importer.barda.post_character({"name": "Foo", "cv_id": 5}, keys=[key])
+    assert len(importer.outbox.pending()) == 1
+
+    def no_resend(entry):
+        raise AssertionError("The character was created again")
+
+    monkeypatch.setattr(questionary, "confirm", lambda message: SimpleNamespace(ask=lambda: True))
+    monkeypatch.setattr(importer.barda, "replay", no_resend)
+    importer._resume_outbox()
+    assert not importer.outbox.pending()
+    assert importer.conversions.get_cv(Resources.Character.value, 5) == 9
+
+
+def test_offline_run_leaves_the_outbox_alone(settings) -> None:
+    Outbox(settings.conversions).begin("Post", ["issue"], {"series": 5, "number": "1"})
+    settings.offline = True
+    settings.dry_run = settings.conversions.with_name("journal.jsonl")
+    with BaseImporter(settings) as importer:
+        assert len(importer.outbox.pending()) == 1
+
+
+def test_failed_check_leaves_the_entry_pending(settings, monkeypatch) -> None:
+    importer = BaseImporter(settings)
+    importer.outbox.begin("Post", ["issue"], {"series": 5, "number": "1"})
+
+    def unreachable(params=None):
+        raise exceptions.ApiError("Connection error")
+
+    monkeypatch.setattr(importer.metron, "issues_list", unreachable)
+    monkeypatch.setattr(questionary, "confirm", lambda message: SimpleNamespace(ask=lambda: True))
+    importer._resume_outbox()
+    assert len(importer.outbox.pending()) == 1
@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from barda.prefetch import prefetch
+
+
+def test_prefetch_keeps_order():
+    def fetch(i):
+        time.sleep(0.01 * (5 - i))
+        return i * 10
+
+    assert list(prefetch(range(5), fetch, workers=3, ahead=4)) == [(i, i * 10) for i in range(5)]
+
+
+def test_prefetch_is_bounded():
+    started = []
+    lock = threading.Lock()
+
+    def fetch(i):
+        with lock:
+            started.append(i)
+        return i
+
+    results = prefetch(range(100), fetch, workers=2, ahead=3)
+    next(results)
+    time.sleep(0.05)
+    assert len(started) <= 4
+    results.close()
+
+
+def test_prefetch_raises_in_order():
+    def fetch(i):
+        if i == 2:
+            raise ValueError(i)
+        return i
+
+    results = prefetch(range(5), fetch, workers=2, ahead=2)
+    assert [next(results), next(results)] == [(0, 0), (1, 1)]
+    with pytest.raises(ValueError):
+        next(results)
@@ -0,0 +1,72 @@
+import pytest
+import requests
+
+from barda import post_data
+from barda.rate_limit import RateLimiter, TokenBucket, endpoint_from_url, parse_retry_after
+
+test_urls = [
+    pytest.param("https://metron.cloud/api/issue/?page=2", "/api/", "issue"),
+    pytest.param("https://metron.cloud/api/issue/31/", "/api/", "issue"),
+    pytest.param("https://comicvine.gamespot.com/api/issue/4000-1/", "/api/", "issue"),
+    pytest.param("https://comicvine.gamespot.com/api/volumes/", "/api/", "volumes"),
+]
+
+
+@pytest.mark.parametrize("url, prefix, expected", test_urls)
+def test_endpoint_from_url(url: str, prefix: str, expected: str) -> None:
+    assert endpoint_from_url(url, prefix) == expected
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after("30") == 30.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+
+
+def test_bucket_waits_when_empty() -> None:
+    bucket = TokenBucket(2, 60)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(30, abs=0.1)
+
+
+def test_bucket_pause_slows_down_and_relax_recovers() -> None:
+    bucket = TokenBucket(10, 10)
+    bucket.pause(5)
+    assert bucket.rate == 0.5
+    assert bucket.reserve() >= 4.9
+    for _ in range(20):
+        bucket.relax()
+    assert bucket.rate == bucket.max_rate
+
+
+def test_limiter_uses_service_and_endpoint_budgets() -> None:
+    limiter = RateLimiter({"metron": (100, 60), "metron/credit": (1, 60), "cv/*": (5, 60)})
+    assert limiter.acquire("metron", "credit") == 0
+    assert limiter.acquire("cv", "issues") == 0
+    assert "cv/issues" in limiter.buckets
+    # The credit budget is used up, so the next call has to wait for it.
+    assert limiter.buckets["metron/credit"].reserve() > 0
+    assert limiter.stats()["metron/credit"]["calls"] == 1
+
+
+def test_limiter_pauses_on_throttle() -> None:
+    limiter = RateLimiter({"metron": (100, 60)})
+    limiter.update("metron", "issue", 429, {"Retry-After": "10"})
+    assert limiter.buckets["metron"].reserve() >= 9.9
+
+
+def test_writes_have_their_own_budget(monkeypatch) -> None:
+    limiter = RateLimiter()
+    monkeypatch.setattr(post_data, "LIMITER", limiter)
+    barda = post_data.PostData("user", "passwd")
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"id": 1}'
+    response.request = requests.Request("PATCH", "https://metron.cloud").prepare()
+    monkeypatch.setattr(barda.session, "request", lambda *args, **kwargs: response)
+
+    barda.patch_issue(1, {"upc": "1"})
+    barda.patch_series(1, {"desc": "1"})
+    assert limiter.stats()["metron/write"]["calls"] == 2
+    assert limiter.buckets["metron/write"].capacity == 10
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from mokkari import exceptions
+from mokkari.schemas.base import BaseResource
+from mokkari.schemas.generic import GenericItem
+
+from barda.reference_data import ReferenceData
+
+
+class FakeMetron:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.down = False
+
+    def _list(self) -> list[GenericItem]:
+        if self.down:
+            raise exceptions.ApiError("Connection error")
+        self.calls += 1
+        return [GenericItem(id=1, name="Writer")]
+
+    def _resources(self) -> list[BaseResource]:
+        self.calls += 1
+        return [BaseResource(id=1, name="Marvel", modified=datetime.now(tz=timezone.utc))]
+
+    series_type_list = role_list = _list
+    universes_list = publishers_list = _resources
+
+
+def test_lists_are_shared_across_instances(tmp_path) -> None:
+    metron = FakeMetron()
+    ReferenceData(tmp_path / "reference.db").start_refresh(metron).join()  # type: ignore
+    assert metron.calls == 4
+
+    roles = ReferenceData(tmp_path / "reference.db").get("role", metron)  # type: ignore
+    assert roles[0].name == "Writer"
+    assert metron.calls == 4
+
+
+def test_expired_list_is_used_when_metron_is_down(tmp_path) -> None:
+    metron = FakeMetron()
+    reference = ReferenceData(tmp_path / "reference.db", ttl=0)
+    reference.get("role", metron)  # type: ignore
+    metron.down = True
+    assert reference.get("role", metron)[0].id == 1  # type: ignore
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from barda.gcd.db import GcdReprintIssue
+from barda.resource_keys import Resources
+from barda.update_gcd import GcdUpdate
+
+SERIES = ["The New Gods", "Mister Miracle", "Batman", "Batman", "Batman Adventures"]
+
+
+class FakeMetron:
+    def __init__(self):
+        self.calls = []
+
+    def series_list(self, params=None):
+        self.calls.append(params)
+        return [
+            SimpleNamespace(id=len(name), display_name=f"{name} (1970)", year_began=1970)
+            for name in SERIES
+            if params["name"].casefold() in name.casefold()
+        ]
+
+    def issues_list(self, params=None):
+        self.calls.append(params)
+        if "series_id" in params:
+            series = next(name for name in SERIES if len(name) == params["series_id"])
+            numbers = range(1, 6)
+        else:
+            series = params["series_name"]
+            numbers = range(params["number"], params["number"] + 1)
+        return [
+            SimpleNamespace(
+                id=len(series) * 100 + i, number=str(i), issue_name=f"{series} (1970) #{i}"
+            )
+            for i in numbers
+        ]
+
+
+def _importer(settings) -> GcdUpdate:
+    importer = GcdUpdate(settings)
+    importer.metron = FakeMetron()  # type: ignore
+    return importer
+
+
+def test_reprints_fetch_each_series_once(settings):
+    importer = _importer(settings)
+    reprints = [
+        GcdReprintIssue(id_=len(series) * 10 + i, series=series, number=i, year_began=1970)
+        for series in ("The New Gods", "Mister Miracle")
+        for i in (1, 2, 3)
+    ]
+    assert importer.get_metron_reprint(reprints) == [1201, 1202, 1203, 1401, 1402, 1403]
+    # One series lookup and one issue list per series.
+    assert len(importer.metron.calls) == 4  # type: ignore
+    assert {"series_id": 12} in importer.metron.calls  # type: ignore
+
+    # Stored conversions and the run-wide map mean no more requests.
+    more = [GcdReprintIssue(id_=20, series="the new gods", number=4, year_began=1970)]
+    assert importer.get_metron_reprint(more) == [1204]
+    assert len(importer.metron.calls) == 4  # type: ignore
+
+
+def test_ambiguous_series_is_searched_by_number(settings):
+    importer = _importer(settings)
+    reprints = [GcdReprintIssue(id_=i, series="Batman", number=i, year_began=1970) for i in (1, 2)]
+    assert importer.get_metron_reprint(reprints) == [601, 602]
+    issue_calls = importer.metron.calls[1:]  # type: ignore
+    assert issue_calls == [
+        {"series_name": "Batman", "number": 1},
+        {"series_name": "Batman", "number": 2},
+    ]
+
+
+def test_missing_reprints_are_remembered(settings):
+    missing = [GcdReprintIssue(id_=99, series="The New Gods", number=9, year_began=1970)]
+    assert _importer(settings).get_metron_reprint(missing) == []
+
+    importer = _importer(settings)
+    assert importer.get_metron_reprint(missing) == []
+    assert importer.metron.calls == []  # type: ignore
+
+    assert importer.conversions.clear_missing_gcd() == 1
+    assert not _importer(settings)._is_missing(99)
+
+
+def test_mapped_reprint_is_no_longer_missing(settings):
+    importer = _importer(settings)
+    importer._mark_missing(99)
+    assert importer._is_missing(99)
+    importer.conversions.store_gcd(Resources.Issue.value, 99, 1234)
+    assert not importer._is_missing(99)
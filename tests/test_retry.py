@@ -0,0 +1,82 @@
+import pytest
+import requests
+
+from barda.retry import RetryPolicy
+
+
+def make_response(status: int, retry_after: str | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+class FlakyServer:
+    def __init__(self, *results) -> None:
+        self.results = list(results)
+        self.timeouts: list[float] = []
+
+    def __call__(self, timeout: float) -> requests.Response:
+        self.timeouts.append(timeout)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture()
+def no_sleep(monkeypatch) -> list[float]:
+    sleeps: list[float] = []
+    monkeypatch.setattr("barda.retry.time.sleep", sleeps.append)
+    return sleeps
+
+
+def test_status_is_retried_with_retry_after(no_sleep) -> None:
+    server = FlakyServer(make_response(503, "7"), make_response(200))
+    response = RetryPolicy(backoff=0.1).call("POST", server, timeout=40)
+    assert response.status_code == 200
+    assert no_sleep == [7.0]
+
+
+def test_post_is_not_retried_after_a_gateway_error(no_sleep) -> None:
+    server = FlakyServer(make_response(502), make_response(201))
+    response = RetryPolicy().call("POST", server, timeout=40)
+    assert response.status_code == 502
+    assert not no_sleep
+
+
+def test_gives_up_after_the_last_attempt(no_sleep) -> None:
+    server = FlakyServer(*[requests.exceptions.ReadTimeout("slow")] * 3)
+    with pytest.raises(requests.exceptions.ReadTimeout) as err:
+        RetryPolicy(attempts=3, backoff=0.1).call("GET", server, timeout=40)
+    assert "3 attempts" in err.value.__notes__[0]
+    assert len(no_sleep) == 2
+
+
+def test_deadline_bounds_the_call(no_sleep) -> None:
+    server = FlakyServer(make_response(503, "60"), make_response(200))
+    response = RetryPolicy(deadline=30).call("GET", server, timeout=40)
+    assert response.status_code == 503
+    assert server.timeouts[0] <= 30
+
+
+def test_rate_limit_wait_does_not_count_against_the_deadline(no_sleep, monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr("barda.retry.time.monotonic", lambda: clock[0])
+
+    def acquire() -> float:
+        clock[0] += 50
+        return 50.0
+
+    server = FlakyServer(make_response(200))
+    response = RetryPolicy(deadline=30).call("GET", server, timeout=40, acquire=acquire)
+    assert response.status_code == 200
+    assert server.timeouts == [30]
+
+
+def test_patch_is_not_resent_after_a_timeout(no_sleep) -> None:
+    server = FlakyServer(requests.exceptions.ReadTimeout("slow"), make_response(200))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        RetryPolicy().call("PATCH", server, timeout=40)
+    assert not no_sleep
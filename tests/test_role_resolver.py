@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from barda.role_resolver import RoleResolver, normalize_role
+
+ROLES = [
+    SimpleNamespace(id=1, name="Writer"),
+    SimpleNamespace(id=2, name="Penciller"),
+    SimpleNamespace(id=3, name="Inker"),
+    SimpleNamespace(id=4, name="Editor In Chief"),
+    SimpleNamespace(id=5, name="Cover"),
+]
+
+
+def test_normalize_role():
+    assert normalize_role(" Editor-in-Chief ") == "editor in chief"
+
+
+def test_resolve_names_and_synonyms(tmp_path):
+    resolver = RoleResolver(ROLES, tmp_path / "barda.db")
+    assert resolver.resolve(["writer", "penciler", "inks"]) == [1, 2, 3]
+    assert resolver.resolve(["editor-in-chief"]) == [4]
+    assert resolver.resolve(["cover artist", "cover"]) == [5]
+    assert resolver.resolve(["finisher"]) == []
+
+
+def test_learned_synonyms_persist(tmp_path):
+    db = tmp_path / "barda.db"
+    resolver = RoleResolver(ROLES, db)
+    resolver.learn(["Embellisher"], [3])
+    resolver.learn(["artist", "other"], [2, 3])
+    assert resolver.resolve(["embellisher"]) == [3]
+
+    resolver = RoleResolver(ROLES, db)
+    assert resolver.resolve(["Embellisher"]) == [3]
+    assert resolver.resolve(["Artist", "Other"]) == [2, 3]
+    assert resolver.resolve(["artist"]) == []